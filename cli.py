@@ -0,0 +1,340 @@
+# cli.py
+"""
+Modo de línea de comandos (sin interfaz gráfica).
+Ejemplo:
+  python cli.py template --url ws://127.0.0.1:60001/ws --realm default --topic com.ads.midshmi.topic \\
+      --template plantilla.json --count 10000 --rate 500
+"""
+import sys, json, argparse
+from common.payload import PAYLOAD_MODES, DEFAULT_PAYLOAD_MODE
+from common.transports import DEFLATE_PRESETS
+
+DEFAULT_URL = "ws://127.0.0.1:60001/ws"
+DEFAULT_REALM = "default"
+
+def add_connection_args(parser):
+    parser.add_argument("--url", default=DEFAULT_URL, help="URL del router (ws://, wss://, rs://, tcp:// o unix://)")
+    parser.add_argument("--realm", default=DEFAULT_REALM, help="Realm WAMP")
+    parser.add_argument("--deflate", choices=sorted(DEFLATE_PRESETS), default="default",
+                        help="permessage-deflate en WebSocket: default, off o low-memory")
+
+def cmd_template(args):
+    from publisher.pubTemplate import PayloadTemplate, publish_template
+    template = PayloadTemplate.from_file(args.template)
+    if args.dry_run:
+        # Solo se generan los payloads (una línea JSON por mensaje), sin conectar
+        for message in template.generate(args.count, args.start):
+            sys.stdout.write(json.dumps(message, ensure_ascii=False) + "\n")
+        return 0
+    from common.headless import run_headless
+    async def main(session):
+        tracker = None
+        if args.ack:
+            from publisher.pubAck import DeliveryTracker
+            tracker = DeliveryTracker(args.window)
+        return await publish_template(session, args.topic, template, args.count, args.rate, args.start,
+                                      tracker=tracker, mode=args.payload_mode)
+    stats = run_headless(args.url, args.realm, main, DEFLATE_PRESETS[args.deflate])
+    print(f"Enviados {stats['sent']} mensajes en {stats['elapsed']:.3f} s ({stats['rate']:.1f} msg/s)")
+    if "delivery" in stats:
+        from publisher.pubAck import format_delivery_report
+        print(format_delivery_report(stats["delivery"]))
+        return 0 if stats["delivery"]["ok"] == stats["sent"] else 1
+    return 0
+
+def load_json_arg(value):
+    # Un argumento JSON puede darse en línea o como @fichero.json
+    if value is None:
+        return None
+    if value.startswith("@"):
+        with open(value[1:], "r", encoding="utf-8") as f:
+            return json.load(f)
+    return json.loads(value)
+
+def cmd_rpc_serve(args):
+    import asyncio
+    from common.headless import run_headless
+    from rpc.rpcLoad import register_test_procedures
+    async def main(session):
+        registrations = await register_test_procedures(session, args.prefix)
+        print(f"Registrados {len(registrations)} procedimientos en {args.prefix}. Ctrl+C para salir.")
+        await asyncio.Future()
+    run_headless(args.url, args.realm, main, DEFLATE_PRESETS[args.deflate])
+    return 0
+
+def cmd_rpc_bench(args):
+    from common.headless import run_headless
+    from rpc.rpcLoad import register_test_procedures, call_load, format_report
+    payload = load_json_arg(args.payload)
+    async def main(session):
+        if args.register:
+            await register_test_procedures(session)
+        return await call_load(session, args.procedure, payload, args.calls, args.concurrency, args.timeout)
+    result = run_headless(args.url, args.realm, main, DEFLATE_PRESETS[args.deflate])
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print(format_report(result))
+    return 0 if result["ok"] == result["calls"] else 1
+
+def cmd_record(args):
+    import asyncio, time
+    from common.headless import run_headless
+    from common.payload import decode_event, enable_passthrough
+    from subscriber.subRecorder import CaptureWriter
+    writer = CaptureWriter(args.out, max_bytes=int(args.max_mb * 1024 * 1024), max_seconds=args.max_minutes * 60,
+                           compression=args.compression)
+    def make_handler(topic):
+        def handler(*a, **kw):
+            writer.record(time.time(), args.realm, topic, decode_event(a, kw))
+        return handler
+    async def main(session):
+        enable_passthrough(session)
+        for topic in args.topic:
+            await session.subscribe(make_handler(topic), topic)
+        print(f"Grabando {len(args.topic)} topics en {args.out}. Ctrl+C para salir.")
+        if args.duration > 0:
+            await asyncio.sleep(args.duration)
+        else:
+            await asyncio.Future()
+    try:
+        run_headless(args.url, args.realm, main, DEFLATE_PRESETS[args.deflate])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.close()
+    stats = writer.stats()
+    print(f"Eventos escritos: {stats['written']} ({stats['bytes'] / 1048576:.1f} MB, {stats['segments']} segmentos)")
+    return 0
+
+def cmd_profile(args):
+    from common.headless import run_headless
+    from common.payload import publish_payload
+    from load.profiles import parse_profile, run_profile, find_knee, format_rate_table
+    profile = parse_profile(args.profile)
+    if args.template:
+        from publisher.pubTemplate import PayloadTemplate
+        payload = PayloadTemplate.from_file(args.template).render
+    else:
+        message = load_json_arg(args.payload) or {}
+        payload = lambda n: message
+    async def main(session):
+        def send(n):
+            publish_payload(session, args.topic, payload(n), args.payload_mode)
+        recorder = await run_profile(profile, send, args.interval)
+        return recorder.rows()
+    rows = run_headless(args.url, args.realm, main, DEFLATE_PRESETS[args.deflate])
+    knee = find_knee(rows, args.tolerance)
+    if args.json:
+        print(json.dumps({"profile": str(profile), "rows": rows, "knee": knee}, indent=2, ensure_ascii=False))
+    else:
+        print(f"Perfil: {profile}")
+        print(format_rate_table(rows, knee))
+        if knee is None:
+            print("Se alcanzó la tasa planificada en todos los intervalos")
+        else:
+            print(f"Codo: a partir de {knee['planned']:.1f} msg/s planificados se consiguen {knee['achieved']:.1f} msg/s "
+                  f"(t = {knee['t']:.1f} s)")
+    return 0
+
+def cmd_export(args):
+    import time
+    from subscriber.subExport import export, available
+    if not available():
+        print("La exportación requiere pyarrow (pip install pyarrow)", file=sys.stderr)
+        return 2
+    t0 = time.perf_counter()
+    result = export(args.source, args.out, fields=args.field or (), payload=not args.no_payload,
+                    row_group_size=args.row_group_size, compression=args.compression)
+    elapsed = time.perf_counter() - t0
+    print(f"Filas: {result['rows']} en {result['batches']} lotes -> {args.out} "
+          f"({result['bytes'] / 1048576:.1f} MB, {elapsed:.1f} s)")
+    return 0
+
+def cmd_router(args):
+    from router.miniRouter import main as router_main
+    argv = ["--host", args.host, "--ws-port", str(args.ws_port), "--rs-port", str(args.rs_port)]
+    if args.unix:
+        argv += ["--unix", args.unix]
+    return router_main(argv)
+
+def cmd_bench(args):
+    import os, tempfile
+    from common.headless import run_headless
+    from publisher.pubBench import loopback_bench, format_report, format_comparison
+    stop = None
+    # Lista de (nombre, url, deflate) a medir
+    if args.local:
+        # Router propio en un hilo: la prueba no depende de ningún servicio externo
+        from router.miniRouter import start_router_thread
+        unix_path = os.path.join(tempfile.mkdtemp(prefix="wampy-"), "router.sock")
+        _, endpoints, stop = start_router_thread(unix_path=unix_path)
+        available = {
+            "ws": (endpoints["ws"], False),
+            "ws-deflate": (endpoints["ws"], DEFLATE_PRESETS["default"]),
+            "rs": (endpoints["rs"], None),
+            "unix": (endpoints["unix"], None),
+        }
+        runs = [(name, *available[name]) for name in args.transport or list(available)]
+    else:
+        deflate = DEFLATE_PRESETS[args.deflate]
+        runs = [(url, url, deflate) for url in [args.url] + (args.compare or [])]
+    async def main(session):
+        return await loopback_bench(session, args.topic, args.events, args.size, args.window, args.timeout)
+    results = []
+    try:
+        for name, url, deflate in runs:
+            result = run_headless(url, args.realm, main, deflate)
+            result["transport"] = name
+            results.append(result)
+    finally:
+        if stop is not None:
+            stop()
+    if args.json:
+        print(json.dumps(results if len(results) > 1 else results[0], indent=2, ensure_ascii=False))
+    elif len(results) > 1:
+        print(format_comparison(results))
+    else:
+        print(f"Router: {runs[0][1]}")
+        print(format_report(results[0]))
+    return 0 if all(result["lost"] == 0 for result in results) else 1
+
+def cmd_storm(args):
+    from load.storm import run_storm, format_report
+    stop = None
+    url = args.url
+    if args.local:
+        from router.miniRouter import start_router_thread
+        _, endpoints, stop = start_router_thread()
+        url = endpoints["rs"]
+    try:
+        report = run_storm(url, args.realm, args.sessions, processes=args.processes, join_rate=args.join_rate,
+                           topic=args.topic, subscribe=args.subscribe, publish_interval=args.publish_interval,
+                           hold=args.hold, connect_concurrency=args.connect_concurrency, serializer=args.serializer)
+    finally:
+        if stop is not None:
+            stop()
+    if args.json:
+        report.pop("join_samples", None)
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(f"Router: {url}")
+        print(format_report(report))
+    return 0 if not report["failures"] else 1
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="wampy", description="Herramientas WAMP sin interfaz gráfica")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("template", help="Publica mensajes generados a partir de una plantilla")
+    add_connection_args(p)
+    p.add_argument("--topic", required=True)
+    p.add_argument("--template", required=True, help="Fichero JSON con marcadores {{...}}")
+    p.add_argument("--count", type=int, default=1)
+    p.add_argument("--rate", type=float, default=0, help="Mensajes por segundo (0 = sin límite)")
+    p.add_argument("--start", type=int, default=0, help="Índice inicial de los contadores")
+    p.add_argument("--dry-run", action="store_true", help="Escribe los payloads en stdout sin publicar")
+    p.add_argument("--payload-mode", choices=PAYLOAD_MODES, default=DEFAULT_PAYLOAD_MODE,
+                   help="kwargs (claves como kwargs), arg (objeto como argumento) o raw (bytes JSON en passthrough)")
+    p.add_argument("--ack", action="store_true", help="Publica con confirmación del router e informa de la entrega")
+    p.add_argument("--window", type=int, default=100, help="Máximo de confirmaciones pendientes a la vez (con --ack)")
+    p.set_defaults(func=cmd_template)
+
+    p = sub.add_parser("profile", help="Publica siguiendo un perfil de carga y compara la tasa planificada con la conseguida")
+    add_connection_args(p)
+    p.add_argument("--topic", required=True)
+    p.add_argument("--profile", required=True,
+                   help="ramp:<desde>-<hasta>/<s>, poisson:<λ>/<s>[/<semilla>], burst:<n>@<periodo>/<s> o step:<tasa>x<s>,...")
+    p.add_argument("--template", help="Fichero JSON con marcadores {{...}} (un payload nuevo por envío)")
+    p.add_argument("--payload", help="Payload JSON en línea o @fichero.json (si no hay plantilla)")
+    p.add_argument("--payload-mode", choices=PAYLOAD_MODES, default=DEFAULT_PAYLOAD_MODE)
+    p.add_argument("--interval", type=float, default=1.0, help="Segundos por fila del informe")
+    p.add_argument("--tolerance", type=float, default=0.95,
+                   help="Fracción de lo planificado por debajo de la cual un intervalo marca el codo")
+    p.add_argument("--json", action="store_true", help="Resultado en JSON")
+    p.set_defaults(func=cmd_profile)
+
+    p = sub.add_parser("rpc-serve", help="Registra los procedimientos de prueba y queda a la espera")
+    add_connection_args(p)
+    p.add_argument("--prefix", default="com.wampy.test")
+    p.set_defaults(func=cmd_rpc_serve)
+
+    p = sub.add_parser("rpc-bench", help="Lanza llamadas RPC concurrentes y mide latencia y rendimiento")
+    add_connection_args(p)
+    p.add_argument("--procedure", default="com.wampy.test.echo")
+    p.add_argument("--calls", type=int, default=1000)
+    p.add_argument("--concurrency", type=int, default=10)
+    p.add_argument("--timeout", type=float, default=5.0, help="Timeout por llamada en segundos")
+    p.add_argument("--payload", help="Argumento JSON en línea o @fichero.json")
+    p.add_argument("--register", action="store_true", help="Registra los procedimientos de prueba en la misma sesión")
+    p.add_argument("--json", action="store_true", help="Resultado en JSON")
+    p.set_defaults(func=cmd_rpc_bench)
+
+    from common.rotation import available_compressions
+    p = sub.add_parser("record", help="Graba los eventos de uno o varios topics en ficheros de captura")
+    add_connection_args(p)
+    p.add_argument("--topic", action="append", required=True, help="Topic a grabar (se puede repetir)")
+    p.add_argument("--out", default="captures", help="Directorio de salida")
+    p.add_argument("--max-mb", type=float, default=256, help="Rotar al alcanzar este tamaño en MB (0 = sin límite)")
+    p.add_argument("--max-minutes", type=float, default=0, help="Rotar cada N minutos (0 = sin límite)")
+    p.add_argument("--compression", choices=available_compressions(), default="none")
+    p.add_argument("--duration", type=float, default=0, help="Segundos de grabación (0 = hasta Ctrl+C)")
+    p.set_defaults(func=cmd_record)
+
+    from subscriber.subExport import DEFAULT_ROW_GROUP_SIZE, PARQUET_COMPRESSIONS
+    p = sub.add_parser("export", help="Exporta una captura o un log de sesión a Parquet o Arrow")
+    p.add_argument("source", help="Fichero o directorio de captura (o de log)")
+    p.add_argument("out", help="Fichero de salida (.parquet, o .arrow/.feather para Arrow IPC)")
+    p.add_argument("--field", action="append",
+                   help="Ruta del payload a extraer como columna (numérica; 'ruta:str' como texto). Se puede repetir")
+    p.add_argument("--no-payload", action="store_true", help="No incluir el payload JSON completo")
+    p.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE, help="Filas por lote y por row group")
+    p.add_argument("--compression", choices=PARQUET_COMPRESSIONS, default="zstd")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("router", help="Arranca un router WAMP mínimo local (para pruebas)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--ws-port", type=int, default=60001, help="Puerto WebSocket (-1 = desactivado)")
+    p.add_argument("--rs-port", type=int, default=60002, help="Puerto RawSocket (-1 = desactivado)")
+    p.add_argument("--unix", help="Ruta de un socket Unix RawSocket")
+    p.set_defaults(func=cmd_router)
+
+    from publisher.pubBench import BENCH_TOPIC
+    p = sub.add_parser("bench", help="Publica eventos para la propia sesión y mide rendimiento y latencia")
+    add_connection_args(p)
+    p.add_argument("--local", action="store_true", help="Usa un router mínimo propio en lugar de --url")
+    p.add_argument("--transport", action="append", choices=["ws", "ws-deflate", "rs", "unix"],
+                   help="Transporte a medir con --local (se puede repetir; por defecto, todos)")
+    p.add_argument("--compare", nargs="+", metavar="URL", help="Otras URL del mismo router a comparar con --url")
+    p.add_argument("--topic", default=BENCH_TOPIC)
+    p.add_argument("--events", type=int, default=10000)
+    p.add_argument("--size", type=int, default=64, help="Bytes de relleno por evento")
+    p.add_argument("--window", type=int, default=1000, help="Máximo de eventos publicados sin recibir")
+    p.add_argument("--timeout", type=float, default=10.0, help="Segundos de espera sin progreso")
+    p.add_argument("--json", action="store_true", help="Resultado en JSON")
+    p.set_defaults(func=cmd_bench)
+
+    from load.storm import DEFAULT_TOPIC as STORM_TOPIC, DEFAULT_CONNECT_CONCURRENCY
+    p = sub.add_parser("storm", help="Abre miles de sesiones concurrentes y mide unión, fallos y memoria")
+    add_connection_args(p)
+    p.add_argument("--local", action="store_true", help="Usa un router mínimo propio (RawSocket) en lugar de --url")
+    p.add_argument("--sessions", type=int, default=1000)
+    p.add_argument("--processes", type=int, default=1, help="Procesos entre los que se reparten las sesiones")
+    p.add_argument("--join-rate", type=float, default=0, help="Sesiones nuevas por segundo en total (0 = sin límite)")
+    p.add_argument("--connect-concurrency", type=int, default=DEFAULT_CONNECT_CONCURRENCY,
+                   help="Conexiones abriéndose a la vez por proceso")
+    p.add_argument("--topic", default=STORM_TOPIC, help="Prefijo de los topics (<topic>.0, <topic>.1, ...)")
+    p.add_argument("--subscribe", type=int, default=1, help="Topics a los que se suscribe cada sesión")
+    p.add_argument("--publish-interval", type=float, default=0, help="Cada sesión publica cada N segundos (0 = no)")
+    p.add_argument("--hold", type=float, default=10, help="Segundos en régimen estable tras unirse todas")
+    p.add_argument("--serializer", choices=["json", "msgpack", "cbor"], default="json")
+    p.add_argument("--json", action="store_true", help="Resultado en JSON")
+    p.set_defaults(func=cmd_storm)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+# common/headless.py
+import asyncio
+
+def run_headless(url, realm, main, deflate=None):
+    """
+    Abre una sesión WAMP sin interfaz, ejecuta la corrutina main(session) al unirse
+    y cierra la conexión al terminar. Devuelve el resultado de main.
+    La URL puede ser ws://, rs://, tcp:// o unix:// (ver common.transports).
+    """
+    from autobahn.asyncio.wamp import ApplicationSession
+    from common.transports import connect
+
+    outcome = {}
+
+    class HeadlessSession(ApplicationSession):
+        async def onJoin(self, details):
+            try:
+                outcome["result"] = await main(self)
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                self.leave()
+
+        def onDisconnect(self):
+            asyncio.get_event_loop().stop()
+
+    from common.wampRuntime import new_event_loop
+    # Proceso sin interfaz: un único bucle (uvloop si está instalado) en el hilo principal
+    loop = new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        _, protocol = loop.run_until_complete(connect(url, realm, HeadlessSession, deflate))
+        try:
+            loop.run_forever()
+        except KeyboardInterrupt:
+            # Como ApplicationRunner: se envía GOODBYE y se espera a la desconexión
+            if protocol._session is not None:
+                protocol._session.leave()
+                loop.run_forever()
+            raise
+    finally:
+        loop.close()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
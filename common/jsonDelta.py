@@ -0,0 +1,114 @@
+# common/jsonDelta.py
+"""
+Diferencias estructurales entre payloads JSON consecutivos de un mismo topic.
+Un delta es {"set": [[ruta, valor], ...], "del": [ruta, ...]}, donde cada ruta es una lista de
+claves (dict) e índices (list). Las listas de distinta longitud se sustituyen completas.
+"""
+import json
+
+# Cada cuántos mensajes de un topic se guarda de nuevo el payload completo (keyframe)
+DEFAULT_KEYFRAME_INTERVAL = 50
+
+def diff(old, new):
+    """
+    Delta que transforma 'old' en 'new' (vacío si son iguales).
+    """
+    changes, removed = [], []
+    _diff(old, new, [], changes, removed)
+    return {"set": changes, "del": removed}
+
+def _diff(old, new, path, changes, removed):
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            if key in old:
+                _diff(old[key], value, path + [key], changes, removed)
+            else:
+                changes.append([path + [key], value])
+        for key in old:
+            if key not in new:
+                removed.append(path + [key])
+    elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        for index, (a, b) in enumerate(zip(old, new)):
+            _diff(a, b, path + [index], changes, removed)
+    elif type(old) is not type(new) or old != new:
+        changes.append([path, new])
+
+def is_empty(delta):
+    return not delta["set"] and not delta["del"]
+
+def apply(base, delta):
+    """
+    Aplica un delta sobre 'base' (que se modifica) y devuelve el resultado.
+    """
+    for path, value in delta["set"]:
+        if not path:
+            base = value
+            continue
+        parent = base
+        for key in path[:-1]:
+            parent = parent[key]
+        parent[path[-1]] = value
+    for path in delta["del"]:
+        parent = base
+        for key in path[:-1]:
+            parent = parent[key]
+        parent.pop(path[-1], None)
+    return base
+
+def format_path(path):
+    """
+    Ruta legible: ["a", 0, "b"] -> "a[0].b" ("$" para la raíz).
+    """
+    text = ""
+    for key in path:
+        text += f"[{key}]" if isinstance(key, int) else (f".{key}" if text else str(key))
+    return text or "$"
+
+def describe(delta):
+    """
+    Vista de un delta para el diálogo de detalle: solo los campos cambiados y los eliminados.
+    """
+    view = {"cambios": {format_path(path): value for path, value in delta["set"]}}
+    if delta["del"]:
+        view["eliminados"] = [format_path(path) for path in delta["del"]]
+    return view
+
+def _decode(payload):
+    # Los bytes que no son JSON se quedan tal cual (y se guardan siempre completos)
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        try:
+            return json.loads(bytes(payload))
+        except ValueError:
+            return payload
+    return payload
+
+class DeltaEncoder:
+    """
+    Codificador por flujo (p. ej. realm + topic): el primer mensaje y uno de cada
+    'keyframe_interval' se guardan completos; el resto, como delta respecto al anterior.
+    """
+    def __init__(self, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        self.keyframe_interval = max(1, keyframe_interval)
+        self._last = {}      # flujo -> último payload
+        self._since_key = {} # flujo -> mensajes desde el último keyframe
+
+    def reset(self):
+        self._last.clear()
+        self._since_key.clear()
+
+    def encode(self, stream, payload):
+        """
+        Devuelve (es_keyframe, datos): el payload completo o su delta respecto al anterior del flujo.
+        Los payloads en bytes (passthrough) se decodifican como JSON antes de compararlos.
+        """
+        payload = _decode(payload)
+        first = stream not in self._last
+        previous = self._last.get(stream)
+        self._last[stream] = payload
+        count = self._since_key.get(stream, 0)
+        structured = isinstance(payload, (dict, list)) and isinstance(previous, (dict, list))
+        if first or count + 1 >= self.keyframe_interval or not structured:
+            self._since_key[stream] = 0
+            return True, payload
+        self._since_key[stream] = count + 1
+        return False, diff(previous, payload)
@@ -0,0 +1,315 @@
+# common/netProcess.py
+"""
+Proceso de red separado: las sesiones WAMP viven en un proceso hijo con su propio intérprete (y
+GIL), de modo que el tráfico no compite con el repintado de la interfaz ni al revés.
+- Eventos recibidos: el hijo los escribe en un anillo de memoria compartida (common.shmRing) como
+  tramas [instante, realm, topic, payload JSON]; la interfaz las lee en su hilo sin copias intermedias.
+- Control: un Pipe de multiprocessing con órdenes ("subscribe", "publish", "close", "stop") hacia el
+  hijo y respuestas ("joined", "left", "published", "error") hacia el padre.
+"""
+import time, queue, struct, threading, multiprocessing
+from common.shmRing import ShmRing, DEFAULT_CAPACITY
+from common.payload import DEFAULT_PAYLOAD_MODE
+
+# Cabecera de cada trama de evento: instante (epoch s), longitud del realm y del topic
+_FRAME_HEADER = struct.Struct("<dHH")
+
+def encode_frame(ts, realm, topic, payload):
+    """
+    Partes de una trama (realm/topic en bytes UTF-8 y payload en bytes JSON) para ShmRing.write.
+    """
+    return _FRAME_HEADER.pack(ts, len(realm), len(topic)), realm, topic, payload
+
+def decode_frame(view):
+    """
+    (instante, realm, topic, payload) de una trama. El payload es una vista sobre el anillo:
+    hay que copiarlo (bytes(payload)) si se va a conservar.
+    """
+    ts, realm_len, topic_len = _FRAME_HEADER.unpack_from(view)
+    start = _FRAME_HEADER.size
+    realm = str(view[start:start + realm_len], "utf-8")
+    start += realm_len
+    topic = str(view[start:start + topic_len], "utf-8")
+    return ts, realm, topic, view[start + topic_len:]
+
+class _NetworkNode:
+    """
+    Estado del proceso hijo: una sesión por (url, realm) en un único bucle asyncio.
+    """
+    def __init__(self, loop, ring, conn):
+        self.loop = loop
+        self.ring = ring
+        self.conn = conn
+        self.sessions = {}
+        self.pending = {}
+        self.backlog = {}
+        self._replies = queue.Queue()
+
+    def reply(self, *message):
+        # El bucle de red nunca espera al Pipe: las respuestas salen desde un hilo propio
+        self._replies.put(message)
+
+    def send_replies(self):
+        while True:
+            message = self._replies.get()
+            try:
+                self.conn.send(message)
+            except (OSError, EOFError):
+                return
+
+    def receive(self):
+        # Hilo lector del Pipe: cada orden se ejecuta en el bucle de red
+        while True:
+            try:
+                command = self.conn.recv()
+            except (EOFError, OSError):
+                command = ("stop",)
+            self.loop.call_soon_threadsafe(self.dispatch, command)
+            if command[0] == "stop":
+                return
+
+    def dispatch(self, command):
+        import asyncio
+        kind, args = command[0], command[1:]
+        if kind == "stop":
+            for session in list(self.sessions.values()):
+                session.leave()
+            self.loop.call_later(0.5, self.loop.stop)
+        elif kind == "subscribe":
+            asyncio.ensure_future(self._subscribe(*args))
+        elif kind == "publish":
+            self.publish(*args)
+        elif kind == "close":
+            session = self.sessions.get(tuple(args))
+            if session is not None:
+                session.leave()
+
+    async def _session(self, url, realm):
+        import asyncio
+        from common.transports import connect
+        key = (url, realm)
+        if key in self.sessions:
+            return self.sessions[key]
+        if key not in self.pending:
+            self.pending[key] = asyncio.get_running_loop().create_future()
+            node = self
+
+            def make_session(config):
+                return _make_session_class()(config, node, key)
+            try:
+                await connect(url, realm, make_session)
+            except Exception as e:
+                self.pending.pop(key).set_exception(e)
+        return await asyncio.shield(self.pending[key])
+
+    def on_joined(self, key, session):
+        self.sessions[key] = session
+        future = self.pending.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(session)
+        self.reply("joined", *key)
+
+    def on_left(self, key, reason):
+        self.sessions.pop(key, None)
+        future = self.pending.pop(key, None)
+        if future is not None and not future.done():
+            future.set_exception(ConnectionError(reason))
+        self.reply("left", *key, reason)
+
+    async def _subscribe(self, url, realm, topics):
+        try:
+            session = await self._session(url, realm)
+            for topic in topics:
+                await session.subscribe(self._make_handler(realm, topic), topic)
+        except Exception as e:
+            self.reply("error", f"Suscripción en {realm}@{url}: {e}")
+
+    def _make_handler(self, realm, topic):
+        from common.payload import decode_event, encode_json
+        realm_bytes, topic_bytes = realm.encode("utf-8"), topic.encode("utf-8")
+        write = self.ring.write
+
+        def handler(*args, **kwargs):
+            # Los payloads passthrough (bytes) se copian al anillo tal cual, sin decodificarlos
+            write(*encode_frame(time.time(), realm_bytes, topic_bytes, encode_json(decode_event(args, kwargs))))
+        return handler
+
+    def publish(self, request, url, realm, topic, payload, mode, acknowledge):
+        import asyncio
+        key = (url, realm)
+        session = self.sessions.get(key)
+        if session is not None and key not in self.backlog:
+            self._publish_now(session, request, topic, payload, mode, acknowledge)
+            return
+        # Sin sesión todavía: las publicaciones esperan en orden a que se una
+        if key not in self.backlog:
+            self.backlog[key] = []
+            asyncio.ensure_future(self._flush_backlog(key))
+        self.backlog[key].append((request, topic, payload, mode, acknowledge))
+
+    async def _flush_backlog(self, key):
+        try:
+            session = await self._session(*key)
+        except Exception as e:
+            for request, *_ in self.backlog.pop(key, []):
+                self.reply("published", request, str(e))
+            return
+        for item in self.backlog.pop(key, []):
+            self._publish_now(session, *item)
+
+    def _publish_now(self, session, request, topic, payload, mode, acknowledge):
+        from common.payload import publish_payload
+        try:
+            result = publish_payload(session, topic, payload, mode, acknowledge)
+        except Exception as e:
+            self.reply("published", request, str(e))
+            return
+        if acknowledge:
+            def done(future):
+                error = None if future.cancelled() or future.exception() is None else str(future.exception())
+                self.reply("published", request, error)
+            result.add_done_callback(done)
+
+def _make_session_class():
+    from autobahn.asyncio.wamp import ApplicationSession
+    from common.payload import enable_passthrough
+
+    class RingSession(ApplicationSession):
+        def __init__(self, config, node, key):
+            super().__init__(config)
+            self.node = node
+            self.key = key
+
+        async def onJoin(self, details):
+            enable_passthrough(self)
+            self.node.on_joined(self.key, self)
+
+        def onLeave(self, details):
+            self.node.on_left(self.key, details.reason)
+            super().onLeave(details)
+
+        def onDisconnect(self):
+            if self.key in self.node.sessions or self.key in self.node.pending:
+                self.node.on_left(self.key, "disconnected")
+    return RingSession
+
+def _child_main(ring_name, conn):
+    import asyncio
+    from common.wampRuntime import new_event_loop
+    ring = ShmRing(ring_name)
+    loop = new_event_loop()
+    asyncio.set_event_loop(loop)
+    node = _NetworkNode(loop, ring, conn)
+    threading.Thread(target=node.receive, name="wamp-net-control", daemon=True).start()
+    threading.Thread(target=node.send_replies, name="wamp-net-replies", daemon=True).start()
+    try:
+        loop.run_forever()
+    finally:
+        loop.close()
+        ring.close()
+
+class NetworkProcess:
+    """
+    Lado de la interfaz. start() crea el anillo y lanza el hijo; subscribe()/publish() envían
+    órdenes; events() lee los eventos del anillo y replies() las respuestas de control, ambos sin
+    bloquear (pensados para un QTimer).
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.ring = None
+        self.process = None
+        self.conn = None
+        self._requests = 0
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self.ring = ShmRing(capacity=self.capacity, create=True)
+        # spawn: el hijo no hereda el estado de Qt ni los hilos del proceso de la interfaz
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_child_main, args=(self.ring.name, child_conn),
+                                       name="wamp-net", daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def subscribe(self, url, realm, topics):
+        self.start()
+        self.conn.send(("subscribe", url, realm, list(topics)))
+
+    def publish(self, url, realm, topic, payload, mode=DEFAULT_PAYLOAD_MODE, acknowledge=False):
+        """
+        Publica desde el hijo y devuelve el número de petición. Solo se responde ("published",
+        petición, error) si se pide confirmación o si la publicación falla.
+        """
+        self.start()
+        self._requests += 1
+        self.conn.send(("publish", self._requests, url, realm, topic, payload, mode, acknowledge))
+        return self._requests
+
+    def close_session(self, url, realm):
+        if self.running:
+            self.conn.send(("close", url, realm))
+
+    def events(self, limit=None):
+        """
+        Eventos pendientes como (instante, realm, topic, payload en memoryview). Cada payload es
+        válido hasta pedir el siguiente evento.
+        """
+        if self.ring is None:
+            return
+        for view in self.ring.drain(limit):
+            yield decode_frame(view)
+
+    def replies(self):
+        while self.conn is not None and self.conn.poll():
+            try:
+                yield self.conn.recv()
+            except (EOFError, OSError):
+                return
+
+    def stats(self):
+        if self.ring is None:
+            return {"running": False, "pending_bytes": 0, "dropped": 0}
+        return {"running": self.running, "pending_bytes": self.ring.used, "dropped": self.ring.dropped}
+
+    def stop(self, timeout=2.0):
+        if self.process is None:
+            return
+        try:
+            self.conn.send(("stop",))
+        except (OSError, EOFError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        self.ring.close()
+        self.process, self.conn, self.ring = None, None, None
+
+_network_process = None
+
+def get_network_process():
+    """
+    Proceso de red compartido de la aplicación (se lanza al primer subscribe/publish).
+    """
+    global _network_process
+    if _network_process is None:
+        _network_process = NetworkProcess()
+    return _network_process
+
+def network_process_stats():
+    """
+    Estado del proceso de red sin lanzarlo: None si no se ha usado.
+    """
+    if _network_process is None or _network_process.ring is None:
+        return None
+    return _network_process.stats()
+
+def shutdown_network_process():
+    if _network_process is not None:
+        _network_process.stop()
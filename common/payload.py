@@ -0,0 +1,110 @@
+# common/payload.py
+"""
+Codificación del payload WAMP, compartida por publicador y suscriptor.
+Modos de envío:
+  kwargs  las claves de primer nivel de un dict van como kwargs (comportamiento histórico)
+  arg     el mensaje completo como único argumento posicional
+  raw     bytes JSON ya codificados con payload passthrough: el router los reenvía sin decodificarlos
+En recepción, decode_event() devuelve el payload tal cual llega (sin reconstruir args/kwargs) y
+payload_text() lo codifica una sola vez para el log y el almacén de payloads.
+El passthrough usa el códec de payload de autobahn (PassthroughCodec): las sesiones que publican
+o reciben payloads raw deben activarlo con enable_passthrough(session).
+"""
+import json
+
+PAYLOAD_KWARGS = "kwargs"
+PAYLOAD_ARG = "arg"
+PAYLOAD_RAW = "raw"
+PAYLOAD_MODES = [PAYLOAD_KWARGS, PAYLOAD_ARG, PAYLOAD_RAW]
+PAYLOAD_MODE_LABELS = {
+    PAYLOAD_KWARGS: "Claves como kwargs",
+    PAYLOAD_ARG: "Objeto como argumento",
+    PAYLOAD_RAW: "Binario (passthrough)",
+}
+DEFAULT_PAYLOAD_MODE = PAYLOAD_KWARGS
+
+# Esquema de payload passthrough propio (los esquemas de aplicación deben empezar por "x_")
+PPT_SCHEME = "x_wampy"
+PPT_SERIALIZER = "json"
+
+class RawPayload(bytes):
+    """
+    Marca un único argumento de publicación como payload passthrough ya codificado.
+    """
+
+class PassthroughCodec:
+    """
+    Códec de payload (IPayloadCodec de autobahn). Al publicar solo codifica las publicaciones
+    cuyo único argumento es un RawPayload; el resto se envía de forma normal. Al recibir entrega
+    los bytes tal cual como único argumento, sea cual sea el esquema con que se enviaron.
+    """
+    def encode(self, is_originating, uri, args=None, kwargs=None):
+        if args and len(args) == 1 and not kwargs and isinstance(args[0], RawPayload):
+            from autobahn.wamp.types import EncodedPayload
+            return EncodedPayload(bytes(args[0]), PPT_SCHEME, PPT_SERIALIZER)
+        return None
+
+    def decode(self, is_originating, uri, encoded_payload):
+        return uri, [encoded_payload.payload], None
+
+def enable_passthrough(session):
+    """
+    Activa el códec passthrough en la sesión (si no tiene ya otro).
+    """
+    if session.get_payload_codec() is None:
+        session.set_payload_codec(PassthroughCodec())
+
+def encode_json(message):
+    """
+    Codifica un mensaje en bytes JSON compactos (los bytes se devuelven sin tocar).
+    """
+    if isinstance(message, (bytes, bytearray)):
+        return bytes(message)
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+def _kwargs_safe(message):
+    # Solo se pueden repartir como kwargs las claves que son identificadores y no chocan con 'options'
+    return isinstance(message, dict) and all(isinstance(k, str) and k.isidentifier() and k != "options" for k in message)
+
+def publish_payload(session, topic, message, mode=DEFAULT_PAYLOAD_MODE, acknowledge=False):
+    """
+    Publica 'message' en el modo indicado y devuelve lo que devuelva session.publish (el futuro
+    de la confirmación si acknowledge=True). En modo kwargs, un dict con claves que no pueden ser
+    kwargs (p. ej. "a-b", "1" u "options") se envía como argumento posicional.
+    """
+    options = {}
+    if acknowledge:
+        options["acknowledge"] = True
+    if mode == PAYLOAD_RAW:
+        enable_passthrough(session)
+        args, kwargs = (RawPayload(encode_json(message)),), {}
+    elif mode == PAYLOAD_KWARGS and _kwargs_safe(message):
+        args, kwargs = (), message
+    else:
+        args, kwargs = (message,), {}
+    if options:
+        # autobahn solo extrae 'options' si es un PublishOptions; si no, se pasaría como kwarg más
+        from autobahn.wamp.types import PublishOptions
+        return session.publish(topic, *args, options=PublishOptions(**options), **kwargs)
+    return session.publish(topic, *args, **kwargs)
+
+def decode_event(args, kwargs):
+    """
+    Payload de un evento recibido, sin copiarlo: un único argumento (objeto o bytes en passthrough)
+    se devuelve tal cual, y solo kwargs devuelve el propio dict de kwargs.
+    """
+    if kwargs:
+        if not args:
+            return kwargs
+        return {"args": list(args), "kwargs": kwargs}
+    if len(args) == 1:
+        return args[0]
+    return list(args) if args else {}
+
+def payload_text(payload):
+    """
+    Texto JSON del payload para log/almacén. Los bytes en passthrough ya son JSON y solo se decodifican.
+    """
+    if isinstance(payload, (bytes, bytearray)):
+        return bytes(payload).decode("utf-8", errors="replace")
+    return json.dumps(payload, ensure_ascii=False, default=str)
@@ -0,0 +1,137 @@
+# common/payloadStore.py
+import os, json, tempfile, threading, weakref
+from collections import OrderedDict
+
+# Presupuesto por defecto de payloads en memoria (bytes codificados)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+def _remove_segment(fileobj, path):
+    try:
+        fileobj.close()
+    except Exception:
+        pass
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class PayloadStore:
+    """
+    Almacén de payloads con presupuesto de memoria.
+    Los payloads recientes se guardan en memoria codificados en JSON bajo una política LRU
+    hasta 'max_bytes'. Los que salen de la caché se vuelcan a un segmento en disco de solo
+    anexado y se recargan bajo demanda. Las claves son enteros consecutivos (índice de fila).
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._cache = OrderedDict()   # clave -> bytes JSON
+        self._offsets = {}            # clave -> (offset, longitud) en el segmento
+        self._mem_bytes = 0
+        self._count = 0
+        self._segment = None
+        self._segment_path = None
+        self._segment_size = 0
+        self._finalizer = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def put(self, payload, encoded=None):
+        """
+        Guarda un payload y devuelve su clave. Si ya se dispone de la codificación JSON
+        se puede pasar en 'encoded' (str o bytes) para no volver a serializar.
+        """
+        if encoded is None:
+            encoded = json.dumps(payload, ensure_ascii=False, default=str)
+        if isinstance(encoded, str):
+            encoded = encoded.encode("utf-8")
+        with self._lock:
+            key = self._count
+            self._count += 1
+            self._cache[key] = encoded
+            self._mem_bytes += len(encoded)
+            self._evict()
+        return key
+
+    def get(self, key):
+        with self._lock:
+            if not 0 <= key < self._count:
+                raise KeyError(key)
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+            else:
+                data = self._read_segment(key)
+                # Se promociona de nuevo a memoria; ya está en disco, no se reescribe
+                self._cache[key] = data
+                self._mem_bytes += len(data)
+                self._evict()
+        try:
+            return json.loads(data)
+        except ValueError:
+            # Payload binario (passthrough) que no es JSON: se muestra como texto
+            return data.decode("utf-8", errors="replace")
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._offsets.clear()
+            self._mem_bytes = 0
+            self._count = 0
+            self._close_segment()
+
+    def close(self):
+        self.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "count": self._count,
+                "memory_items": len(self._cache),
+                "memory_bytes": self._mem_bytes,
+                "disk_items": len(self._offsets),
+                "disk_bytes": self._segment_size,
+            }
+
+    def _evict(self):
+        # Saca de memoria los menos usados hasta volver al presupuesto (el más reciente siempre se queda)
+        while self._mem_bytes > self.max_bytes and len(self._cache) > 1:
+            key, data = self._cache.popitem(last=False)
+            self._mem_bytes -= len(data)
+            if key not in self._offsets:
+                self._append_segment(key, data)
+
+    def _open_segment(self):
+        fd, path = tempfile.mkstemp(prefix="wampy_payloads_", suffix=".seg", dir=self.directory)
+        self._segment = os.fdopen(fd, "a+b")
+        self._segment_path = path
+        self._segment_size = 0
+        # El segmento se borra al destruir el almacén o al salir del proceso
+        self._finalizer = weakref.finalize(self, _remove_segment, self._segment, path)
+
+    def _close_segment(self):
+        if self._finalizer is not None:
+            self._finalizer()
+        self._finalizer = None
+        self._segment = None
+        self._segment_path = None
+        self._segment_size = 0
+
+    def _append_segment(self, key, data):
+        if self._segment is None:
+            self._open_segment()
+        self._segment.seek(0, os.SEEK_END)
+        self._segment.write(data)
+        self._offsets[key] = (self._segment_size, len(data))
+        self._segment_size += len(data)
+
+    def _read_segment(self, key):
+        offset, length = self._offsets[key]
+        self._segment.flush()
+        self._segment.seek(offset)
+        return self._segment.read(length)
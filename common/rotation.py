@@ -0,0 +1,341 @@
+# common/rotation.py
+import io, os, gzip, json, time, shutil, logging, datetime, threading, queue
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+COMPRESSION_NONE = "none"
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_ZSTD = "zstd"
+COMPRESSION_SUFFIX = {COMPRESSION_NONE: "", COMPRESSION_GZIP: ".gz", COMPRESSION_ZSTD: ".zst"}
+# Errores al leer un segmento comprimido que quedó a medias (el proceso terminó escribiéndolo)
+TRUNCATION_ERRORS = (EOFError,) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+def available_compressions():
+    """
+    Compresiones disponibles en este entorno (zstd solo si está instalado 'zstandard').
+    """
+    modes = [COMPRESSION_NONE, COMPRESSION_GZIP]
+    if zstandard is not None:
+        modes.append(COMPRESSION_ZSTD)
+    return modes
+
+def open_compressed(path, mode="rb"):
+    """
+    Abre un fichero posiblemente comprimido según su extensión (.gz, .zst o sin comprimir).
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("Se necesita el paquete 'zstandard' para leer ficheros .zst")
+        raw = open(path, mode)
+        if "r" in mode:
+            # El stream_reader de zstandard no se puede recorrer por líneas: se envuelve en un búfer
+            return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+        return zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+    return open(path, mode)
+
+def _lock(fileobj):
+    # El bloqueo se suelta al cerrar el fichero o al morir el proceso
+    if fcntl is None:
+        return
+    try:
+        fcntl.flock(fileobj.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except (OSError, ValueError, AttributeError):
+        # Flujos sin descriptor propio (p. ej. zstd) o sistemas de ficheros sin flock
+        pass
+
+def segment_in_use(path, max_idle=0):
+    """
+    Si algún proceso vivo está escribiendo el segmento (SegmentWriter lo bloquea con flock). Sin
+    fcntl (Windows) se considera en uso si se modificó hace menos de 'max_idle' segundos.
+    """
+    if fcntl is None:
+        return bool(max_idle) and time.time() - os.path.getmtime(path) < max_idle
+    try:
+        with open(path, "rb") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+    return False
+
+class SegmentWriter:
+    """
+    Escritura de bytes en segmentos que rotan por tamaño ('max_bytes', sin comprimir) y/o por
+    tiempo ('max_seconds'); 0 desactiva cada límite. Con compresión, cada segmento es un flujo
+    gzip/zstd independiente. 'on_close(info)' se llama al cerrar cada segmento con su ruta,
+    intervalo de tiempo (epoch) de los registros, bytes y número de registros.
+    El segmento abierto queda bloqueado (flock) mientras se escribe: ver segment_in_use().
+    No es seguro entre hilos: debe usarlo un único hilo escritor.
+    """
+    def __init__(self, directory, prefix, suffix, max_bytes=0, max_seconds=0, compression=COMPRESSION_NONE, on_close=None):
+        if compression not in COMPRESSION_SUFFIX:
+            raise ValueError(f"Compresión desconocida: {compression}")
+        if compression == COMPRESSION_ZSTD and zstandard is None:
+            raise ValueError("La compresión zstd necesita el paquete 'zstandard'")
+        self.directory = directory
+        self.prefix = prefix
+        self.suffix = suffix + COMPRESSION_SUFFIX[compression]
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.compression = compression
+        self.on_close = on_close
+        self.segments = []
+        self._file = None
+        self._info = None
+
+    @property
+    def current_path(self):
+        return self._info["path"] if self._info else None
+
+    def _open(self, ts):
+        # El directorio se crea con el primer registro, no al construir el escritor
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d_%H%M%S")
+        path = os.path.join(self.directory, f"{self.prefix}_{stamp}{self.suffix}")
+        n = 1
+        while any(os.path.exists(path + ext) for ext in ("", ".gz", ".zst")):
+            # Varios segmentos en el mismo segundo (también los ya comprimidos en segundo plano)
+            path = os.path.join(self.directory, f"{self.prefix}_{stamp}_{n}{self.suffix}")
+            n += 1
+        self._file = open_compressed(path, "wb")
+        _lock(self._file)
+        self._info = {"path": path, "opened": time.time(), "start": None, "end": None, "bytes": 0, "records": 0}
+
+    def _due(self, now):
+        info = self._info
+        if self.max_bytes and info["bytes"] >= self.max_bytes:
+            return True
+        return bool(self.max_seconds) and now - info["opened"] >= self.max_seconds
+
+    def write(self, data, ts=None, records=1):
+        """
+        Escribe 'data' (bytes) con 'records' registros cuyo instante más reciente es 'ts'.
+        """
+        now = time.time()
+        ts = now if ts is None else ts
+        if self._file is not None and self._due(now):
+            self.rotate()
+        if self._file is None:
+            self._open(ts)
+        self._file.write(data)
+        info = self._info
+        if info["start"] is None:
+            info["start"] = ts
+        info["end"] = ts
+        info["bytes"] += len(data)
+        info["records"] += records
+
+    def write_records(self, records):
+        """
+        Escribe una lista de registros (instante, bytes) en escrituras agrupadas, cortándola donde el
+        segmento llega a 'max_bytes': un segmento solo supera el límite si un único registro no cabe.
+        """
+        start = 0
+        while start < len(records):
+            used = self._info["bytes"] if self._info else 0
+            room = self.max_bytes - used if self.max_bytes else None
+            if room is not None and used and len(records[start][1]) > room:
+                self.rotate()
+                room = self.max_bytes
+            end, size = start, 0
+            while end < len(records) and (room is None or end == start or size + len(records[end][1]) <= room):
+                size += len(records[end][1])
+                end += 1
+            self.write(b"".join(data for _, data in records[start:end]), ts=records[end - 1][0], records=end - start)
+            start = end
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def rotate(self):
+        """
+        Cierra el segmento actual; el siguiente write() abre uno nuevo.
+        """
+        if self._file is None:
+            return
+        self._file.close()
+        info, self._file, self._info = self._info, None, None
+        self.segments.append(info)
+        if self.on_close is not None:
+            self.on_close(info)
+
+    def close(self):
+        self.rotate()
+
+class LogArchive:
+    """
+    Gestión de los segmentos cerrados de un directorio: los comprime con gzip en un hilo de fondo,
+    aplica los límites de retención (número de segmentos, bytes totales y antigüedad; 0 = sin límite)
+    y mantiene 'manifest.json' con el intervalo de tiempo de cada segmento.
+    """
+    MANIFEST = "manifest.json"
+
+    def __init__(self, directory, max_segments=0, max_total_bytes=0, max_age_days=0):
+        self.directory = directory
+        self.max_segments = max_segments
+        self.max_total_bytes = max_total_bytes
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._worker_started = False
+        self._entries = None
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, self.MANIFEST)
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f).get("segments", [])
+            except (OSError, ValueError):
+                self._entries = []
+        return self._entries
+
+    def _save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"segments": self._entries}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.manifest_path)
+
+    def segments(self, start=None, end=None):
+        """
+        Segmentos del manifiesto (ordenados por tiempo) que se solapan con [start, end] (epoch).
+        """
+        with self._lock:
+            entries = list(self._load())
+        return [e for e in entries
+                if (start is None or e["end"] is None or e["end"] >= start) and (end is None or e["start"] is None or e["start"] <= end)]
+
+    def add(self, info):
+        """
+        Registra un segmento recién cerrado (info de SegmentWriter) y encola su compresión.
+        """
+        entry = {"file": os.path.basename(info["path"]), "start": info["start"], "end": info["end"],
+                 "records": info["records"], "bytes": os.path.getsize(info["path"]), "compressed": False}
+        with self._lock:
+            self._load().append(entry)
+            self._entries.sort(key=lambda e: e["start"] or 0)
+            self._save()
+        self._enqueue(entry["file"])
+
+    def _enqueue(self, name):
+        with self._lock:
+            if not self._worker_started:
+                self._worker_started = True
+                threading.Thread(target=self._worker, name="log-archive", daemon=True).start()
+        self._queue.put(name)
+
+    def _worker(self):
+        while True:
+            name = self._queue.get()
+            try:
+                self._compress(name)
+                self._apply_retention()
+            except OSError as e:
+                logging.error(f"Error al archivar el segmento {name}: {e}")
+
+    def _compress(self, name):
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.remove(path)
+        with self._lock:
+            for entry in self._load():
+                if entry["file"] == name:
+                    entry["file"] = name + ".gz"
+                    entry["bytes"] = os.path.getsize(path + ".gz")
+                    entry["compressed"] = True
+            self._save()
+
+    def _apply_retention(self):
+        with self._lock:
+            entries = self._load()
+            removed = []
+            now = time.time()
+            def over_limit():
+                if self.max_segments and len(entries) > self.max_segments:
+                    return True
+                if self.max_total_bytes and sum(e["bytes"] for e in entries) > self.max_total_bytes:
+                    return True
+                oldest = entries[0]["end"] if entries else None
+                return bool(self.max_age_days and oldest and now - oldest > self.max_age_days * 86400)
+            while entries and over_limit():
+                removed.append(entries.pop(0))
+            if removed:
+                self._save()
+        for entry in removed:
+            try:
+                os.remove(os.path.join(self.directory, entry["file"]))
+            except OSError:
+                pass
+
+    def recover(self, prefix, suffix, parse_start=None, active=None, max_idle=0):
+        """
+        Registra y comprime los segmentos que quedaron sin archivar en ejecuciones anteriores
+        (el último segmento de cada ejecución se cierra al salir y puede no haberse comprimido).
+        'active()' devuelve la ruta del segmento abierto ahora mismo, que no se toca; tampoco los
+        que otra instancia en marcha sigue escribiendo (segment_in_use con 'max_idle').
+        """
+        if not os.path.isdir(self.directory):
+            return
+        with self._lock:
+            known = {e["file"] for e in self._load()}
+        for name in sorted(os.listdir(self.directory)):
+            if not (name.startswith(prefix) and name.endswith(suffix)):
+                continue
+            path = os.path.join(self.directory, name)
+            if (active is not None and active() == path) or segment_in_use(path, max_idle):
+                continue
+            if name in known:
+                self._enqueue(name)
+                continue
+            if os.path.getsize(path) == 0:
+                os.remove(path)
+                continue
+            start = parse_start(path) if parse_start else None
+            self.add({"path": path, "start": start, "end": os.path.getmtime(path), "records": None})
+
+class SegmentLogHandler(logging.Handler):
+    """
+    Handler de logging que escribe en segmentos rotados (SegmentWriter, texto sin comprimir) y
+    entrega cada segmento cerrado a un LogArchive.
+    """
+    def __init__(self, writer, archive=None):
+        super().__init__()
+        self.writer = writer
+        self.archive = archive
+        if archive is not None:
+            writer.on_close = archive.add
+
+    def emit(self, record):
+        try:
+            data = (self.format(record) + "\n").encode("utf-8")
+            self.writer.write(data, ts=record.created)
+            self.writer.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.acquire()
+        try:
+            self.writer.close()
+        finally:
+            self.release()
+        super().close()
@@ -0,0 +1,246 @@
+# common/searchIndex.py
+"""
+Índice invertido incremental para buscar mensajes recibidos.
+Por cada fila se indexan, en minúsculas, las palabras del topic, de los nombres de campo y de los
+valores de texto y numéricos del payload; cada palabra de un valor se indexa también cualificada
+por su campo ("estado:activo"). Las listas de filas son array('I') que solo crecen por el final
+(las filas llegan en orden), así que añadir es barato y las búsquedas solo cruzan listas.
+Consulta: términos separados por espacios que deben cumplirse todos:
+  palabra        filas que contienen la palabra
+  campo:palabra  la palabra en un valor del campo (topic:palabra busca en el topic)
+  palabra*       prefijo (también campo:pref*)
+De cada payload solo se indexa una parte acotada (MAX_INDEX_BYTES, MAX_TOKENS, MAX_NODES), y
+IndexWorker hace el trabajo en un hilo propio para no frenar la interfaz.
+"""
+import re, json, queue, bisect, itertools, threading
+from array import array
+
+_WORD = re.compile(r"\w+")
+# Las palabras más largas se recortan (identificadores, hashes, base64...)
+MAX_WORD_LENGTH = 64
+# Palabras nuevas por encima de las cuales el vocabulario ordenado se reordena entero en vez de insertarlas
+RESORT_THRESHOLD = 2048
+TOPIC_FIELD = "topic"
+# Límites por mensaje: los payloads en bytes más grandes no se decodifican (se indexan las palabras
+# del principio) y el recorrido se detiene al llegar a MAX_TOKENS claves o MAX_NODES valores
+MAX_INDEX_BYTES = 256 * 1024
+MAX_TOKENS = 1024
+MAX_NODES = 20000
+# Mensajes que el hilo de IndexWorker indexa de una vez
+INDEX_BATCH = 1000
+
+def words(text):
+    return [word[:MAX_WORD_LENGTH] for word in _WORD.findall(text.lower())]
+
+def _collect(value, tokens):
+    # Recorrido con pila (sin recursión) que se corta al agotar el presupuesto de claves o de valores
+    stack = [(value, None)]
+    nodes = 0
+    while stack and nodes < MAX_NODES and len(tokens) < MAX_TOKENS:
+        value, field = stack.pop()
+        nodes += 1
+        if isinstance(value, dict):
+            for key, item in itertools.islice(value.items(), MAX_NODES - nodes):
+                if len(tokens) >= MAX_TOKENS:
+                    break
+                key = str(key).lower()
+                tokens.update(words(key))
+                stack.append((item, key))
+        elif isinstance(value, list):
+            stack.extend((item, field) for item in itertools.islice(value, MAX_NODES - nodes))
+        elif isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            for word in words(value if isinstance(value, str) else repr(value)):
+                if len(tokens) >= MAX_TOKENS:
+                    break
+                tokens.add(word)
+                if field:
+                    tokens.add(f"{field}:{word}")
+
+def payload_tokens(topic, payload):
+    """
+    Conjunto de claves de índice de un mensaje. Los payloads en bytes (JSON sin decodificar) se
+    decodifican si no pasan de MAX_INDEX_BYTES; si son más grandes o no son JSON se indexan las
+    palabras de sus primeros MAX_INDEX_BYTES.
+    """
+    tokens = set()
+    for word in words(topic or ""):
+        tokens.add(word)
+        tokens.add(f"{TOPIC_FIELD}:{word}")
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        payload = bytes(payload[:MAX_INDEX_BYTES + 1])
+        try:
+            if len(payload) > MAX_INDEX_BYTES:
+                raise ValueError("payload demasiado grande")
+            payload = json.loads(payload)
+        except ValueError:
+            payload = payload[:MAX_INDEX_BYTES].decode("utf-8", errors="replace")
+    _collect(payload, tokens)
+    return tokens
+
+class Query:
+    """
+    Consulta ya analizada: lista de (clave, es_prefijo). Vacía = sin filtro.
+    """
+    def __init__(self, text):
+        self.text = text
+        self.terms = []
+        for part in text.split():
+            prefix = part.endswith("*")
+            field, sep, value = part.rstrip("*").partition(":")
+            if not sep:
+                field, value = "", field
+            field = field.lower()
+            parts = words(value)
+            if not parts and field:
+                # "campo:" solo: filas que tienen ese campo
+                self.terms.extend((word, False) for word in words(field))
+                continue
+            for i, word in enumerate(parts):
+                key = f"{field}:{word}" if field else word
+                self.terms.append((key, prefix and i == len(parts) - 1))
+
+    def __bool__(self):
+        return bool(self.terms)
+
+    def accepts(self, tokens):
+        """
+        Si un mensaje con estas claves (payload_tokens) cumple la consulta.
+        """
+        for key, prefix in self.terms:
+            if prefix:
+                if not any(token.startswith(key) for token in tokens):
+                    return False
+            elif key not in tokens:
+                return False
+        return True
+
+class SearchIndex:
+    def __init__(self):
+        self.postings = {}
+        self.rows = 0
+        # Vocabulario ordenado para las búsquedas por prefijo; se pone al día al consultar
+        self._vocabulary = []
+        self._new_words = []
+
+    def add(self, row, topic, payload):
+        """
+        Indexa la fila 'row' (las filas deben llegar en orden creciente) y devuelve sus claves.
+        """
+        tokens = payload_tokens(topic, payload)
+        self.add_tokens(row, tokens)
+        return tokens
+
+    def add_tokens(self, row, tokens):
+        """
+        Indexa la fila 'row' con claves ya calculadas (payload_tokens).
+        """
+        postings = self.postings
+        for token in tokens:
+            rows = postings.get(token)
+            if rows is None:
+                rows = postings[token] = array("I")
+                self._new_words.append(token)
+            rows.append(row)
+        self.rows = max(self.rows, row + 1)
+
+    def _rows_for(self, key, prefix):
+        if not prefix:
+            return self.postings.get(key, ())
+        vocabulary = self._sorted_vocabulary()
+        matches = set()
+        for i in range(bisect.bisect_left(vocabulary, key), len(vocabulary)):
+            token = vocabulary[i]
+            if not token.startswith(key):
+                break
+            matches.update(self.postings[token])
+        return matches
+
+    def _sorted_vocabulary(self):
+        if len(self._new_words) > RESORT_THRESHOLD:
+            self._vocabulary = sorted(self.postings)
+        else:
+            for word in self._new_words:
+                bisect.insort(self._vocabulary, word)
+        self._new_words = []
+        return self._vocabulary
+
+    def search(self, query):
+        """
+        Filas (ordenadas) que cumplen la consulta (texto o Query).
+        """
+        if not isinstance(query, Query):
+            query = Query(query)
+        if not query:
+            return list(range(self.rows))
+        candidates = sorted((self._rows_for(key, prefix) for key, prefix in query.terms), key=len)
+        if not candidates[0]:
+            return []
+        result = set(candidates[0])
+        for rows in candidates[1:]:
+            result.intersection_update(rows)
+            if not result:
+                return []
+        return sorted(result)
+
+    def clear(self):
+        self.postings.clear()
+        self.rows = 0
+        self._vocabulary = []
+        self._new_words = []
+
+class IndexWorker:
+    """
+    Indexa los mensajes en un hilo propio: add() solo encola. Las claves se calculan fuera del
+    cerrojo; la inserción en el índice, el cambio de consulta y las búsquedas van dentro, así que cada
+    fila o entra en el resultado de search() o se comprueba contra la consulta nueva.
+    'on_matches(generación, consulta, filas)' se llama desde el hilo con las filas recién indexadas
+    que cumplen la consulta activa. clear() empieza una generación nueva: lo pendiente se descarta.
+    """
+    def __init__(self, index, on_matches):
+        self.index = index
+        self.on_matches = on_matches
+        self.query = Query("")
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+
+    def add(self, row, topic, payload):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="search-index", daemon=True)
+            self._thread.start()
+        self._queue.put((self.generation, row, topic, payload))
+
+    def search(self, query):
+        """
+        Cambia la consulta activa y devuelve sus filas (None si la consulta está vacía).
+        """
+        with self._lock:
+            self.query = query
+            return self.index.search(query) if query else None
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self.index.clear()
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            while len(items) < INDEX_BATCH:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            batch = [(generation, row, payload_tokens(topic, payload)) for generation, row, topic, payload in items]
+            matches = []
+            with self._lock:
+                generation, query = self.generation, self.query
+                for item_generation, row, tokens in batch:
+                    if item_generation != generation:
+                        continue
+                    self.index.add_tokens(row, tokens)
+                    if query and query.accepts(tokens):
+                        matches.append(row)
+            if matches:
+                self.on_matches(generation, query, matches)
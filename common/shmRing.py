@@ -0,0 +1,149 @@
+# common/shmRing.py
+"""
+Anillo de memoria compartida de un productor y un consumidor (SPSC) entre procesos.
+Cada trama es un prefijo de longitud (uint32) seguido de sus bytes, siempre contigua: si no cabe
+antes del final del búfer se escribe una marca de salto y la trama empieza al principio. El
+consumidor recibe las tramas como memoryview sobre la propia memoria compartida (sin copiarlas).
+Las posiciones de escritura y lectura son contadores de 64 bits que solo crecen, cada uno en su
+propia línea de caché; el productor publica una trama escribiendo su posición después de los datos.
+Si el anillo está lleno la trama se descarta (el productor nunca espera) y se cuenta en 'dropped'.
+"""
+import struct
+from multiprocessing import shared_memory
+
+DEFAULT_CAPACITY = 32 * 1024 * 1024
+# Cabecera: posición de escritura (0), de lectura (64), descartes (128) y capacidad (136)
+_WRITE_OFFSET = 0
+_READ_OFFSET = 64
+_DROPPED_OFFSET = 128
+_CAPACITY_OFFSET = 136
+HEADER_SIZE = 192
+_U64 = struct.Struct("<Q")
+_LEN = struct.Struct("<I")
+# Longitud reservada que indica "sigue al principio del búfer"
+_WRAP = 0xFFFFFFFF
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: un hijo de multiprocessing comparte el resource_tracker del padre, que es
+        # quien borra el segmento; registrarlo otra vez no tiene efecto
+        return shared_memory.SharedMemory(name=name)
+
+class ShmRing:
+    """
+    ShmRing(capacity=N, create=True) crea el segmento (el dueño lo borra con close());
+    ShmRing(name) se conecta a uno existente. Un proceso escribe con write() y otro lee con drain().
+    """
+    def __init__(self, name=None, capacity=DEFAULT_CAPACITY, create=False):
+        self.owner = create
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + capacity)
+            self.shm.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+            _U64.pack_into(self.shm.buf, _CAPACITY_OFFSET, capacity)
+        else:
+            self.shm = _attach(name)
+        self.name = self.shm.name
+        self.capacity = _U64.unpack_from(self.shm.buf, _CAPACITY_OFFSET)[0]
+        self._data = self.shm.buf[HEADER_SIZE:HEADER_SIZE + self.capacity]
+        # Cada lado guarda su propia posición; la del otro se lee de la cabecera
+        self._write = _U64.unpack_from(self.shm.buf, _WRITE_OFFSET)[0]
+        self._read = _U64.unpack_from(self.shm.buf, _READ_OFFSET)[0]
+        self._dropped = 0
+
+    @property
+    def dropped(self):
+        return _U64.unpack_from(self.shm.buf, _DROPPED_OFFSET)[0]
+
+    @property
+    def used(self):
+        """
+        Bytes escritos y aún no leídos.
+        """
+        return _U64.unpack_from(self.shm.buf, _WRITE_OFFSET)[0] - _U64.unpack_from(self.shm.buf, _READ_OFFSET)[0]
+
+    def write(self, *parts):
+        """
+        (Productor) Escribe una trama formada por la concatenación de 'parts' (bytes-like) sin unirlas
+        antes. Devuelve False si no hay sitio (la trama se descarta).
+        """
+        size = 0
+        for part in parts:
+            size += len(part)
+        need = _LEN.size + size
+        capacity = self.capacity
+        write = self._write
+        offset = write % capacity
+        tail = capacity - offset
+        skip = tail if tail < need else 0
+        free = capacity - (write - _U64.unpack_from(self.shm.buf, _READ_OFFSET)[0])
+        if need + skip > free:
+            self._dropped += 1
+            _U64.pack_into(self.shm.buf, _DROPPED_OFFSET, self._dropped)
+            return False
+        data = self._data
+        if skip:
+            if tail >= _LEN.size:
+                _LEN.pack_into(data, offset, _WRAP)
+            write += skip
+            offset = 0
+        _LEN.pack_into(data, offset, size)
+        pos = offset + _LEN.size
+        for part in parts:
+            end = pos + len(part)
+            data[pos:end] = part
+            pos = end
+        self._write = write + need
+        # Publicación: la posición se escribe después de los datos de la trama
+        _U64.pack_into(self.shm.buf, _WRITE_OFFSET, self._write)
+        return True
+
+    def drain(self, limit=None):
+        """
+        (Consumidor) Recorre las tramas disponibles como memoryview (como mucho 'limit').
+        Cada vista solo es válida hasta pedir la siguiente: su hueco se libera entonces.
+        """
+        capacity = self.capacity
+        data = self._data
+        read = self._read
+        write = _U64.unpack_from(self.shm.buf, _WRITE_OFFSET)[0]
+        count = 0
+        try:
+            while read < write and (limit is None or count < limit):
+                offset = read % capacity
+                tail = capacity - offset
+                if tail < _LEN.size:
+                    read += tail
+                    continue
+                size = _LEN.unpack_from(data, offset)[0]
+                if size == _WRAP:
+                    read += tail
+                    continue
+                start = offset + _LEN.size
+                view = data[start:start + size]
+                yield view
+                try:
+                    view.release()
+                except BufferError:
+                    # El consumidor exportó la vista (p. ej. numpy): se libera cuando la suelte
+                    pass
+                read += _LEN.size + size
+                _U64.pack_into(self.shm.buf, _READ_OFFSET, read)
+                count += 1
+        finally:
+            self._read = read
+            _U64.pack_into(self.shm.buf, _READ_OFFSET, read)
+
+    def close(self):
+        try:
+            self._data.release()
+            self.shm.close()
+        except BufferError:
+            # Aún quedan vistas del consumidor: el mapeo se libera cuando desaparezcan
+            pass
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
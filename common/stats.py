@@ -0,0 +1,50 @@
+# common/stats.py
+import math
+
+def percentile(sorted_values, p):
+    """
+    Percentil 'p' (0-100) de una lista ya ordenada, con interpolación lineal.
+    """
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100.0
+    f = math.floor(k)
+    c = min(f + 1, len(sorted_values) - 1)
+    return sorted_values[f] + (sorted_values[c] - sorted_values[f]) * (k - f)
+
+class LatencyStats:
+    """
+    Acumula latencias (en segundos) y resume su distribución en milisegundos.
+    """
+    def __init__(self):
+        self.samples = []
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def summary(self):
+        values = sorted(self.samples)
+        if not values:
+            return {"count": 0}
+        ms = 1000.0
+        return {
+            "count": len(values),
+            "min_ms": values[0] * ms,
+            "mean_ms": sum(values) / len(values) * ms,
+            "p50_ms": percentile(values, 50) * ms,
+            "p90_ms": percentile(values, 90) * ms,
+            "p99_ms": percentile(values, 99) * ms,
+            "max_ms": values[-1] * ms,
+        }
+
+def format_summary(summary):
+    """
+    Texto de una línea con el resumen de LatencyStats.summary().
+    """
+    if not summary.get("count"):
+        return "sin muestras"
+    return ("n={count} min={min_ms:.2f} media={mean_ms:.2f} p50={p50_ms:.2f} "
+            "p90={p90_ms:.2f} p99={p99_ms:.2f} max={max_ms:.2f} ms").format(**summary)
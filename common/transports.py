@@ -0,0 +1,159 @@
+# common/transports.py
+"""
+Conexión WAMP según el esquema de la URL del router:
+  ws://, wss://                  WebSocket (con permessage-deflate configurable)
+  rs://, rss://, tcp://, tcps:// RawSocket sobre TCP: sin upgrade HTTP ni framing WebSocket
+  unix:///ruta/router.sock       RawSocket sobre socket Unix (router en el mismo host)
+También se acepta la forma de autobahn rs://unix:/ruta/router.sock.
+"""
+import asyncio
+from collections import namedtuple
+
+TRANSPORT_WEBSOCKET = "websocket"
+TRANSPORT_RAWSOCKET = "rawsocket"
+
+WEBSOCKET_SCHEMES = ("ws", "wss")
+RAWSOCKET_SCHEMES = ("rs", "rss", "tcp", "tcps")
+UNIX_SCHEME = "unix"
+
+# permessage-deflate: None = ofrecerlo con los parámetros por defecto (como ApplicationRunner),
+# False = no ofrecerlo, o un dict de deflate_options()
+DEFAULT_DEFLATE = None
+
+class Endpoint(namedtuple("Endpoint", "kind secure host port path url")):
+    """
+    Destino de una conexión: 'path' solo se usa con sockets Unix (host y port son None).
+    """
+    @property
+    def label(self):
+        if self.path is not None:
+            return f"{UNIX_SCHEME}:{self.path}"
+        return f"{self.kind}{'+tls' if self.secure else ''}://{self.host}:{self.port}"
+
+def parse_endpoint(url):
+    """
+    Interpreta la URL del router. Lanza ValueError si el esquema no es ninguno de los soportados.
+    """
+    scheme, sep, rest = url.partition("://")
+    scheme = scheme.lower()
+    if not sep:
+        raise ValueError(f"URL de router sin esquema: {url}")
+    if scheme in WEBSOCKET_SCHEMES:
+        from autobahn.websocket.util import parse_url
+        secure, host, port, _, _, _ = parse_url(url)
+        return Endpoint(TRANSPORT_WEBSOCKET, secure, host, port, None, url)
+    if scheme == UNIX_SCHEME:
+        if not rest:
+            raise ValueError(f"Falta la ruta del socket Unix: {url}")
+        return Endpoint(TRANSPORT_RAWSOCKET, False, None, None, rest, url)
+    if scheme in RAWSOCKET_SCHEMES:
+        from autobahn.rawsocket.util import parse_url
+        secure, host, port = parse_url(("rss" if scheme in ("rss", "tcps") else "rs") + "://" + rest)
+        if host == "unix":
+            # rs://unix:/ruta.sock -> autobahn devuelve la ruta en 'port'
+            return Endpoint(TRANSPORT_RAWSOCKET, secure, None, None, port, url)
+        return Endpoint(TRANSPORT_RAWSOCKET, secure, host, port, None, url)
+    raise ValueError(f"Esquema de URL no soportado: {scheme}:// (use ws, wss, rs, tcp o unix)")
+
+def deflate_options(no_context_takeover=False, max_window_bits=0, mem_level=None):
+    """
+    Ajustes de permessage-deflate para WebSocket:
+      no_context_takeover  reiniciar el diccionario en cada mensaje (menos memoria, peor ratio)
+      max_window_bits      ventana LZ77 pedida al servidor (8-15; 0 = la del servidor)
+      mem_level            memoria del compresor zlib (1-9; None = por defecto)
+    """
+    return {"no_context_takeover": no_context_takeover, "max_window_bits": max_window_bits, "mem_level": mem_level}
+
+# Ajustes predefinidos para la línea de comandos
+DEFLATE_PRESETS = {
+    "default": DEFAULT_DEFLATE,
+    "off": False,
+    "low-memory": deflate_options(no_context_takeover=True, max_window_bits=9, mem_level=1),
+}
+
+def _websocket_factory(endpoint, create, deflate, serializer):
+    from autobahn.asyncio.websocket import WampWebSocketClientFactory
+    from autobahn.websocket.compress import (PerMessageDeflateOffer, PerMessageDeflateResponse,
+                                             PerMessageDeflateResponseAccept)
+    serializers = [serializer] if serializer is not None else None
+    factory = WampWebSocketClientFactory(create, url=endpoint.url, serializers=serializers)
+    options = dict(
+        # Los mismos valores de producción que usa ApplicationRunner
+        maxFramePayloadSize=1048576,
+        maxMessagePayloadSize=1048576,
+        autoFragmentSize=65536,
+        failByDrop=False,
+        openHandshakeTimeout=2.5,
+        closeHandshakeTimeout=1.0,
+        tcpNoDelay=True,
+        autoPingInterval=10.0,
+        autoPingTimeout=5.0,
+        autoPingSize=12,
+    )
+    if deflate is not False:
+        settings = deflate or {}
+        no_context_takeover = settings.get("no_context_takeover", False)
+        offer = PerMessageDeflateOffer(accept_no_context_takeover=True,
+                                       request_no_context_takeover=no_context_takeover,
+                                       request_max_window_bits=settings.get("max_window_bits", 0))
+
+        def accept(response):
+            if isinstance(response, PerMessageDeflateResponse):
+                return PerMessageDeflateResponseAccept(response, no_context_takeover=no_context_takeover or None,
+                                                       mem_level=settings.get("mem_level"))
+            return None
+
+        options["perMessageCompressionOffers"] = [offer]
+        options["perMessageCompressionAccept"] = accept
+    factory.setProtocolOptions(**options)
+    return factory
+
+def transport_factory(endpoint, create, deflate=DEFAULT_DEFLATE, serializer=None):
+    """
+    Factoría de protocolo de autobahn para el endpoint. 'create()' devuelve el manejador de cada
+    conexión (una ApplicationSession o cualquier ITransportHandler). Una misma factoría puede
+    abrir muchas conexiones, que comparten el serializador 'serializer' si se indica.
+    """
+    if endpoint.kind == TRANSPORT_WEBSOCKET:
+        return _websocket_factory(endpoint, create, deflate, serializer)
+    from autobahn.asyncio.rawsocket import WampRawSocketClientFactory
+    return WampRawSocketClientFactory(create, serializer=serializer)
+
+async def open_connection(endpoint, protocol_factory):
+    """
+    Abre la conexión TCP o Unix del endpoint en el bucle en curso; devuelve (transport, protocol).
+    """
+    loop = asyncio.get_running_loop()
+    if endpoint.path is not None:
+        return await loop.create_unix_connection(protocol_factory, endpoint.path)
+    return await loop.create_connection(protocol_factory, endpoint.host, endpoint.port, ssl=endpoint.secure or None)
+
+async def connect(url, realm, make_session, deflate=DEFAULT_DEFLATE, serializer=None):
+    """
+    Abre una sesión WAMP en el bucle en curso con el transporte que indique la URL.
+    'make_session(config)' recibe un ComponentConfig, igual que con ApplicationRunner.
+    'serializer' fuerza un serializador; por defecto se negocia el mejor disponible.
+    Devuelve (transport, protocol) una vez establecida la conexión (antes del HELLO).
+    """
+    from autobahn.wamp.types import ComponentConfig
+    # A diferencia de ApplicationRunner no se fija txaio.config.loop (global del proceso): txaio
+    # usa el bucle del hilo que lo llama, así conviven este bucle y el de un MiniRouter en otro hilo
+    endpoint = parse_endpoint(url)
+
+    def create():
+        return make_session(ComponentConfig(realm, {}))
+
+    return await open_connection(endpoint, transport_factory(endpoint, create, deflate, serializer))
+
+def component_transport(url):
+    """
+    Configuración de transporte para autobahn.asyncio.component.Component a partir de la URL.
+    """
+    endpoint = parse_endpoint(url)
+    if endpoint.kind == TRANSPORT_WEBSOCKET:
+        return {"type": TRANSPORT_WEBSOCKET, "url": url}
+    if endpoint.path is not None:
+        target = {"type": "unix", "path": endpoint.path}
+    else:
+        target = {"type": "tcp", "host": endpoint.host, "port": endpoint.port, "tls": endpoint.secure}
+    return {"type": TRANSPORT_RAWSOCKET, "url": url, "endpoint": target, "serializer": "json"}
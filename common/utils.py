@@ -1,35 +1,276 @@
 # common/utils.py
-import os, json, datetime, logging
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QTextEdit, QFileDialog, QMessageBox, QTreeWidget, QTreeWidgetItem
+import json, datetime, logging, itertools, threading
+from PyQt5.QtWidgets import (QWidget, QDialog, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QLineEdit, QPushButton,
+                             QLabel, QTabWidget, QTreeWidget, QTreeWidgetItem)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtGui import QTextCursor, QTextDocument
 
-# Configuración básica de logging
-LOG_FILENAME = f"log_{datetime.datetime.now().strftime('%Y-%m-%d_%H%M%S')}.txt"
+from common.rotation import SegmentWriter, LogArchive, SegmentLogHandler
+
+# Configuración del log de sesión: segmentos en LOG_DIR que rotan por tamaño y por tiempo; los
+# cerrados se comprimen en segundo plano y se borran los más antiguos según los límites de retención
+LOG_DIR = "logs"
+LOG_PREFIX = "log"
+LOG_SUFFIX = ".txt"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_MAX_SECONDS = 24 * 3600
+LOG_MAX_SEGMENTS = 100
+LOG_MAX_TOTAL_BYTES = 500 * 1024 * 1024
+LOG_MAX_AGE_DAYS = 30
+
+def _log_segment_start(path):
+    # Instante de la primera línea ("YYYY-MM-DD HH:MM:SS,mmm - ...") de un segmento sin archivar
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return datetime.datetime.strptime(f.readline()[:19], "%Y-%m-%d %H:%M:%S").timestamp()
+    except (OSError, ValueError):
+        return None
+
+log_archive = LogArchive(LOG_DIR, LOG_MAX_SEGMENTS, LOG_MAX_TOTAL_BYTES, LOG_MAX_AGE_DAYS)
 file_logger = logging.getLogger("FileLogger")
 file_logger.setLevel(logging.INFO)
-fh = logging.FileHandler(LOG_FILENAME, encoding="utf-8")
+# El primer segmento se crea con el primer mensaje, no al importar el módulo
+fh = SegmentLogHandler(SegmentWriter(LOG_DIR, LOG_PREFIX, LOG_SUFFIX, LOG_MAX_BYTES, LOG_MAX_SECONDS), log_archive)
 fh.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
 file_logger.addHandler(fh)
 
+def start_log_recovery():
+    """
+    Archiva en segundo plano los segmentos que quedaron sin comprimir de ejecuciones anteriores.
+    Lo llama la aplicación al arrancar (no se hace al importar: el proceso de red vuelve a importar
+    este módulo). Los segmentos de otras instancias en marcha se respetan.
+    """
+    threading.Thread(target=log_archive.recover, name="log-recover", daemon=True,
+                     args=(LOG_PREFIX, LOG_SUFFIX, _log_segment_start, lambda: fh.writer.current_path, LOG_MAX_SECONDS)).start()
+
 def log_to_file(time_str, topic, realm, message_json):
     entry = f"{time_str} | Topic: {topic} | Realm: {realm}\n{message_json}\n"
     file_logger.info(entry)
 
+class LazyWidget(QWidget):
+    """
+    Contenedor que construye su widget real la primera vez que se muestra.
+    'factory' recibe el contenedor como padre y devuelve el widget (puede importar módulos pesados).
+    """
+    def __init__(self, factory, parent=None):
+        super().__init__(parent)
+        self.factory = factory
+        self.widget = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+    def showEvent(self, event):
+        self.build()
+        super().showEvent(event)
+
+    def build(self):
+        if self.widget is None:
+            self.widget = self.factory(self)
+            self.layout().addWidget(self.widget)
+        return self.widget
+
+class BackgroundTask(QThread):
+    """
+    Ejecuta una función en un hilo de trabajo sin bloquear la interfaz.
+    La función recibe la propia tarea como primer argumento para poder emitir trozos
+    de resultado (emitChunk), informar del progreso y comprobar si se ha cancelado.
+    """
+    chunkReady = pyqtSignal(object)
+    progressChanged = pyqtSignal(int)
+    resultReady = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, func, *args, parent=None):
+        super().__init__(parent)
+        self.func = func
+        self.args = args
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def isCancelled(self):
+        return self._cancelled
+
+    def emitChunk(self, chunk):
+        self.chunkReady.emit(chunk)
+
+    def run(self):
+        try:
+            result = self.func(self, *self.args)
+        except Exception as e:
+            if not self._cancelled:
+                self.failed.emit(str(e))
+            return
+        if not self._cancelled:
+            self.resultReady.emit(result)
+
+# Tamaño de cada trozo de texto que se inserta en el visor de detalle
+DETAIL_CHUNK_SIZE = 256 * 1024
+# Número de hijos que se añaden de una vez al expandir un nodo de la vista estructural
+TREE_PAGE_SIZE = 500
+
+def format_json_chunks(task, data, chunk_size=DETAIL_CHUNK_SIZE):
+    """
+    Formatea 'data' con indentación de forma incremental y emite el texto por trozos.
+    Se ejecuta en un BackgroundTask; devuelve el número total de caracteres.
+    """
+    encoder = json.JSONEncoder(indent=2, ensure_ascii=False, default=str)
+    parts, size, total = [], 0, 0
+    for piece in encoder.iterencode(data):
+        if task.isCancelled():
+            return total
+        parts.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            task.emitChunk("".join(parts))
+            total += size
+            parts, size = [], 0
+    if parts:
+        task.emitChunk("".join(parts))
+        total += size
+    return total
+
+def load_json_chunks(task, loader, chunk_size=DETAIL_CHUNK_SIZE):
+    """
+    Obtiene el payload con 'loader()' (p. ej. decodificarlo del almacén) y lo formatea por trozos,
+    todo en el BackgroundTask; devuelve (payload, número total de caracteres).
+    """
+    data = loader()
+    return data, format_json_chunks(task, data, chunk_size)
+
 class JsonDetailDialog(QDialog):
     """
     Diálogo para mostrar el contenido del JSON formateado.
+    El texto se genera en un hilo de trabajo y se carga por trozos en un visor de solo lectura,
+    de modo que payloads muy grandes no bloquean la interfaz. Incluye una vista estructural
+    que se construye bajo demanda al expandir cada nodo y una búsqueda sobre el documento.
+    Con 'loader' (función sin argumentos) el payload también se obtiene en el hilo de trabajo.
     """
-    def __init__(self, message_details, parent=None):
+    def __init__(self, message_details=None, parent=None, loader=None):
         super().__init__(parent)
         self.setWindowTitle("Detalle JSON")
         self.resize(600, 400)
+        self.message_details = message_details
+        self.loaded = loader is None
+        self.task = None
         layout = QVBoxLayout(self)
-        self.textEdit = QTextEdit(self)
+
+        searchLayout = QHBoxLayout()
+        self.searchEdit = QLineEdit()
+        self.searchEdit.setPlaceholderText("Buscar en el documento...")
+        self.searchEdit.returnPressed.connect(self.findNext)
+        searchLayout.addWidget(self.searchEdit)
+        self.findPrevButton = QPushButton("Anterior")
+        self.findPrevButton.clicked.connect(self.findPrevious)
+        searchLayout.addWidget(self.findPrevButton)
+        self.findNextButton = QPushButton("Siguiente")
+        self.findNextButton.clicked.connect(self.findNext)
+        searchLayout.addWidget(self.findNextButton)
+        layout.addLayout(searchLayout)
+
+        self.tabs = QTabWidget()
+        # QPlainTextEdit maneja documentos grandes mucho mejor que QTextEdit
+        self.textEdit = QPlainTextEdit(self)
         self.textEdit.setReadOnly(True)
-        json_str = json.dumps(message_details, indent=2, ensure_ascii=False)
-        self.textEdit.setPlainText(json_str)
-        layout.addWidget(self.textEdit)
+        self.textEdit.setUndoRedoEnabled(False)
+        self.textEdit.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.tabs.addTab(self.textEdit, "Texto")
+        self.treeView = QTreeWidget()
+        self.treeView.setColumnCount(2)
+        self.treeView.setHeaderLabels(["Campo", "Valor"])
+        self.treeView.itemExpanded.connect(self.expandTreeItem)
+        self.treeView.itemDoubleClicked.connect(self.loadMoreTreeItems)
+        self.tabs.addTab(self.treeView, "Estructura")
+        self.tabs.currentChanged.connect(self.onTabChanged)
+        layout.addWidget(self.tabs)
+
+        self.statusLabel = QLabel("Formateando...")
+        layout.addWidget(self.statusLabel)
         self.setLayout(layout)
 
+        self.loaded_chars = 0
+        self.task = BackgroundTask(load_json_chunks, loader or (lambda: message_details), parent=self)
+        self.task.chunkReady.connect(self.appendChunk)
+        self.task.resultReady.connect(self.onFormatFinished)
+        self.task.failed.connect(self.onFormatFailed)
+        self.task.start()
+
+    def appendChunk(self, chunk):
+        cursor = QTextCursor(self.textEdit.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(chunk)
+        self.loaded_chars += len(chunk)
+        self.statusLabel.setText(f"Cargando... {self.loaded_chars // 1024} KB")
+
+    def onFormatFinished(self, result):
+        self.message_details, total = result
+        self.loaded = True
+        self.textEdit.moveCursor(QTextCursor.Start)
+        self.statusLabel.setText(f"{total // 1024} KB ({total} caracteres)")
+        if self.tabs.currentWidget() is self.treeView:
+            self.buildTree()
+
+    def onFormatFailed(self, error):
+        self.statusLabel.setText(f"Error al formatear el JSON: {error}")
+
+    def onTabChanged(self, index):
+        # La vista estructural se crea la primera vez que se muestra (con 'loader', al tener el payload)
+        if self.tabs.widget(index) is self.treeView:
+            self.buildTree()
+
+    def buildTree(self):
+        if self.treeView.topLevelItemCount() == 0 and self.loaded:
+            self.treeView.addTopLevelItems(build_lazy_tree_items(self.message_details))
+
+    def expandTreeItem(self, item):
+        if item.data(0, Qt.UserRole + 1):
+            return
+        item.setData(0, Qt.UserRole + 1, True)
+        item.addChildren(build_lazy_tree_items(item.data(0, Qt.UserRole).value))
+
+    def loadMoreTreeItems(self, item, column):
+        # Un nodo "... más" añade la siguiente página de hijos en el mismo padre
+        more = item.data(0, Qt.UserRole + 2)
+        if more is None:
+            return
+        parent = item.parent()
+        items = build_lazy_tree_items(more.value, more.start)
+        if parent is None:
+            index = self.treeView.indexOfTopLevelItem(item)
+            self.treeView.takeTopLevelItem(index)
+            self.treeView.addTopLevelItems(items)
+        else:
+            parent.removeChild(item)
+            parent.addChildren(items)
+
+    def findNext(self):
+        self._find(QTextDocument.FindFlags())
+
+    def findPrevious(self):
+        self._find(QTextDocument.FindBackward)
+
+    def _find(self, flags):
+        # Se busca directamente en el documento ya cargado, sin volver a generarlo
+        text = self.searchEdit.text()
+        if not text:
+            return
+        if self.tabs.currentWidget() is not self.textEdit:
+            self.tabs.setCurrentWidget(self.textEdit)
+        if self.textEdit.find(text, flags):
+            return
+        # Sin más coincidencias: se vuelve a empezar desde el extremo opuesto
+        self.textEdit.moveCursor(QTextCursor.End if flags & QTextDocument.FindBackward else QTextCursor.Start)
+        if not self.textEdit.find(text, flags):
+            self.statusLabel.setText(f"No se encontró '{text}'")
+
+    def done(self, result):
+        if self.task is not None and self.task.isRunning():
+            self.task.cancel()
+            self.task.wait()
+        super().done(result)
+
 def build_tree_items(data):
     """
     Construye recursivamente una lista de QTreeWidgetItem a partir de un diccionario o lista.
@@ -57,3 +298,49 @@ def build_tree_items(data):
     else:
         items.append(QTreeWidgetItem([str(data), ""]))
     return items
+
+class _TreeNode:
+    """
+    Envoltorio opaco del valor de un nodo del árbol perezoso. Un dict o una list guardados con
+    setData se convertirían enteros a QVariantMap/QVariantList (copia de todo el subárbol y claves
+    reordenadas); un objeto Python propio se guarda tal cual.
+    """
+    __slots__ = ("value", "start")
+
+    def __init__(self, value, start=0):
+        self.value = value
+        self.start = start
+
+def _lazy_tree_item(label, value):
+    if isinstance(value, dict):
+        item = QTreeWidgetItem([label, f"{{{len(value)} claves}}"])
+    elif isinstance(value, list):
+        item = QTreeWidgetItem([label, f"[{len(value)} elementos]"])
+    else:
+        return QTreeWidgetItem([label, str(value)])
+    # Los hijos se crean al expandir el nodo (ver JsonDetailDialog.expandTreeItem)
+    item.setData(0, Qt.UserRole, _TreeNode(value))
+    if value:
+        item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+    return item
+
+def build_lazy_tree_items(data, start=0, page_size=TREE_PAGE_SIZE):
+    """
+    Como build_tree_items, pero solo crea un nivel y como mucho 'page_size' elementos a partir
+    de 'start'. Si quedan más, se añade un último nodo "... más" que carga la siguiente página.
+    """
+    if isinstance(data, dict):
+        entries = [(str(k), v) for k, v in itertools.islice(data.items(), start, start + page_size)]
+        total = len(data)
+    elif isinstance(data, list):
+        entries = [(f"[{i}]", data[i]) for i in range(start, min(start + page_size, len(data)))]
+        total = len(data)
+    else:
+        return [QTreeWidgetItem([str(data), ""])]
+    items = [_lazy_tree_item(label, value) for label, value in entries]
+    end = start + len(entries)
+    if end < total:
+        more = QTreeWidgetItem([f"... {total - end} más (doble clic para cargar)", ""])
+        more.setData(0, Qt.UserRole + 2, _TreeNode(data, end))
+        items.append(more)
+    return items
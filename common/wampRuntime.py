@@ -0,0 +1,132 @@
+# common/wampRuntime.py
+"""
+Runtime de red compartido: un único hilo con un único bucle asyncio (uvloop si está instalado)
+en el que viven todas las sesiones WAMP de la aplicación (publicador, suscriptor, fan-in y RPC).
+El bucle mide su propio retraso (lag) como indicador de salud.
+"""
+import threading
+from collections import deque
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Periodo (s) del temporizador con el que se mide el retraso del bucle
+LAG_INTERVAL = 0.1
+# Muestras de retraso que se conservan para el máximo reciente (50 x 0.1 s = 5 s)
+LAG_WINDOW = 50
+
+def new_event_loop():
+    """
+    Crea un bucle asyncio nuevo, de uvloop si está disponible.
+    """
+    if uvloop is not None:
+        return uvloop.new_event_loop()
+    import asyncio
+    return asyncio.new_event_loop()
+
+class WampRuntime:
+    """
+    Dueño del hilo y del bucle de red. Se arranca la primera vez que se usa; después todas las
+    conexiones se programan en el mismo bucle con connect() / call_soon() / submit().
+    """
+    def __init__(self):
+        self.loop = None
+        self.thread = None
+        self.lag = 0.0
+        self._lags = deque(maxlen=LAG_WINDOW)
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self.loop is not None and self._ready.is_set()
+
+    def start(self):
+        with self._lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="wamp-runtime", daemon=True)
+                self.thread.start()
+        self._ready.wait()
+        return self.loop
+
+    def _run(self):
+        import asyncio
+        loop = new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.loop = loop
+        loop.create_task(self._monitor())
+        loop.call_soon(self._ready.set)
+        loop.run_forever()
+
+    async def _monitor(self):
+        import asyncio
+        loop = self.loop
+        while True:
+            t0 = loop.time()
+            await asyncio.sleep(LAG_INTERVAL)
+            self.lag = max(0.0, loop.time() - t0 - LAG_INTERVAL)
+            self._lags.append(self.lag)
+
+    def call_soon(self, fn, *args):
+        """
+        Ejecuta fn(*args) en el hilo de red.
+        """
+        self.start().call_soon_threadsafe(fn, *args)
+
+    def submit(self, coro):
+        """
+        Programa una corrutina en el bucle de red y devuelve un concurrent.futures.Future.
+        """
+        import asyncio
+        return asyncio.run_coroutine_threadsafe(coro, self.start())
+
+    def connect(self, url, realm, make_session, deflate=None):
+        """
+        Abre una sesión WAMP en el bucle compartido con el transporte de la URL (ws, rs/tcp o unix,
+        ver common.transports). 'make_session(config)' se llama en el hilo de red, así que puede
+        importar la clase de sesión.
+        """
+        async def _connect():
+            from common.transports import connect
+            return await connect(url, realm, make_session, deflate)
+        def done(future):
+            if future.exception() is not None:
+                print(f"Error al conectar con {url} (realm {realm}):", future.exception())
+        future = self.submit(_connect())
+        future.add_done_callback(done)
+        return future
+
+    def health(self):
+        """
+        Estado del bucle: retraso actual y máximo reciente en ms, y si se usa uvloop.
+        """
+        lags = list(self._lags)
+        return {
+            "running": self.running,
+            "uvloop": uvloop is not None,
+            "lag_ms": self.lag * 1000,
+            "max_lag_ms": max(lags) * 1000 if lags else 0.0,
+        }
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+def get_runtime():
+    """
+    Runtime compartido del proceso (se crea la primera vez; el hilo arranca al primer uso).
+    """
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = WampRuntime()
+        return _runtime
+
+def runtime_health():
+    """
+    Salud del runtime sin arrancarlo: None si aún no hay bucle de red.
+    """
+    if _runtime is None or not _runtime.running:
+        return None
+    return _runtime.health()
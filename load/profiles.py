@@ -0,0 +1,253 @@
+# load/profiles.py
+"""
+Perfiles de carga: generan los instantes de envío (segundos desde el inicio) de un patrón de tráfico.
+Formato de texto (CLI y editor del publicador):
+  ramp:<desde>-<hasta>/<duración>        rampa lineal de mensajes/s durante <duración> s
+  poisson:<λ>/<duración>[/<semilla>]     llegadas de Poisson a λ mensajes/s
+  burst:<n>@<periodo>/<duración>         ráfagas de n mensajes cada <periodo> s
+  step:<tasa>x<duración>,<tasa>x<duración>,...  escalones de tasa constante
+RateRecorder compara por intervalo la tasa planificada con la conseguida; find_knee() busca el
+primer intervalo en el que el envío ya no alcanza lo planificado (el "codo" del router).
+"""
+import math, random, asyncio
+
+PROFILE_RAMP = "ramp"
+PROFILE_POISSON = "poisson"
+PROFILE_BURST = "burst"
+PROFILE_STEP = "step"
+PROFILE_KINDS = [PROFILE_RAMP, PROFILE_POISSON, PROFILE_BURST, PROFILE_STEP]
+
+# Intervalo (s) por defecto de la tabla planificado/conseguido
+DEFAULT_REPORT_INTERVAL = 1.0
+# Fracción de la tasa planificada por debajo de la cual un intervalo se considera saturado
+KNEE_TOLERANCE = 0.95
+# Envíos atrasados seguidos tras los que se cede el bucle para que salgan los datos del socket
+YIELD_EVERY = 256
+
+class ProfileError(ValueError):
+    pass
+
+class RampProfile:
+    """
+    Tasa que crece (o decrece) linealmente de 'start' a 'end' mensajes/s en 'duration' s.
+    """
+    kind = PROFILE_RAMP
+
+    def __init__(self, start, end, duration):
+        if start < 0 or end < 0 or duration <= 0 or (start == 0 and end == 0):
+            raise ProfileError("La rampa necesita tasas >= 0 (no ambas 0) y una duración > 0")
+        self.start, self.end, self.duration = float(start), float(end), float(duration)
+
+    def rate_at(self, t):
+        return self.start + (self.end - self.start) * min(max(t, 0.0), self.duration) / self.duration
+
+    def times(self):
+        # El envío n ocurre cuando la integral de la tasa llega a n: start*t + k*t²/2 = n
+        k = (self.end - self.start) / self.duration
+        n = 0
+        while True:
+            if k == 0:
+                t = n / self.start
+            else:
+                disc = self.start * self.start + 2 * k * n
+                if disc < 0:
+                    return
+                t = (math.sqrt(disc) - self.start) / k
+            if t >= self.duration:
+                return
+            yield t
+            n += 1
+
+    def __str__(self):
+        return f"{self.kind}:{self.start:g}-{self.end:g}/{self.duration:g}"
+
+class PoissonProfile:
+    """
+    Llegadas de Poisson (intervalos exponenciales) a 'rate' mensajes/s. Con 'seed' es reproducible.
+    """
+    kind = PROFILE_POISSON
+
+    def __init__(self, rate, duration, seed=None):
+        if rate <= 0 or duration <= 0:
+            raise ProfileError("Poisson necesita una tasa y una duración > 0")
+        self.rate, self.duration, self.seed = float(rate), float(duration), seed
+
+    def rate_at(self, t):
+        return self.rate if 0 <= t < self.duration else 0.0
+
+    def times(self):
+        rng = random.Random(self.seed)
+        t = rng.expovariate(self.rate)
+        while t < self.duration:
+            yield t
+            t += rng.expovariate(self.rate)
+
+    def __str__(self):
+        seed = f"/{self.seed}" if self.seed is not None else ""
+        return f"{self.kind}:{self.rate:g}/{self.duration:g}{seed}"
+
+class BurstProfile:
+    """
+    Ráfagas de 'size' mensajes al inicio de cada 'period' s.
+    """
+    kind = PROFILE_BURST
+
+    def __init__(self, size, period, duration):
+        if size < 1 or period <= 0 or duration <= 0:
+            raise ProfileError("La ráfaga necesita tamaño >= 1, periodo > 0 y duración > 0")
+        self.size, self.period, self.duration = int(size), float(period), float(duration)
+
+    def rate_at(self, t):
+        return self.size / self.period if 0 <= t < self.duration else 0.0
+
+    def times(self):
+        start = 0.0
+        while start < self.duration:
+            for _ in range(self.size):
+                yield start
+            start += self.period
+
+    def __str__(self):
+        return f"{self.kind}:{self.size}@{self.period:g}/{self.duration:g}"
+
+class StepProfile:
+    """
+    Escalones [(tasa, duración), ...] de tasa constante, uno detrás de otro.
+    """
+    kind = PROFILE_STEP
+
+    def __init__(self, steps):
+        if not steps or any(rate < 0 or duration <= 0 for rate, duration in steps):
+            raise ProfileError("Cada escalón necesita una tasa >= 0 y una duración > 0")
+        self.steps = [(float(rate), float(duration)) for rate, duration in steps]
+        self.duration = sum(duration for _, duration in self.steps)
+
+    def rate_at(self, t):
+        start = 0.0
+        for rate, duration in self.steps:
+            if start <= t < start + duration:
+                return rate
+            start += duration
+        return 0.0
+
+    def times(self):
+        start = 0.0
+        for rate, duration in self.steps:
+            if rate > 0:
+                for i in range(int(math.ceil(rate * duration - 1e-9))):
+                    yield start + i / rate
+            start += duration
+
+    def __str__(self):
+        return f"{self.kind}:" + ",".join(f"{rate:g}x{duration:g}" for rate, duration in self.steps)
+
+def parse_profile(text):
+    """
+    Crea un perfil a partir de su forma de texto (ver el docstring del módulo).
+    """
+    kind, sep, spec = (text or "").strip().partition(":")
+    kind = kind.lower()
+    try:
+        if not sep:
+            raise ProfileError("Falta ':' tras el tipo de perfil")
+        if kind == PROFILE_RAMP:
+            rates, duration = spec.split("/")
+            start, end = rates.split("-")
+            return RampProfile(float(start), float(end), float(duration))
+        if kind == PROFILE_POISSON:
+            parts = spec.split("/")
+            seed = int(parts[2]) if len(parts) > 2 else None
+            return PoissonProfile(float(parts[0]), float(parts[1]), seed)
+        if kind == PROFILE_BURST:
+            head, duration = spec.split("/")
+            size, period = head.split("@")
+            return BurstProfile(int(size), float(period), float(duration))
+        if kind == PROFILE_STEP:
+            steps = []
+            for part in spec.split(","):
+                rate, duration = part.lower().split("x")
+                steps.append((float(rate), float(duration)))
+            return StepProfile(steps)
+    except (ValueError, IndexError) as e:
+        if isinstance(e, ProfileError):
+            raise
+        raise ProfileError(f"Perfil mal formado '{text}': {e}")
+    raise ProfileError(f"Tipo de perfil desconocido '{kind}' (use {', '.join(PROFILE_KINDS)})")
+
+class RateRecorder:
+    """
+    Cuenta por intervalo los envíos planificados (según su instante previsto) y los conseguidos
+    (según el instante real), y el retraso máximo respecto a lo previsto.
+    """
+    def __init__(self, interval=DEFAULT_REPORT_INTERVAL):
+        self.interval = interval
+        self.planned = {}
+        self.achieved = {}
+        self.max_lag = {}
+        self.count = 0
+
+    def record(self, planned, actual):
+        """
+        'planned' y 'actual' en segundos desde el inicio del perfil.
+        """
+        p = int(planned // self.interval)
+        a = int(actual // self.interval)
+        self.planned[p] = self.planned.get(p, 0) + 1
+        self.achieved[a] = self.achieved.get(a, 0) + 1
+        lag = actual - planned
+        if lag > self.max_lag.get(p, 0.0):
+            self.max_lag[p] = lag
+        self.count += 1
+
+    def rows(self):
+        """
+        Una fila por intervalo: {"t", "planned", "achieved" (mensajes/s), "max_lag_ms"}.
+        """
+        last = max(list(self.planned) + list(self.achieved), default=-1)
+        return [{
+            "t": i * self.interval,
+            "planned": self.planned.get(i, 0) / self.interval,
+            "achieved": self.achieved.get(i, 0) / self.interval,
+            "max_lag_ms": self.max_lag.get(i, 0.0) * 1000,
+        } for i in range(last + 1)]
+
+def find_knee(rows, tolerance=KNEE_TOLERANCE):
+    """
+    Primera fila en la que lo conseguido queda por debajo de 'tolerance' veces lo planificado
+    (None si todas llegan). La tasa planificada de esa fila es el codo del sistema.
+    """
+    for row in rows:
+        if row["planned"] > 0 and row["achieved"] < row["planned"] * tolerance:
+            return row
+    return None
+
+async def run_profile(profile, send, interval=DEFAULT_REPORT_INTERVAL):
+    """
+    Ejecuta el perfil en el bucle en curso llamando a send(n) en cada instante planificado.
+    Los envíos atrasados salen seguidos (sin dormir) para que el retraso quede en el informe.
+    Devuelve el RateRecorder con lo planificado frente a lo conseguido.
+    """
+    loop = asyncio.get_running_loop()
+    recorder = RateRecorder(interval)
+    start = loop.time()
+    behind = 0
+    for n, offset in enumerate(profile.times()):
+        wait = start + offset - loop.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+            behind = 0
+        else:
+            behind += 1
+            if behind >= YIELD_EVERY:
+                await asyncio.sleep(0)
+                behind = 0
+        send(n)
+        recorder.record(offset, loop.time() - start)
+    return recorder
+
+def format_rate_table(rows, knee=None):
+    lines = [f"{'t (s)':>8}  {'planificado':>12}  {'conseguido':>12}  {'retraso máx ms':>15}"]
+    for row in rows:
+        mark = "  <- codo" if knee is not None and row is knee else ""
+        lines.append(f"{row['t']:>8.1f}  {row['planned']:>12.1f}  {row['achieved']:>12.1f}  {row['max_lag_ms']:>15.2f}{mark}")
+    return "\n".join(lines)
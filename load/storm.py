@@ -0,0 +1,311 @@
+# load/storm.py
+"""
+Simulador de tormenta de conexiones: miles de sesiones WAMP concurrentes en un único bucle (o
+repartidas entre varios procesos) para dimensionar routers.
+Cada sesión es un StormSession con __slots__ que habla directamente el protocolo (HELLO, SUBSCRIBE,
+PUBLISH) sobre el transporte de autobahn, sin ApplicationSession; todas las sesiones de un proceso
+comparten factoría y serializador.
+"""
+import os, time, asyncio, itertools
+from common.stats import LatencyStats, format_summary
+
+DEFAULT_TOPIC = "com.wampy.storm"
+# Conexiones que se pueden estar abriendo a la vez en cada proceso
+DEFAULT_CONNECT_CONCURRENCY = 200
+# Periodo (s) del temporizador que reparte las publicaciones de todas las sesiones
+PUBLISH_TICK = 0.1
+
+def rss_bytes():
+    """
+    Memoria residente actual del proceso (Linux: /proc/self/statm; en otros sistemas, el máximo).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss está en KB en Linux y en bytes en macOS
+        return maxrss if os.uname().sysname == "Darwin" else maxrss * 1024
+
+class StormSession:
+    """
+    Sesión mínima (ITransportHandler de autobahn). Solo guarda su estado imprescindible.
+    """
+    __slots__ = ("storm", "index", "_transport", "t_start", "joined", "_session_id", "_authid")
+
+    def __init__(self, storm, index):
+        self.storm = storm
+        self.index = index
+        self._transport = None
+        self.t_start = 0.0
+        self.joined = False
+        self._session_id = None
+        self._authid = None
+
+    def onOpen(self, transport):
+        self._transport = transport
+        # La hora de inicio la deja el protocolo: se cuenta desde que empezó la conexión TCP
+        self.t_start = getattr(transport, "storm_t0", self.storm.clock())
+        self._transport.send(self.storm.message.Hello(self.storm.realm, self.storm.roles))
+
+    def onMessage(self, msg):
+        storm = self.storm
+        kind = type(msg)
+        if kind is storm.message.Event:
+            storm.received += 1
+        elif kind is storm.message.Welcome:
+            self._session_id = msg.session
+            storm.on_joined(self)
+        elif kind is storm.message.Published or kind is storm.message.Subscribed:
+            pass
+        elif kind is storm.message.Abort:
+            storm.fail(f"abort:{msg.reason}")
+            self._transport.close()
+        elif kind is storm.message.Error:
+            storm.fail(f"error:{msg.error}")
+        elif kind is storm.message.Goodbye:
+            self._transport.send(storm.message.Goodbye("wamp.close.goodbye_and_out"))
+            self._transport.close()
+
+    def onClose(self, wasClean):
+        self.storm.on_closed(self)
+        self._transport = None
+
+class ConnectionStorm:
+    """
+    Abre 'sessions' sesiones a 'join_rate' por segundo (0 = sin límite), cada una se suscribe a
+    'subscribe' topics y publica cada 'publish_interval' segundos (0 = no publica), las mantiene
+    'hold' segundos en régimen estable y devuelve un informe con report().
+    """
+    def __init__(self, url, realm, sessions, join_rate=0.0, topic=DEFAULT_TOPIC, subscribe=1, publish_interval=0.0,
+                 hold=10.0, connect_concurrency=DEFAULT_CONNECT_CONCURRENCY, first_index=0, serializer="json"):
+        from autobahn.wamp import message, role
+        from common.transports import parse_endpoint
+        self.endpoint = parse_endpoint(url)
+        self.realm = realm
+        self.total = sessions
+        self.join_rate = join_rate
+        self.topics = [f"{topic}.{i}" for i in range(subscribe)]
+        self.publish_interval = publish_interval
+        self.hold = hold
+        self.connect_concurrency = connect_concurrency
+        self.first_index = first_index
+        self.serializer_name = serializer
+        self.message = message
+        self.roles = {"publisher": role.RolePublisherFeatures(), "subscriber": role.RoleSubscriberFeatures()}
+        self.clock = time.perf_counter
+        self.sessions = []
+        self.join_latency = LatencyStats()
+        self.failures = {}
+        self.active = 0
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+        self._requests = itertools.count(1)
+        self._all_done = None
+        self._all_closed = None
+        self._settled = 0
+
+    # --- eventos de las sesiones ---
+
+    def fail(self, reason):
+        self.failures[reason] = self.failures.get(reason, 0) + 1
+
+    def _settle(self):
+        self._settled += 1
+        if self._settled >= self.total and self._all_done is not None:
+            self._all_done.set()
+
+    def on_joined(self, session):
+        session.joined = True
+        self.active += 1
+        self.join_latency.add(self.clock() - session.t_start)
+        self.sessions.append(session)
+        for topic in self.topics:
+            session._transport.send(self.message.Subscribe(next(self._requests), topic))
+        self._settle()
+
+    def on_closed(self, session):
+        if session.joined:
+            session.joined = False
+            self.active -= 1
+            self.dropped += 1
+            if self.active == 0 and self._all_closed is not None:
+                self._all_closed.set()
+        else:
+            self.fail("closed_before_welcome")
+            self._settle()
+
+    # --- ejecución ---
+
+    def _make_factory(self):
+        from autobahn.wamp.serializer import create_transport_serializer
+        from common.transports import transport_factory
+        indexes = itertools.count(self.first_index)
+        # Un único serializador y una única factoría para todas las sesiones del proceso
+        serializer = create_transport_serializer(self.serializer_name)
+        return transport_factory(self.endpoint, lambda: StormSession(self, next(indexes)), deflate=False,
+                                 serializer=serializer)
+
+    async def _connect_one(self, factory, semaphore):
+        from common.transports import open_connection
+        async with semaphore:
+            t0 = self.clock()
+
+            def protocol_factory():
+                protocol = factory()
+                protocol.storm_t0 = t0
+                return protocol
+
+            try:
+                await open_connection(self.endpoint, protocol_factory)
+            except OSError as e:
+                self.fail(f"connect:{e.strerror or type(e).__name__}")
+                self._settle()
+
+    async def _publisher(self):
+        # Cada sesión publica una vez por intervalo; las sesiones se reparten entre los ticks
+        ticks = max(1, round(self.publish_interval / PUBLISH_TICK))
+        publish = self.message.Publish
+        topics = self.topics or [DEFAULT_TOPIC]
+        for tick in itertools.count():
+            await asyncio.sleep(PUBLISH_TICK)
+            slot = tick % ticks
+            now = time.time()
+            for session in self.sessions:
+                if session.joined and session.index % ticks == slot:
+                    topic = topics[session.index % len(topics)]
+                    session._transport.send(publish(next(self._requests), topic, args=[session.index, now]))
+                    self.published += 1
+
+    async def run(self):
+        factory = self._make_factory()
+        semaphore = asyncio.Semaphore(max(1, self.connect_concurrency))
+        self._all_done = asyncio.Event()
+        rss_before = rss_bytes()
+        t_start = self.clock()
+        tasks = []
+        for i in range(self.total):
+            if self.join_rate > 0:
+                delay = t_start + i / self.join_rate - self.clock()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(self._connect_one(factory, semaphore)))
+        await asyncio.gather(*tasks)
+        # Se espera a que cada sesión se una o falle (con un margen por si el router no responde)
+        try:
+            await asyncio.wait_for(self._all_done.wait(), timeout=max(10.0, self.hold))
+        except asyncio.TimeoutError:
+            self.failures["timeout_join"] = self.total - self._settled
+        join_elapsed = self.clock() - t_start
+        publisher = asyncio.ensure_future(self._publisher()) if self.publish_interval > 0 else None
+        await asyncio.sleep(self.hold)
+        rss_steady = rss_bytes()
+        if publisher is not None:
+            publisher.cancel()
+        held, dropped = self.active, self.dropped
+        # Cierre ordenado: se espera a que todas las conexiones terminen su handshake de cierre
+        self._all_closed = asyncio.Event()
+        if self.active:
+            for session in list(self.sessions):
+                if session._transport is not None:
+                    session._transport.close()
+            try:
+                await asyncio.wait_for(self._all_closed.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
+                pass
+        return {
+            "sessions": self.total,
+            "joined": len(self.join_latency),
+            "held": held,
+            "dropped": dropped,
+            "failures": self.failures,
+            "join_elapsed_s": join_elapsed,
+            "join_rate": len(self.join_latency) / join_elapsed if join_elapsed > 0 else 0.0,
+            "join_latency": self.join_latency.summary(),
+            "join_samples": self.join_latency.samples,
+            "published": self.published,
+            "received": self.received,
+            "rss_before": rss_before,
+            "rss_steady": rss_steady,
+            "bytes_per_session": (rss_steady - rss_before) / held if held else 0.0,
+        }
+
+def _run_in_process(kwargs):
+    from common.wampRuntime import new_event_loop
+    loop = new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(ConnectionStorm(**kwargs).run())
+    finally:
+        loop.close()
+
+def _worker(kwargs, results):
+    try:
+        results.put(_run_in_process(kwargs))
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+
+def merge_reports(reports):
+    """
+    Une los informes de varios procesos (las latencias de unión se combinan muestra a muestra).
+    """
+    stats = LatencyStats()
+    merged = {"processes": len(reports), "sessions": 0, "joined": 0, "held": 0, "dropped": 0, "failures": {},
+              "published": 0, "received": 0, "join_elapsed_s": 0.0, "rss_delta": 0}
+    for report in reports:
+        if "error" in report:
+            merged["failures"][report["error"]] = merged["failures"].get(report["error"], 0) + 1
+            continue
+        for key in ("sessions", "joined", "held", "dropped", "published", "received"):
+            merged[key] += report[key]
+        for reason, count in report["failures"].items():
+            merged["failures"][reason] = merged["failures"].get(reason, 0) + count
+        merged["join_elapsed_s"] = max(merged["join_elapsed_s"], report["join_elapsed_s"])
+        merged["rss_delta"] += report["rss_steady"] - report["rss_before"]
+        stats.samples.extend(report["join_samples"])
+    merged["join_latency"] = stats.summary()
+    merged["join_rate"] = merged["joined"] / merged["join_elapsed_s"] if merged["join_elapsed_s"] > 0 else 0.0
+    merged["bytes_per_session"] = merged["rss_delta"] / merged["held"] if merged["held"] else 0.0
+    return merged
+
+def run_storm(url, realm, sessions, processes=1, join_rate=0.0, **options):
+    """
+    Lanza la tormenta en este proceso o repartida entre 'processes' procesos (sesiones y ritmo de
+    unión se dividen a partes iguales). Devuelve el informe combinado.
+    """
+    processes = max(1, min(processes, sessions))
+    shares = [sessions // processes + (1 if i < sessions % processes else 0) for i in range(processes)]
+    configs = []
+    first = 0
+    for share in shares:
+        configs.append(dict(url=url, realm=realm, sessions=share, join_rate=join_rate / processes,
+                            first_index=first, **options))
+        first += share
+    if processes == 1:
+        return merge_reports([_run_in_process(configs[0])])
+    import multiprocessing
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_worker, args=(config, results), daemon=True) for config in configs]
+    for worker in workers:
+        worker.start()
+    reports = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    return merge_reports(reports)
+
+def format_report(report):
+    failures = sum(report["failures"].values())
+    lines = [
+        f"Sesiones: {report['sessions']} en {report['processes']} proceso(s)",
+        f"Unidas: {report['joined']}  Fallos: {failures}  Mantenidas: {report['held']}  Caídas: {report['dropped']}",
+        f"Unión: {report['join_elapsed_s']:.2f} s ({report['join_rate']:.1f} sesiones/s)",
+        f"Latencia de unión: {format_summary(report['join_latency'])}",
+        f"Publicados: {report['published']}  Eventos recibidos: {report['received']}",
+        f"Memoria en régimen estable: {report['bytes_per_session'] / 1024:.1f} KB por sesión "
+        f"({report['rss_delta'] / 1048576:.1f} MB en total)",
+    ]
+    for reason, count in sorted(report["failures"].items()):
+        lines.append(f"  {reason}: {count}")
+    return "\n".join(lines)
@@ -1,25 +1,83 @@
+import time
+# Instante de arranque del proceso para medir el tiempo hasta la primera pintura
+START_TIME = time.perf_counter()
 
 import sys
 from PyQt5.QtWidgets import QApplication, QMainWindow, QTabWidget
-from publisher.pubGUI import PublisherTab
-from subscriber.subGUI import SubscriberTab
+from PyQt5.QtCore import QTimer
+from common.utils import LazyWidget, start_log_recovery
+
+def build_publisher_tab(parent):
+    from publisher.pubGUI import PublisherTab
+    return PublisherTab(parent)
+
+def build_subscriber_tab(parent):
+    from subscriber.subGUI import SubscriberTab
+    return SubscriberTab(parent)
+
+def build_rpc_tab(parent):
+    from rpc.rpcGUI import RpcTab
+    return RpcTab(parent)
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("WamPy")
         self.resize(900, 1000)
+        self.first_paint_ms = None
         self.initUI()
     def initUI(self):
         tabs = QTabWidget()
-        self.publisherTab = PublisherTab(self)
-        self.subscriberTab = SubscriberTab(self)
+        # Cada pestaña (y sus módulos) se construye la primera vez que se muestra
+        self.publisherTab = LazyWidget(build_publisher_tab, self)
+        self.subscriberTab = LazyWidget(build_subscriber_tab, self)
+        self.rpcTab = LazyWidget(build_rpc_tab, self)
         tabs.addTab(self.publisherTab, "Publicador")
         tabs.addTab(self.subscriberTab, "Subscriptor")
+        tabs.addTab(self.rpcTab, "RPC")
         self.setCentralWidget(tabs)
+        # Salud del bucle de red compartido (retraso del bucle), refrescada cada segundo
+        self.statusBar().showMessage("Red: sin conexiones")
+        self.healthTimer = QTimer(self)
+        self.healthTimer.timeout.connect(self.updateRuntimeHealth)
+        self.healthTimer.start(1000)
+    def updateRuntimeHealth(self):
+        from common.wampRuntime import runtime_health
+        health = runtime_health()
+        if health is None:
+            net = self.networkProcessStats()
+            if net is not None:
+                self.statusBar().showMessage(net)
+            return
+        backend = "uvloop" if health["uvloop"] else "asyncio"
+        message = (f"Red ({backend}): retraso del bucle {health['lag_ms']:.1f} ms "
+                   f"(máx. 5 s: {health['max_lag_ms']:.1f} ms)")
+        net = self.networkProcessStats()
+        if net is not None:
+            message += f"  |  {net}"
+        self.statusBar().showMessage(message)
+    def networkProcessStats(self):
+        # Solo si el módulo ya se cargó (alguna pestaña usa el proceso de red)
+        module = sys.modules.get("common.netProcess")
+        stats = module.network_process_stats() if module is not None else None
+        if stats is None:
+            return None
+        state = "activo" if stats["running"] else "detenido"
+        return (f"Proceso de red {state}: {stats['pending_bytes'] / 1024:.0f} KB pendientes, "
+                f"{stats['dropped']} descartados")
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.first_paint_ms is None:
+            self.first_paint_ms = (time.perf_counter() - START_TIME) * 1000
+            print(f"Arranque en frío: primera pintura a los {self.first_paint_ms:.0f} ms")
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
-    sys.exit(app.exec_())
+    # Tras la primera pintura para no retrasar el arranque
+    QTimer.singleShot(0, start_log_recovery)
+    code = app.exec_()
+    if "common.netProcess" in sys.modules:
+        sys.modules["common.netProcess"].shutdown_network_process()
+    sys.exit(code)
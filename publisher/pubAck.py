@@ -0,0 +1,120 @@
+# publisher/pubAck.py
+import time
+from common.stats import LatencyStats, format_summary
+from common.payload import publish_payload, DEFAULT_PAYLOAD_MODE
+
+# Número máximo de publicaciones pendientes de confirmación a la vez
+DEFAULT_ACK_WINDOW = 100
+
+def publish_message(session, topic, message, acknowledge=False, mode=DEFAULT_PAYLOAD_MODE):
+    """
+    Publica un mensaje con el modo de payload indicado (ver common.payload). Con acknowledge=True
+    se pide confirmación al router y se devuelve el futuro de la publicación (falla si el router
+    la rechaza, p. ej. por falta de permisos).
+    """
+    return publish_payload(session, topic, message, mode, acknowledge)
+
+class TopicCounters:
+    __slots__ = ("sent", "ok", "failed", "latency", "errors")
+    def __init__(self):
+        self.sent = 0
+        self.ok = 0
+        self.failed = 0
+        self.latency = LatencyStats()
+        self.errors = {}
+
+class DeliveryTracker:
+    """
+    Publicación con confirmación y contabilidad de entregas. Mantiene una ventana deslizante de
+    como mucho 'window' confirmaciones pendientes (publish() espera si está llena) y cuenta por
+    topic los mensajes enviados, confirmados y fallidos, con la latencia de confirmación.
+    Debe usarse desde el bucle asyncio de la sesión.
+    """
+    def __init__(self, window=DEFAULT_ACK_WINDOW):
+        self.window = max(1, int(window))
+        self.topics = {}
+        self._sem = None
+        self._pending = set()
+        self.started = time.perf_counter()
+
+    def _counters(self, topic):
+        counters = self.topics.get(topic)
+        if counters is None:
+            counters = self.topics[topic] = TopicCounters()
+        return counters
+
+    async def publish(self, session, topic, message, mode=DEFAULT_PAYLOAD_MODE):
+        import asyncio
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.window)
+        await self._sem.acquire()
+        counters = self._counters(topic)
+        counters.sent += 1
+        t0 = time.perf_counter()
+        try:
+            future = asyncio.ensure_future(publish_message(session, topic, message, acknowledge=True, mode=mode))
+        except Exception as e:
+            self._sem.release()
+            self._record_failure(counters, e)
+            return
+        self._pending.add(future)
+        future.add_done_callback(lambda f: self._on_ack(f, counters, t0))
+
+    def _on_ack(self, future, counters, t0):
+        self._pending.discard(future)
+        self._sem.release()
+        if future.cancelled():
+            self._record_failure(counters, "cancelado")
+        elif future.exception() is not None:
+            self._record_failure(counters, future.exception())
+        else:
+            counters.ok += 1
+            counters.latency.add(time.perf_counter() - t0)
+
+    def _record_failure(self, counters, error):
+        counters.failed += 1
+        key = getattr(error, "error", None) or (error if isinstance(error, str) else type(error).__name__)
+        counters.errors[key] = counters.errors.get(key, 0) + 1
+
+    @property
+    def outstanding(self):
+        return len(self._pending)
+
+    async def wait_all(self, timeout=None):
+        """
+        Espera a que se resuelvan todas las confirmaciones pendientes (o al timeout).
+        """
+        import asyncio
+        if self._pending:
+            await asyncio.wait(list(self._pending), timeout=timeout)
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        topics = {}
+        for topic, c in self.topics.items():
+            topics[topic] = {
+                "sent": c.sent,
+                "ok": c.ok,
+                "failed": c.failed,
+                "pending": c.sent - c.ok - c.failed,
+                "errors": dict(c.errors),
+                "ack_latency": c.latency.summary(),
+            }
+        return {
+            "sent": sum(t["sent"] for t in topics.values()),
+            "ok": sum(t["ok"] for t in topics.values()),
+            "failed": sum(t["failed"] for t in topics.values()),
+            "pending": sum(t["pending"] for t in topics.values()),
+            "elapsed_s": elapsed,
+            "topics": topics,
+        }
+
+def format_delivery_report(report):
+    lines = [f"Enviados: {report['sent']}  Confirmados: {report['ok']}  Fallidos: {report['failed']}  "
+             f"Pendientes: {report['pending']}  ({report['elapsed_s']:.3f} s)"]
+    for topic, t in report["topics"].items():
+        lines.append(f"{topic}: {t['ok']}/{t['sent']} confirmados, {t['failed']} fallidos; "
+                     f"latencia ack {format_summary(t['ack_latency'])}")
+        for error, count in t["errors"].items():
+            lines.append(f"    {error}: {count}")
+    return "\n".join(lines)
@@ -0,0 +1,79 @@
+# publisher/pubBench.py
+import time, asyncio
+from common.stats import LatencyStats, format_summary
+
+BENCH_TOPIC = "com.wampy.bench"
+
+async def loopback_bench(session, topic=BENCH_TOPIC, total=10000, size=64, window=1000, timeout=10.0):
+    """
+    Benchmark de publicación/suscripción en bucle: la sesión se suscribe a 'topic' y publica
+    'total' eventos para sí misma (exclude_me=False) con como mucho 'window' sin recibir.
+    Cada evento lleva el instante de envío, así que la latencia es la de ida y vuelta por el router.
+    Devuelve un diccionario con rendimiento, latencias y eventos perdidos.
+    """
+    from autobahn.wamp.types import PublishOptions
+
+    stats = LatencyStats()
+    pad = "x" * max(0, size)
+    received = 0
+    space = asyncio.Event()
+    space.set()
+    finished = asyncio.Event()
+    clock = time.perf_counter
+
+    def on_event(seq, t, pad=None):
+        nonlocal received
+        stats.add(clock() - t)
+        received += 1
+        space.set()
+        if received >= total:
+            finished.set()
+
+    subscription = await session.subscribe(on_event, topic)
+    options = PublishOptions(exclude_me=False)
+    t_start = clock()
+    try:
+        try:
+            for seq in range(total):
+                while seq - received >= window:
+                    space.clear()
+                    await asyncio.wait_for(space.wait(), timeout)
+                session.publish(topic, seq, clock(), pad, options=options)
+            await asyncio.wait_for(finished.wait(), timeout)
+        except asyncio.TimeoutError:
+            # Se han perdido eventos: se informa con lo recibido hasta ahora
+            pass
+    finally:
+        elapsed = clock() - t_start
+        await subscription.unsubscribe()
+    return {
+        "topic": topic,
+        "events": total,
+        "size": size,
+        "window": window,
+        "received": received,
+        "lost": total - received,
+        "elapsed_s": elapsed,
+        "throughput": received / elapsed if elapsed > 0 else 0.0,
+        "latency": stats.summary(),
+    }
+
+def format_report(result):
+    return "\n".join([
+        f"Topic: {result['topic']}  ({result['size']} bytes de relleno, ventana {result['window']})",
+        f"Publicados: {result['events']}  Recibidos: {result['received']}  Perdidos: {result['lost']}",
+        f"Duración: {result['elapsed_s']:.3f} s  Rendimiento: {result['throughput']:.1f} eventos/s",
+        f"Latencia: {format_summary(result['latency'])}",
+    ])
+
+def format_comparison(results):
+    """
+    Tabla con una fila por transporte (results[i]["transport"]).
+    """
+    width = max(len("Transporte"), *(len(r["transport"]) for r in results))
+    lines = [f"{'Transporte':<{width}}  {'eventos/s':>10}  {'p50 ms':>8}  {'p99 ms':>8}  {'perdidos':>8}"]
+    for r in results:
+        latency = r["latency"]
+        lines.append(f"{r['transport']:<{width}}  {r['throughput']:>10.1f}  {latency.get('p50_ms', 0):>8.2f}  "
+                     f"{latency.get('p99_ms', 0):>8.2f}  {r['lost']:>8}")
+    return "\n".join(lines)
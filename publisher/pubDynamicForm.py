@@ -23,15 +23,22 @@ class DynamicPublisherMessageForm(QGroupBox):
         self.build_form(self.default_json)
         
     def build_form(self, data):
-        while self.formLayout.count():
-            child = self.formLayout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        self.clear_form()
         if data:
             self._build_form_rec(data, self.formLayout, indent=0)
         else:
             self.formLayout.addRow(QLabel("No hay datos importados"))
-            
+
+    def clear_form(self):
+        while self.formLayout.count():
+            child = self.formLayout.takeAt(0)
+            if child.widget():
+                child.widget().deleteLater()
+
+    def append_form(self, data):
+        # Añade filas al formulario existente (importación incremental por lotes)
+        self._build_form_rec(data, self.formLayout, indent=0)
+
     def _build_form_rec(self, data, layout, indent=0):
         if isinstance(data, dict):
             for key, value in data.items():
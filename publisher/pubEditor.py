@@ -1,209 +1,514 @@
 # publisher/pubEditor.py
+import os, json
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QComboBox, QPlainTextEdit,
+                             QTabWidget, QTreeWidget, QFileDialog, QMessageBox, QProgressBar, QSpinBox, QDoubleSpinBox, QTextEdit)
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QTextCursor, QTextFormat, QColor
+from common.utils import BackgroundTask, build_tree_items, format_json_chunks
+from .pubScheduler import SEND_MODES, MODE_ON_DEMAND, MODE_DELAY, MODE_WALL_CLOCK, MODE_RATE, MODE_INTERVAL, MODE_BURST, MODE_PROFILE
 
-import json
-from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QComboBox,
-    QTextEdit, QTabWidget, QTreeWidget, QTreeWidgetItem, QFileDialog, QMessageBox
-)
-from PyQt5.QtCore import Qt
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
+try:
+    import jsonschema
+except ImportError:
+    jsonschema = None
 
-import sys, os, json, datetime, logging, asyncio, threading
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QScrollArea, QTableWidget,
-                             QTableWidgetItem, QHeaderView, QAbstractItemView, QPushButton, QSplitter, QGroupBox, QFormLayout, QMessageBox)
-from PyQt5.QtCore import Qt, QTimer
-from autobahn.asyncio.wamp import ApplicationSession, ApplicationRunner
-from common.utils import log_to_file, JsonDetailDialog
-from .pubEditor import PublisherEditorWidget
-
-global_session = None
-global_loop = None
-
-class JSONPublisher(ApplicationSession):
-    def __init__(self, config, topic):
-        super().__init__(config)
-        self.topic = topic
-    async def onJoin(self, details):
-        global global_session, global_loop
-        global_session = self
-        global_loop = asyncio.get_event_loop()
-        print("Conexión establecida en el publicador (realm:", self.config.realm, ")")
-        await asyncio.Future()
-
-def start_publisher(url, realm, topic):
-    def run():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        runner = ApplicationRunner(url=url, realm=realm)
-        runner.run(lambda config: JSONPublisher(config, topic))
-    threading.Thread(target=run, daemon=True).start()
-
-def send_message_now(topic, message, delay=0):
-    global global_session, global_loop
-    if global_session is None or global_loop is None:
-        print("No hay sesión activa. Inicia el publicador primero.")
-        return
-    async def _send():
-        if delay > 0:
-            await asyncio.sleep(delay)
-        # Forzamos el envío como kwargs si el mensaje es dict
-        if isinstance(message, dict):
-            global_session.publish(topic, **message)
+# Tamaño de lectura del fichero y número de entradas por lote entregado a las vistas
+IMPORT_READ_SIZE = 1024 * 1024
+IMPORT_BATCH_SIZE = 200
+# Máximo de errores de validación que se muestran al usuario
+MAX_SCHEMA_ERRORS = 20
+# Espera desde la última edición del JSON hasta validarlo (ms)
+VALIDATE_DEBOUNCE_MS = 300
+# Revisiones del texto cuyo resultado de parseo se conserva
+PARSE_CACHE_SIZE = 8
+
+class ImportCancelled(Exception):
+    pass
+
+class _ProgressReader:
+    """
+    Envoltorio de fichero que informa del progreso de lectura (0-100) y aborta si la tarea se cancela.
+    """
+    def __init__(self, fileobj, total, task):
+        self.fileobj = fileobj
+        self.total = max(total, 1)
+        self.task = task
+        self.pos = 0
+        self.last_percent = -1
+
+    def read(self, size=-1):
+        if self.task.isCancelled():
+            raise ImportCancelled()
+        data = self.fileobj.read(IMPORT_READ_SIZE if size is None or size < 0 else size)
+        self.pos += len(data)
+        percent = min(100, self.pos * 100 // self.total)
+        if percent != self.last_percent:
+            self.last_percent = percent
+            self.task.progressChanged.emit(percent)
+        return data
+
+def _emit_batches(task, kind, pairs):
+    batch = []
+    for pair in pairs:
+        if task.isCancelled():
+            raise ImportCancelled()
+        batch.append(pair)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            task.emitChunk((kind, batch))
+            batch = []
+    if batch:
+        task.emitChunk((kind, batch))
+
+def _stream_entries(reader):
+    # Con ijson se recorren las entradas de primer nivel sin cargar todo el documento a la vez
+    head = reader.fileobj.read(IMPORT_READ_SIZE).lstrip()
+    reader.fileobj.seek(0)
+    if head.startswith(b"{"):
+        return "dict", ijson.kvitems(reader, "", use_float=True)
+    if head.startswith(b"["):
+        return "list", enumerate(ijson.items(reader, "item", use_float=True))
+    return None, None
+
+def import_json_file(task, filepath, schema):
+    """
+    Importa un fichero JSON en un BackgroundTask. Durante el parseo se emiten lotes
+    ("dict"|"list", [(clave, valor), ...]) para construir el árbol y el formulario de forma
+    incremental y, al terminar, trozos ("text", str) del JSON formateado.
+    Devuelve (datos, errores_de_esquema).
+    """
+    total = os.path.getsize(filepath)
+    with open(filepath, "rb") as f:
+        reader = _ProgressReader(f, total, task)
+        kind, entries = _stream_entries(reader) if ijson is not None else (None, None)
+        if kind == "dict":
+            data = {}
+            def collect():
+                for key, value in entries:
+                    data[key] = value
+                    yield key, value
+            _emit_batches(task, kind, collect())
+        elif kind == "list":
+            data = []
+            def collect():
+                for index, value in entries:
+                    data.append(value)
+                    yield index, value
+            _emit_batches(task, kind, collect())
         else:
-            global_session.publish(topic, message)
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        message_json = json.dumps(message, indent=2, ensure_ascii=False)
-        log_to_file(timestamp, topic, global_session.config.realm, message_json)
-        logging.info(f"Publicado: {timestamp} | Topic: {topic} | Realm: {global_session.config.realm}")
-        print("Mensaje enviado en", topic, ":", message)
-    asyncio.run_coroutine_threadsafe(_send(), global_loop)
-
-# Widget para mostrar el log de mensajes enviados (con altura fija)
-class PublisherMessageViewer(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.pubMessages = []
-        self.initUI()
-        
-    def initUI(self):
-        layout = QVBoxLayout(self)
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels(["Hora", "Topic", "Realm"])
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
-        self.table.itemDoubleClicked.connect(self.showDetails)
-        layout.addWidget(self.table)
-        self.setLayout(layout)
-        self.setFixedHeight(200)
-
-    def add_message(self, realm, topic, timestamp, details):
-        if isinstance(details, str):
-            details = details.replace("\n", " ")
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        self.table.setItem(row, 0, QTableWidgetItem(timestamp))
-        self.table.setItem(row, 1, QTableWidgetItem(topic))
-        self.table.setItem(row, 2, QTableWidgetItem(realm))
-        self.pubMessages.append(details)
-
-    def showDetails(self, item):
-        row = item.row()
-        if row < len(self.pubMessages):
-            dlg = JsonDetailDialog(self.pubMessages[row], self)
-            dlg.exec_()
-
-# Pestaña del Publicador
-class PublisherTab(QWidget):
+            chunks = []
+            while True:
+                chunk = reader.read(IMPORT_READ_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            data = json.loads(b"".join(chunks).decode("utf-8"))
+            chunks = None
+            if isinstance(data, dict):
+                _emit_batches(task, "dict", data.items())
+            elif isinstance(data, list):
+                _emit_batches(task, "list", enumerate(data))
+    text_task = _TextChunkTask(task)
+    format_json_chunks(text_task, data)
+    if task.isCancelled():
+        raise ImportCancelled()
+    return data, validate_payload(data, schema)
+
+class _TextChunkTask:
+    # Adapta format_json_chunks para que sus trozos salgan etiquetados como texto
+    def __init__(self, task):
+        self.task = task
+    def isCancelled(self):
+        return self.task.isCancelled()
+    def emitChunk(self, chunk):
+        self.task.emitChunk(("text", chunk))
+
+def validate_payload(data, schema):
+    """
+    Valida 'data' contra un JSON Schema. Devuelve una lista de mensajes de error (vacía si es válido
+    o si no hay esquema). Requiere el paquete opcional 'jsonschema'.
+    """
+    if schema is None or jsonschema is None:
+        return []
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator = validator_cls(schema)
+    errors = []
+    for error in validator.iter_errors(data):
+        path = "/".join(str(p) for p in error.absolute_path) or "(raíz)"
+        errors.append(f"{path}: {error.message}")
+        if len(errors) >= MAX_SCHEMA_ERRORS:
+            break
+    return errors
+
+def parse_json_text(task, text, schema):
+    """
+    Parsea el texto del editor (en un BackgroundTask o directamente, con task=None).
+    Devuelve (datos, error, errores_de_esquema); 'error' es None o (línea, columna, mensaje), con
+    línea y columna None si el fallo no tiene posición. Nunca lanza excepciones.
+    """
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        return None, (e.lineno, e.colno, e.msg), []
+    except Exception as e:
+        # p. ej. RecursionError con un anidamiento demasiado profundo
+        return None, (None, None, f"{type(e).__name__}: {e}"), []
+    try:
+        errors = validate_payload(data, schema)
+    except Exception as e:
+        # Esquema que no se puede aplicar (p. ej. un $ref sin resolver): el JSON sigue siendo válido
+        errors = [f"No se pudo aplicar el esquema: {e}"]
+    return data, None, errors
+
+class PublisherEditorWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.msgWidgets = []
-        self.next_id = 1
+        self.schema = None
+        self.importTask = None
+        # Cada edición del JSON es una revisión nueva; el resultado del parseo se guarda por revisión
+        self.revision = 0
+        self.parseCache = {}
+        self.parseTask = None
         self.initUI()
 
     def initUI(self):
         layout = QVBoxLayout()
 
-        topLayout = QHBoxLayout()
-        self.addMsgButton = QPushButton("Agregar mensaje")
-        self.addMsgButton.clicked.connect(self.addMessage)
-        topLayout.addWidget(self.addMsgButton)
-        self.asyncSendButton = QPushButton("Enviar Mensaje Asincrónico")
-        self.asyncSendButton.clicked.connect(self.sendAllAsync)
-        topLayout.addWidget(self.asyncSendButton)
-        layout.addLayout(topLayout)
-
-        # Usamos QSplitter para dividir el área de mensajes y la zona de logs
-        splitter = QSplitter(Qt.Vertical)
-        self.msgArea = QScrollArea()
-        self.msgArea.setWidgetResizable(True)
-        self.msgContainer = QWidget()
-        self.msgLayout = QVBoxLayout()
-        self.msgContainer.setLayout(self.msgLayout)
-        self.msgArea.setWidget(self.msgContainer)
-        splitter.addWidget(self.msgArea)
-        self.viewer = PublisherMessageViewer(self)
-        splitter.addWidget(self.viewer)
-        splitter.setSizes([500, 200])
-        layout.addWidget(splitter)
-
-        connLayout = QHBoxLayout()
-        connLayout.addWidget(QLabel("Publicador Global"))
-        self.globalStartButton = QPushButton("Iniciar Publicador")
-        self.globalStartButton.clicked.connect(self.startPublisher)
-        connLayout.addWidget(self.globalStartButton)
-        layout.addLayout(connLayout)
-
-        layout.addWidget(QLabel("Resumen de mensajes enviados:"))
-        layout.addWidget(self.viewer)
+        # Selección de modo: Formulario Dinámico o JSON
+        modeLayout = QHBoxLayout()
+        modeLayout.addWidget(QLabel("Editar en:"))
+        self.editModeSelector = QComboBox()
+        self.editModeSelector.addItems(["Formulario Dinámico", "JSON"])
+        modeLayout.addWidget(self.editModeSelector)
+        layout.addLayout(modeLayout)
+
+        # Botones para cargar y convertir JSON
+        self.importButton = QPushButton("Cargar JSON desde Archivo")
+        self.importButton.clicked.connect(self.loadJSONFromFile)
+        layout.addWidget(self.importButton)
+
+        self.convertButton = QPushButton("Convertir a JSON")
+        self.convertButton.clicked.connect(self.convertToJSON)
+        layout.addWidget(self.convertButton)
+
+        # Esquema JSON opcional para validar los payloads importados
+        schemaLayout = QHBoxLayout()
+        self.schemaButton = QPushButton("Cargar JSON Schema")
+        self.schemaButton.clicked.connect(self.loadSchemaFromFile)
+        schemaLayout.addWidget(self.schemaButton)
+        self.schemaLabel = QLabel("Sin esquema")
+        schemaLayout.addWidget(self.schemaLabel, 1)
+        layout.addLayout(schemaLayout)
+
+        # Progreso de la importación en segundo plano
+        progressLayout = QHBoxLayout()
+        self.importProgress = QProgressBar()
+        self.importProgress.setRange(0, 100)
+        progressLayout.addWidget(self.importProgress)
+        self.cancelImportButton = QPushButton("Cancelar")
+        self.cancelImportButton.clicked.connect(self.cancelImport)
+        progressLayout.addWidget(self.cancelImportButton)
+        self.progressWidget = QWidget()
+        self.progressWidget.setLayout(progressLayout)
+        self.progressWidget.setVisible(False)
+        layout.addWidget(self.progressWidget)
+
+        # Configuración común de envío
+        commonLayout = QHBoxLayout()
+        commonLayout.addWidget(QLabel("Modo de envío:"))
+        self.commonModeCombo = QComboBox()
+        self.commonModeCombo.addItems(SEND_MODES)
+        self.commonModeCombo.currentTextChanged.connect(self.updateScheduleFields)
+        commonLayout.addWidget(self.commonModeCombo)
+        commonLayout.addWidget(QLabel("Tiempo (HH:MM:SS):"))
+        self.commonTimeEdit = QLineEdit("00:00:00")
+        commonLayout.addWidget(self.commonTimeEdit)
+        layout.addLayout(commonLayout)
+
+        # Parámetros de los modos periódicos
+        periodicLayout = QHBoxLayout()
+        periodicLayout.addWidget(QLabel("Hz:"))
+        self.rateSpin = QDoubleSpinBox()
+        self.rateSpin.setRange(0.01, 100000)
+        self.rateSpin.setValue(10)
+        periodicLayout.addWidget(self.rateSpin)
+        periodicLayout.addWidget(QLabel("Intervalo (s):"))
+        self.intervalSpin = QDoubleSpinBox()
+        self.intervalSpin.setRange(0.001, 86400)
+        self.intervalSpin.setDecimals(3)
+        self.intervalSpin.setValue(1)
+        periodicLayout.addWidget(self.intervalSpin)
+        periodicLayout.addWidget(QLabel("Ráfaga:"))
+        self.burstSpin = QSpinBox()
+        self.burstSpin.setRange(1, 100000)
+        self.burstSpin.setValue(10)
+        periodicLayout.addWidget(self.burstSpin)
+        periodicLayout.addWidget(QLabel("Total (0 = sin límite):"))
+        self.countSpin = QSpinBox()
+        self.countSpin.setRange(0, 100000000)
+        periodicLayout.addWidget(self.countSpin)
+        layout.addLayout(periodicLayout)
+
+        # Perfil de carga (rampa, Poisson, ráfagas o escalones)
+        profileLayout = QHBoxLayout()
+        profileLayout.addWidget(QLabel("Perfil:"))
+        self.profileEdit = QLineEdit()
+        self.profileEdit.setPlaceholderText("ramp:10-1000/60 | poisson:200/30 | burst:50@1/30 | step:100x10,200x10")
+        profileLayout.addWidget(self.profileEdit)
+        layout.addLayout(profileLayout)
+        self.updateScheduleFields(self.commonModeCombo.currentText())
+
+        # Área de previsualización: pestañas para JSON y Árbol
+        self.previewTabWidget = QTabWidget()
+
+        # Vista en JSON (texto)
+        self.jsonPreview = QPlainTextEdit()
+        self.jsonPreview.textChanged.connect(self.onJsonEdited)
+        self.previewTabWidget.addTab(self.jsonPreview, "JSON")
+        # Validación en vivo: se parsea en segundo plano cuando se deja de escribir
+        self.validateTimer = QTimer(self)
+        self.validateTimer.setSingleShot(True)
+        self.validateTimer.setInterval(VALIDATE_DEBOUNCE_MS)
+        self.validateTimer.timeout.connect(self.startValidation)
+
+        # Vista en árbol (jerárquica)
+        self.treePreview = QTreeWidget()
+        self.treePreview.setColumnCount(2)
+        self.treePreview.setHeaderLabels(["Clave", "Valor"])
+        self.previewTabWidget.addTab(self.treePreview, "Árbol")
+
+        layout.addWidget(self.previewTabWidget)
+        self.validationLabel = QLabel("")
+        layout.addWidget(self.validationLabel)
+
+        # Widget dinámico para editar el JSON (formulario dinámico)
+        from .pubDynamicForm import DynamicPublisherMessageForm
+        self.dynamicWidget = DynamicPublisherMessageForm(self)
+        layout.addWidget(self.dynamicWidget)
+
         self.setLayout(layout)
 
-    def addMessage(self):
-        from .pubEditor import PublisherEditorWidget
-        widget = MessageConfigWidget(self.next_id, parent=self)
-        self.msgLayout.addWidget(widget)
-        self.msgWidgets.append(widget)
-        self.next_id += 1
-
-    def addPublisherLog(self, realm, topic, timestamp, details):
-        self.viewer.add_message(realm, topic, timestamp, details)
-
-    def startPublisher(self):
-        for widget in self.msgWidgets:
-            config = widget.getConfig()
-            start_publisher(config["router_url"], config["realm"], config["topic"])
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.addPublisherLog(config["realm"], config["topic"], timestamp, f"Publicador iniciado: {config}")
-            # Si el tiempo es distinto de "00:00:00", programamos el envío
-            if widget.editorWidget.commonTimeEdit.text().strip() != "00:00:00":
-                try:
-                    h, m, s = map(int, widget.editorWidget.commonTimeEdit.text().strip().split(":"))
-                    delay = h * 3600 + m * 60 + s
-                except:
-                    delay = 0
-                QTimer.singleShot(delay * 1000, widget.sendMessage)
-
-    def sendAllAsync(self):
-        for widget in self.msgWidgets:
-            config = widget.getConfig()
-            send_message_now(config["topic"], config["content"], delay=0)
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            sent_message = json.dumps(config["content"], indent=2, ensure_ascii=False)
-            self.addPublisherLog(config["realm"], config["topic"], timestamp, sent_message)
-
-# Definición de MessageConfigWidget (actualizado sin referencia a commonModeCombo)
-class MessageConfigWidget(QGroupBox):
-    def __init__(self, msg_id, parent=None):
-        super().__init__(parent)
-        self.msg_id = msg_id
-        self.setTitle(f"Mensaje #{self.msg_id}")
-        self.setCheckable(True)
-        self.setChecked(True)
-        self.toggled.connect(self.toggleContent)
-        self.initUI()
+    def updateScheduleFields(self, mode):
+        # Solo se habilitan los campos que usa el modo seleccionado
+        self.commonTimeEdit.setEnabled(mode in (MODE_DELAY, MODE_WALL_CLOCK))
+        self.rateSpin.setEnabled(mode == MODE_RATE)
+        self.intervalSpin.setEnabled(mode in (MODE_INTERVAL, MODE_BURST))
+        self.burstSpin.setEnabled(mode == MODE_BURST)
+        self.countSpin.setEnabled(mode in (MODE_RATE, MODE_INTERVAL, MODE_BURST, MODE_PROFILE))
+        self.profileEdit.setEnabled(mode == MODE_PROFILE)
 
-    def initUI(self):
-        self.contentWidget = QWidget()
-        contentLayout = QVBoxLayout()
-
-        formLayout = QFormLayout()
-        self.realmCombo = QComboBox()
-        self.realmCombo.addItems(["default", "ADS.MIDSHMI"])
-        formLayout.addRow("Realm:", self.realmCombo)
-        self.urlEdit = QLineEdit("ws://127.0.0.1:60001/ws")
-        formLayout.addRow("Router URL:", self.urlEdit)
-        self.topicEdit = QLineEdit("com.ads.midshmi.topic")
-        formLayout.addRow("Topic:", self.topicEdit)
-        contentLayout.addLayout(formLayout)
-
-        from .pubEditor import PublisherEditorWidget
-        self.editorWidget = PublisherEditorWidget(parent=self)
-        contentLayout.addWidget(self.editorWidget)
-
-        self.sendButton = QPushButton("Enviar")
-        self.sendButton.clicked.connect(self.sendMessage)
-        # Habilitar siempre si el tiempo es "00:00:00"
-        if self.editorWidget.commonTimeEdit.text().strip() == "00:00:00":
-            self.sendBu
+    def getScheduleConfig(self):
+        return {
+            "mode": self.commonModeCombo.currentText(),
+            "time": self.commonTimeEdit.text().strip(),
+            "rate": self.rateSpin.value(),
+            "interval": self.intervalSpin.value(),
+            "burst": self.burstSpin.value(),
+            "count": self.countSpin.value(),
+            "profile": self.profileEdit.text().strip(),
+        }
+
+    def setScheduleConfig(self, schedule):
+        self.commonModeCombo.setCurrentText(schedule["mode"])
+        self.commonTimeEdit.setText(schedule["time"])
+        self.rateSpin.setValue(schedule["rate"])
+        self.intervalSpin.setValue(schedule["interval"])
+        self.burstSpin.setValue(schedule["burst"])
+        self.countSpin.setValue(schedule["count"])
+        self.profileEdit.setText(schedule.get("profile", ""))
+
+    def setContent(self, data):
+        # Carga un payload ya decodificado (p. ej. desde un proyecto) en la vista JSON, el árbol y el formulario
+        self.jsonPreview.setPlainText(json.dumps(data, indent=2, ensure_ascii=False))
+        self.cacheParse(self.revision, (data, None, validate_payload(data, self.schema)))
+        self.buildTreePreview(data)
+        self.dynamicWidget.build_form(data)
+
+    def loadSchemaFromFile(self):
+        if jsonschema is None:
+            QMessageBox.warning(self, "Aviso", "La validación requiere el paquete 'jsonschema'.")
+            return
+        filepath, _ = QFileDialog.getOpenFileName(self, "Seleccione un JSON Schema", "", "JSON Files (*.json);;All Files (*)")
+        if not filepath:
+            return
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                schema = json.load(f)
+            jsonschema.validators.validator_for(schema).check_schema(schema)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo cargar el esquema:\n{e}")
+            return
+        self.schema = schema
+        self.schemaLabel.setText(os.path.basename(filepath))
+        # Los resultados guardados se validaron con el esquema anterior
+        self.parseCache.clear()
+        self.validateTimer.start()
+
+    def loadJSONFromFile(self):
+        filepath, _ = QFileDialog.getOpenFileName(self, "Seleccione un archivo JSON", "", "JSON Files (*.json);;All Files (*)")
+        if not filepath:
+            return
+        self.cancelImport()
+        # Se limpian las vistas; se irán rellenando según lleguen los lotes del hilo de trabajo
+        self.jsonPreview.clear()
+        self.treePreview.clear()
+        self.dynamicWidget.clear_form()
+        self.importProgress.setValue(0)
+        self.progressWidget.setVisible(True)
+        self.importButton.setEnabled(False)
+        self.importTask = BackgroundTask(import_json_file, filepath, self.schema, parent=self)
+        self.importTask.progressChanged.connect(self.importProgress.setValue)
+        self.importTask.chunkReady.connect(self.onImportChunk)
+        self.importTask.resultReady.connect(self.onImportFinished)
+        self.importTask.failed.connect(self.onImportFailed)
+        self.importTask.finished.connect(self.onImportDone)
+        self.importTask.start()
+
+    def cancelImport(self):
+        if self.importTask is not None and self.importTask.isRunning():
+            self.importTask.cancel()
+            self.importTask.wait()
+            self.jsonPreview.clear()
+            self.treePreview.clear()
+            self.dynamicWidget.build_form({})
+
+    def onImportChunk(self, chunk):
+        if self.sender() is not self.importTask:
+            return
+        kind, payload = chunk
+        if kind == "text":
+            cursor = QTextCursor(self.jsonPreview.document())
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText(payload)
+        elif kind == "dict":
+            self.treePreview.addTopLevelItems(build_tree_items(dict(payload)))
+            self.dynamicWidget.append_form(dict(payload))
+        elif kind == "list":
+            self.treePreview.addTopLevelItems(build_tree_items({f"[{i}]": v for i, v in payload}))
+
+    def onImportFinished(self, result):
+        if self.sender() is not self.importTask:
+            return
+        data, errors = result
+        # El texto importado es el JSON formateado de 'data': no hace falta volver a parsearlo
+        self.cacheParse(self.revision, (data, None, errors))
+        if not isinstance(data, dict):
+            # Las raíces que no son objetos se muestran como un único campo en el formulario
+            self.dynamicWidget.build_form(data)
+            if not isinstance(data, list):
+                self.buildTreePreview(data)
+        self.jsonPreview.moveCursor(QTextCursor.Start)
+        if errors:
+            QMessageBox.warning(self, "Validación", "El JSON no cumple el esquema:\n" + "\n".join(errors))
+
+    def onImportFailed(self, error):
+        if self.sender() is not self.importTask:
+            return
+        QMessageBox.critical(self, "Error", f"No se pudo cargar el JSON:\n{error}")
+
+    def onImportDone(self):
+        if self.sender() is not self.importTask:
+            return
+        self.progressWidget.setVisible(False)
+        self.importButton.setEnabled(True)
+        self.validateTimer.start()
+
+    def convertToJSON(self):
+        data = self.dynamicWidget.collect_form_data(self.dynamicWidget.formLayout)
+        json_text = json.dumps(data, indent=2, ensure_ascii=False)
+        self.jsonPreview.setPlainText(json_text)
+        self.cacheParse(self.revision, (data, None, validate_payload(data, self.schema)))
+        self.buildTreePreview(data)
+        self.editModeSelector.setCurrentText("JSON")
+
+    def buildTreePreview(self, data):
+        self.treePreview.clear()
+        items = build_tree_items(data)
+        self.treePreview.addTopLevelItems(items)
+        self.treePreview.expandAll()
+
+    def onJsonEdited(self):
+        self.revision += 1
+        self.validateTimer.start()
+
+    def cacheParse(self, revision, result):
+        self.parseCache[revision] = result
+        while len(self.parseCache) > PARSE_CACHE_SIZE:
+            del self.parseCache[next(iter(self.parseCache))]
+
+    def startValidation(self):
+        if self.revision in self.parseCache:
+            self.showValidation()
+            return
+        if self.parseTask is not None or (self.importTask is not None and self.importTask.isRunning()):
+            # Se reintenta al terminar el parseo o la importación en curso
+            return
+        self.validationLabel.setText("Validando...")
+        self.validationLabel.setStyleSheet("")
+        self.parseTask = BackgroundTask(parse_json_text, self.jsonPreview.toPlainText(), self.schema, parent=self)
+        self.parseTask.revision = self.revision
+        self.parseTask.resultReady.connect(self.onParsed)
+        self.parseTask.failed.connect(self.onParseFailed)
+        self.parseTask.finished.connect(self.onParseDone)
+        self.parseTask.start()
+
+    def onParsed(self, result):
+        self.cacheParse(self.sender().revision, result)
+
+    def onParseFailed(self, error):
+        # Se guarda el fallo para esta revisión: así no se vuelve a lanzar el mismo parseo
+        self.cacheParse(self.sender().revision, (None, (None, None, error), []))
+
+    def onParseDone(self):
+        task = self.sender()
+        if task is self.parseTask:
+            self.parseTask = None
+        task.deleteLater()
+        # Si el texto cambió mientras se parseaba, se valida la revisión actual
+        if not self.validateTimer.isActive():
+            self.startValidation()
+
+    def showValidation(self):
+        data, error, schema_errors = self.parseCache[self.revision]
+        selections = []
+        if error is not None:
+            line, column, message = error
+            self.validationLabel.setStyleSheet("color: #c00000;")
+            if line is None:
+                self.validationLabel.setText(f"JSON inválido: {message}")
+            else:
+                self.validationLabel.setText(f"JSON inválido (línea {line}, columna {column}): {message}")
+                # Se resalta la línea del error sin mover el cursor del usuario
+                selection = QTextEdit.ExtraSelection()
+                selection.format.setBackground(QColor("#ffd6d6"))
+                selection.format.setProperty(QTextFormat.FullWidthSelection, True)
+                selection.cursor = QTextCursor(self.jsonPreview.document().findBlockByNumber(line - 1))
+                selections.append(selection)
+        elif schema_errors:
+            more = f" (y {len(schema_errors) - 1} más)" if len(schema_errors) > 1 else ""
+            self.validationLabel.setText(f"JSON válido, no cumple el esquema: {schema_errors[0]}{more}")
+            self.validationLabel.setStyleSheet("color: #b36b00;")
+        else:
+            self.validationLabel.setText("JSON válido")
+            self.validationLabel.setStyleSheet("color: #007000;")
+        self.jsonPreview.setExtraSelections(selections)
 
+    def parsedContent(self):
+        """
+        Payload del editor ya decodificado. Reutiliza el resultado de la validación en segundo plano
+        si es de la revisión actual del texto; si no, lo parsea ahora sin aplicar el esquema (el
+        resultado no se guarda: la validación en segundo plano lo hará completa). ValueError si el
+        JSON no es válido.
+        """
+        result = self.parseCache.get(self.revision)
+        if result is None:
+            result = parse_json_text(None, self.jsonPreview.toPlainText(), None)
+        data, error, _ = result
+        if error is not None:
+            line, column, message = error
+            raise ValueError(message if line is None else f"{message} (línea {line}, columna {column})")
+        return data
@@ -1,54 +1,124 @@
 # publisher/pubGUI.py
-import sys, os, json, datetime, logging, asyncio, threading
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QScrollArea, QTableWidget,
-                             QTableWidgetItem, QHeaderView, QAbstractItemView, QPushButton, QSplitter, QGroupBox, QFormLayout, QMessageBox)
-from PyQt5.QtCore import Qt, QTimer
-from autobahn.asyncio.wamp import ApplicationSession, ApplicationRunner
+import json, datetime, logging
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QComboBox, QScrollArea, QTableWidget,
+                             QTableWidgetItem, QHeaderView, QAbstractItemView, QPushButton, QSplitter, QGroupBox, QFormLayout, QMessageBox,
+                             QCheckBox, QSpinBox, QDoubleSpinBox)
+from PyQt5.QtCore import Qt, pyqtSlot, QMetaObject, Q_ARG
 from common.utils import log_to_file, JsonDetailDialog
-from .pubEditor import PublisherEditorWidget
+from .pubTemplate import PayloadTemplate, publish_template
+from .pubProject import save_project, load_project, summarize, PROJECT_FILTER
+from .pubAck import publish_message, DeliveryTracker, DEFAULT_ACK_WINDOW, format_delivery_report
+from common.wampRuntime import get_runtime
+from common.payload import PAYLOAD_MODES, PAYLOAD_MODE_LABELS, DEFAULT_PAYLOAD_MODE
+from .pubScheduler import PublishScheduler, ScheduledJob, parse_hms, MODE_ON_DEMAND, MODE_DELAY, MODE_PROFILE
+from load.profiles import parse_profile, find_knee, format_rate_table, ProfileError
 
 global_session = None
 global_loop = None
+# Planificador único de envíos periódicos/programados (se asocia al bucle de la sesión en onJoin)
+global_scheduler = PublishScheduler()
 
-class JSONPublisher(ApplicationSession):
-    def __init__(self, config, topic):
-        super().__init__(config)
-        self.topic = topic
-    async def onJoin(self, details):
-        global global_session, global_loop
-        global_session = self
-        global_loop = asyncio.get_event_loop()
-        print("Conexión establecida en el publicador (realm:", self.config.realm, ")")
-        await asyncio.Future()
+def _on_publisher_join(session, loop, target=None):
+    global global_session, global_loop
+    global_session = session
+    global_loop = loop
+    # Los envíos programados de cada (router, realm) salen por su propia sesión
+    global_scheduler.attach(loop, lambda topic, message, mode: publish_message(session, topic, message, mode=mode), target)
 
 def start_publisher(url, realm, topic):
-    def run():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        runner = ApplicationRunner(url=url, realm=realm)
-        runner.run(lambda config: JSONPublisher(config, topic))
-    threading.Thread(target=run, daemon=True).start()
-
-def send_message_now(topic, message, delay=0):
+    def on_join(session, loop):
+        _on_publisher_join(session, loop, (url, realm))
+    def make_session(config):
+        # autobahn se carga al abrir la primera conexión, no al arrancar la aplicación
+        from .pubSession import JSONPublisher
+        return JSONPublisher(config, topic, on_join=on_join)
+    # Todas las sesiones comparten el hilo y el bucle de red del runtime
+    get_runtime().connect(url, realm, make_session)
+
+def send_message_now(topic, message, delay=0, acknowledge=False, mode=DEFAULT_PAYLOAD_MODE):
+    """
+    Publica un mensaje en la sesión global con el modo de payload 'mode' (ver common.payload). Con acknowledge=True se pide confirmación al router y
+    el mensaje solo se registra como publicado cuando llega; si el router lo rechaza se registra el error.
+    """
     global global_session, global_loop
     if global_session is None or global_loop is None:
         print("No hay sesión activa. Inicia el publicador primero.")
         return
+    import asyncio
     async def _send():
         if delay > 0:
             await asyncio.sleep(delay)
-        # Forzamos el envío como kwargs si el mensaje es dict
-        if isinstance(message, dict):
-            global_session.publish(topic, **message)
+        realm = global_session.config.realm
+        if acknowledge:
+            try:
+                await publish_message(global_session, topic, message, acknowledge=True, mode=mode)
+            except Exception as e:
+                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                logging.error(f"Publicación rechazada: {timestamp} | Topic: {topic} | Realm: {realm} | {e}")
+                print("Error al publicar en", topic, ":", e)
+                return
         else:
-            global_session.publish(topic, message)
+            publish_message(global_session, topic, message, mode=mode)
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         message_json = json.dumps(message, indent=2, ensure_ascii=False)
-        log_to_file(timestamp, topic, global_session.config.realm, message_json)
-        logging.info(f"Publicado: {timestamp} | Topic: {topic} | Realm: {global_session.config.realm}")
+        log_to_file(timestamp, topic, realm, message_json)
+        status = "Publicado (confirmado)" if acknowledge else "Publicado"
+        logging.info(f"{status}: {timestamp} | Topic: {topic} | Realm: {realm}")
         print("Mensaje enviado en", topic, ":", message)
     asyncio.run_coroutine_threadsafe(_send(), global_loop)
 
+def send_template_now(topic, template, count, rate=0, delay=0, ack_window=0, mode=DEFAULT_PAYLOAD_MODE):
+    """
+    Publica 'count' mensajes generados con una PayloadTemplate compilada, opcionalmente a una tasa fija.
+    Con ack_window > 0 se publica con confirmación (como mucho ack_window pendientes a la vez).
+    En el log se registra un resumen del lote en lugar de cada mensaje.
+    """
+    global global_session, global_loop
+    if global_session is None or global_loop is None:
+        print("No hay sesión activa. Inicia el publicador primero.")
+        return
+    import asyncio
+    async def _send():
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tracker = DeliveryTracker(ack_window) if ack_window > 0 else None
+        stats = await publish_template(global_session, topic, template, count, rate, tracker=tracker, mode=mode)
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        summary = json.dumps({"plantilla": template.template, **stats}, indent=2, ensure_ascii=False)
+        log_to_file(timestamp, topic, global_session.config.realm, summary)
+        logging.info(f"Lote publicado: {timestamp} | Topic: {topic} | {stats['sent']} mensajes a {stats['rate']:.1f} msg/s")
+        print(f"Lote enviado en {topic}: {stats['sent']} mensajes en {stats['elapsed']:.3f} s")
+        if tracker is not None:
+            print(format_delivery_report(stats["delivery"]))
+    asyncio.run_coroutine_threadsafe(_send(), global_loop)
+
+def send_batch_acknowledged(messages, window, on_report):
+    """
+    Publica una lista de (topic, mensaje, modo de payload) con confirmación a través de un DeliveryTracker y, cuando
+    se han resuelto todas, llama a on_report(informe) desde el hilo de red.
+    """
+    global global_session, global_loop
+    if global_session is None or global_loop is None:
+        print("No hay sesión activa. Inicia el publicador primero.")
+        return
+    import asyncio
+    async def _send():
+        tracker = DeliveryTracker(window)
+        for topic, message, mode in messages:
+            await tracker.publish(global_session, topic, message, mode)
+        await tracker.wait_all()
+        return tracker.report()
+    def done(future):
+        if future.exception() is not None:
+            print("Error en el envío con confirmación:", future.exception())
+            return
+        report = future.result()
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        log_to_file(timestamp, "entrega", global_session.config.realm, json.dumps(report, indent=2, ensure_ascii=False))
+        logging.info(f"Entrega confirmada: {timestamp} | {report['ok']}/{report['sent']} mensajes, {report['failed']} fallidos")
+        on_report(report)
+    asyncio.run_coroutine_threadsafe(_send(), global_loop).add_done_callback(done)
+
 # Widget para mostrar el log de mensajes enviados (con altura fija)
 class PublisherMessageViewer(QWidget):
     def __init__(self, parent=None):
@@ -103,6 +173,12 @@ class PublisherTab(QWidget):
         self.asyncSendButton = QPushButton("Enviar Mensaje Asincrónico")
         self.asyncSendButton.clicked.connect(self.sendAllAsync)
         topLayout.addWidget(self.asyncSendButton)
+        self.saveProjectButton = QPushButton("Guardar proyecto")
+        self.saveProjectButton.clicked.connect(self.saveProject)
+        topLayout.addWidget(self.saveProjectButton)
+        self.loadProjectButton = QPushButton("Cargar proyecto")
+        self.loadProjectButton.clicked.connect(self.loadProject)
+        topLayout.addWidget(self.loadProjectButton)
         layout.addLayout(topLayout)
 
         # Usamos QSplitter para dividir el área de mensajes y la zona de logs
@@ -124,55 +200,160 @@ class PublisherTab(QWidget):
         self.globalStartButton = QPushButton("Iniciar Publicador")
         self.globalStartButton.clicked.connect(self.startPublisher)
         connLayout.addWidget(self.globalStartButton)
+        self.stopSchedulesButton = QPushButton("Detener envíos programados")
+        self.stopSchedulesButton.clicked.connect(self.stopSchedules)
+        connLayout.addWidget(self.stopSchedulesButton)
+        # Confirmación de entrega: el router responde a cada publicación (éxito o error)
+        self.ackCheck = QCheckBox("Confirmar entrega (ack)")
+        connLayout.addWidget(self.ackCheck)
+        connLayout.addWidget(QLabel("Ventana:"))
+        self.ackWindowSpin = QSpinBox()
+        self.ackWindowSpin.setRange(1, 100000)
+        self.ackWindowSpin.setValue(DEFAULT_ACK_WINDOW)
+        self.ackWindowSpin.setToolTip("Máximo de publicaciones pendientes de confirmación a la vez")
+        connLayout.addWidget(self.ackWindowSpin)
         layout.addLayout(connLayout)
 
+        self.deliveryLabel = QLabel("")
+        layout.addWidget(self.deliveryLabel)
+
         layout.addWidget(QLabel("Resumen de mensajes enviados:"))
         layout.addWidget(self.viewer)
         self.setLayout(layout)
 
     def addMessage(self):
-        from .pubEditor import PublisherEditorWidget
         widget = MessageConfigWidget(self.next_id, parent=self)
         self.msgLayout.addWidget(widget)
         self.msgWidgets.append(widget)
         self.next_id += 1
 
+    def saveProject(self):
+        from PyQt5.QtWidgets import QFileDialog
+        filepath, _ = QFileDialog.getSaveFileName(self, "Guardar proyecto", "", PROJECT_FILTER)
+        if not filepath:
+            return
+        try:
+            save_project(filepath, [widget.getConfig() for widget in self.msgWidgets])
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"No se pudo guardar el proyecto:\n{e}")
+
+    def loadProject(self):
+        from PyQt5.QtWidgets import QFileDialog
+        filepath, _ = QFileDialog.getOpenFileName(self, "Cargar proyecto", "", PROJECT_FILTER)
+        if not filepath:
+            return
+        try:
+            definitions = load_project(filepath)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"No se pudo cargar el proyecto:\n{e}")
+            return
+        # Los mensajes se crean plegados: solo guardan la definición y el editor se construye al desplegarlos
+        self.msgContainer.setUpdatesEnabled(False)
+        try:
+            for widget in self.msgWidgets:
+                self.msgLayout.removeWidget(widget)
+                widget.deleteLater()
+            self.msgWidgets = []
+            self.next_id = 1
+            for definition in definitions:
+                widget = MessageConfigWidget(self.next_id, parent=self, definition=definition)
+                self.msgLayout.addWidget(widget)
+                self.msgWidgets.append(widget)
+                self.next_id += 1
+        finally:
+            self.msgContainer.setUpdatesEnabled(True)
+
     def addPublisherLog(self, realm, topic, timestamp, details):
         self.viewer.add_message(realm, topic, timestamp, details)
 
-    def startPublisher(self):
+    def validConfigs(self):
+        """
+        Pares (widget, configuración) de los mensajes cuyo JSON es válido; los inválidos se anotan
+        en el log y se omiten.
+        """
+        configs = []
         for widget in self.msgWidgets:
-            config = widget.getConfig()
+            try:
+                configs.append((widget, widget.getConfig()))
+            except ValueError as e:
+                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self.addPublisherLog(widget.realmCombo.currentText(), widget.topicEdit.text().strip(), timestamp,
+                                     f"Mensaje #{widget.msg_id} omitido, JSON inválido: {e}")
+        return configs
+
+    def startPublisher(self):
+        for widget, config in self.validConfigs():
             start_publisher(config["router_url"], config["realm"], config["topic"])
             timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             self.addPublisherLog(config["realm"], config["topic"], timestamp, f"Publicador iniciado: {config}")
-            # Si el tiempo es distinto de "00:00:00", programamos el envío
-            if widget.editorWidget.commonTimeEdit.text().strip() != "00:00:00":
-                try:
-                    h, m, s = map(int, widget.editorWidget.commonTimeEdit.text().strip().split(":"))
-                    delay = h * 3600 + m * 60 + s
-                except:
-                    delay = 0
-                QTimer.singleShot(delay * 1000, widget.sendMessage)
+            # Los mensajes que no son "On-demand" pasan al planificador compartido
+            schedule = config["schedule"]
+            if schedule["mode"] != MODE_ON_DEMAND:
+                job = widget.buildJob(config)
+                if job is not None:
+                    global_scheduler.add(job)
+                    self.addPublisherLog(config["realm"], config["topic"], timestamp, f"Envío programado: {schedule}")
+
+    def stopSchedules(self):
+        global_scheduler.cancel_all()
+
+    def ackWindow(self):
+        # 0 = publicación sin confirmación
+        return self.ackWindowSpin.value() if self.ackCheck.isChecked() else 0
 
     def sendAllAsync(self):
-        for widget in self.msgWidgets:
-            config = widget.getConfig()
-            send_message_now(config["topic"], config["content"], delay=0)
+        configs = [config for _, config in self.validConfigs()]
+        if self.ackCheck.isChecked():
+            self.deliveryRealms = {config["topic"]: config["realm"] for config in configs}
+            self.deliveryLabel.setText(f"Esperando confirmación de {len(configs)} mensajes...")
+            send_batch_acknowledged([(config["topic"], config["content"], config["payload_mode"]) for config in configs],
+                                    self.ackWindowSpin.value(), self._postDeliveryReport)
+            return
+        for config in configs:
+            send_message_now(config["topic"], config["content"], delay=0, mode=config["payload_mode"])
             timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             sent_message = json.dumps(config["content"], indent=2, ensure_ascii=False)
             self.addPublisherLog(config["realm"], config["topic"], timestamp, sent_message)
 
-# Definición de MessageConfigWidget (actualizado sin referencia a commonModeCombo)
+    def _postDeliveryReport(self, report):
+        # Llega desde el hilo de red: se muestra en el hilo de la interfaz
+        QMetaObject.invokeMethod(self, "showDeliveryReport", Qt.QueuedConnection, Q_ARG(object, report))
+
+    @pyqtSlot(object)
+    def showDeliveryReport(self, report):
+        self.deliveryLabel.setText(format_delivery_report(report).splitlines()[0])
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        realms = getattr(self, "deliveryRealms", {})
+        for topic, counters in report["topics"].items():
+            self.addPublisherLog(realms.get(topic, ""), topic, timestamp, counters)
+
+# Definición de MessageConfigWidget
 class MessageConfigWidget(QGroupBox):
-    def __init__(self, msg_id, parent=None):
+    """
+    Mensaje del publicador. Si se crea con una 'definition' (p. ej. desde un proyecto) empieza
+    plegado y solo guarda la definición; el editor completo se construye al desplegarlo.
+    """
+    def __init__(self, msg_id, parent=None, definition=None):
         super().__init__(parent)
         self.msg_id = msg_id
-        self.setTitle(f"Mensaje #{self.msg_id}")
+        # Al añadirse al layout cambia el padre Qt; se guarda la pestaña para leer sus opciones
+        self.publisherTab = parent
+        self.definition = definition
+        self.contentWidget = None
         self.setCheckable(True)
-        self.setChecked(True)
+        self.setLayout(QVBoxLayout())
+        if definition is None:
+            self.setTitle(f"Mensaje #{self.msg_id}")
+            self.setChecked(True)
+            self.initUI()
+        else:
+            self.setTitle(summarize(self.msg_id, definition))
+            self.setChecked(False)
         self.toggled.connect(self.toggleContent)
-        self.initUI()
+
+    @property
+    def built(self):
+        return self.contentWidget is not None
 
     def initUI(self):
         self.contentWidget = QWidget()
@@ -186,6 +367,26 @@ class MessageConfigWidget(QGroupBox):
         formLayout.addRow("Router URL:", self.urlEdit)
         self.topicEdit = QLineEdit("com.ads.midshmi.topic")
         formLayout.addRow("Topic:", self.topicEdit)
+        # Codificación del payload: kwargs (histórico), objeto como argumento o binario passthrough
+        self.payloadModeCombo = QComboBox()
+        for mode in PAYLOAD_MODES:
+            self.payloadModeCombo.addItem(PAYLOAD_MODE_LABELS[mode], mode)
+        formLayout.addRow("Payload:", self.payloadModeCombo)
+        # Generación de mensajes a partir de plantilla ({{counter}}, {{timestamp}}, ...)
+        templateLayout = QHBoxLayout()
+        self.templateCheck = QCheckBox("Usar como plantilla")
+        templateLayout.addWidget(self.templateCheck)
+        templateLayout.addWidget(QLabel("Mensajes:"))
+        self.templateCountSpin = QSpinBox()
+        self.templateCountSpin.setRange(1, 10000000)
+        self.templateCountSpin.setValue(100)
+        templateLayout.addWidget(self.templateCountSpin)
+        templateLayout.addWidget(QLabel("Tasa (msg/s, 0 = sin límite):"))
+        self.templateRateSpin = QDoubleSpinBox()
+        self.templateRateSpin.setRange(0, 1000000)
+        self.templateRateSpin.setDecimals(1)
+        templateLayout.addWidget(self.templateRateSpin)
+        formLayout.addRow("Plantilla:", templateLayout)
         contentLayout.addLayout(formLayout)
 
         from .pubEditor import PublisherEditorWidget
@@ -194,43 +395,112 @@ class MessageConfigWidget(QGroupBox):
 
         self.sendButton = QPushButton("Enviar")
         self.sendButton.clicked.connect(self.sendMessage)
-        # Habilitar siempre si el tiempo es "00:00:00"
-        if self.editorWidget.commonTimeEdit.text().strip() == "00:00:00":
-            self.sendButton.setEnabled(True)
-        else:
-            self.sendButton.setEnabled(False)
+        self.editorWidget.commonModeCombo.currentTextChanged.connect(self.updateSendButtonState)
+        self.editorWidget.commonTimeEdit.textChanged.connect(self.updateSendButtonState)
+        self.updateSendButtonState()
         contentLayout.addWidget(self.sendButton)
 
         self.contentWidget.setLayout(contentLayout)
-        mainLayout = QVBoxLayout()
-        mainLayout.addWidget(self.contentWidget)
-        self.setLayout(mainLayout)
+        self.layout().addWidget(self.contentWidget)
+        if self.definition is not None:
+            self.applyDefinition(self.definition)
+
+    def applyDefinition(self, definition):
+        self.realmCombo.setCurrentText(definition["realm"])
+        self.urlEdit.setText(definition["router_url"])
+        self.topicEdit.setText(definition["topic"])
+        index = self.payloadModeCombo.findData(definition["payload_mode"])
+        if index >= 0:
+            self.payloadModeCombo.setCurrentIndex(index)
+        template = definition["template"]
+        self.templateCheck.setChecked(template["enabled"])
+        self.templateCountSpin.setValue(template["count"])
+        self.templateRateSpin.setValue(template["rate"])
+        self.editorWidget.setScheduleConfig(definition["schedule"])
+        self.editorWidget.setContent(definition["content"])
+
+    def updateSendButtonState(self, *args):
+        # Habilitado en "On-demand" o si el envío programado es inmediato ("00:00:00")
+        mode = self.editorWidget.commonModeCombo.currentText()
+        immediate = mode == MODE_DELAY and self.editorWidget.commonTimeEdit.text().strip() == "00:00:00"
+        self.sendButton.setEnabled(mode == MODE_ON_DEMAND or immediate)
 
     def toggleContent(self, checked):
-        self.contentWidget.setVisible(checked)
+        if checked and not self.built:
+            self.initUI()
+        if self.built:
+            self.contentWidget.setVisible(checked)
         if not checked:
-            topic = self.topicEdit.text().strip()
-            time_val = self.editorWidget.commonTimeEdit.text()
-            self.setTitle(f"Mensaje #{self.msg_id} - {topic} - {time_val}")
+            definition = self.definition
+            if self.built:
+                definition = {"topic": self.topicEdit.text().strip(), "schedule": self.editorWidget.getScheduleConfig()}
+            self.setTitle(summarize(self.msg_id, definition))
         else:
             self.setTitle(f"Mensaje #{self.msg_id}")
 
+    def buildJob(self, config):
+        """
+        Crea el ScheduledJob del mensaje según su modo de envío. Si el mensaje es una plantilla,
+        cada envío genera un payload nuevo.
+        """
+        data = config["content"]
+        if config["template"]["enabled"]:
+            try:
+                payload = PayloadTemplate(data).render
+            except (ValueError, KeyError, OSError) as e:
+                QMessageBox.critical(self, "Error", f"Plantilla inválida:\n{e}")
+                return None
+        else:
+            payload = lambda n: data
+        schedule = config["schedule"]
+        realm = config["realm"]
+        profile = None
+        if schedule["mode"] == MODE_PROFILE:
+            try:
+                profile = parse_profile(schedule["profile"])
+            except ProfileError as e:
+                QMessageBox.critical(self, "Error", f"Perfil de carga inválido:\n{e}")
+                return None
+        def on_done(job):
+            # Se ejecuta en el hilo de red al terminar o cancelarse el trabajo
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            summary = {"modo": job.mode, "enviados": job.sent, "cancelado": job.cancelled}
+            if job.recorder is not None:
+                rows = job.recorder.rows()
+                knee = find_knee(rows)
+                summary["perfil"] = str(job.profile)
+                summary["codo_msg_s"] = knee["planned"] if knee is not None else None
+                logging.info(f"Perfil {job.profile} en {job.topic}:\n{format_rate_table(rows, knee)}")
+            log_to_file(timestamp, job.topic, realm, json.dumps(summary, ensure_ascii=False))
+            logging.info(f"Envío programado finalizado: {timestamp} | Topic: {job.topic} | {job.sent} mensajes")
+        return ScheduledJob(config["topic"], payload, schedule["mode"], time_text=schedule["time"],
+                            rate=schedule["rate"], interval=schedule["interval"], burst=schedule["burst"],
+                            count=schedule["count"], on_done=on_done, payload_mode=config["payload_mode"],
+                            profile=profile, target=(config["router_url"], realm))
+
     def sendMessage(self):
-        try:
-            h, m, s = map(int, self.editorWidget.commonTimeEdit.text().strip().split(":"))
-            delay = h * 3600 + m * 60 + s
-        except:
-            delay = 0
-        if self.editorWidget.commonTimeEdit.text().strip() == "00:00:00":
-            delay = 0
+        delay = 0
+        if self.editorWidget.commonModeCombo.currentText() == MODE_DELAY:
+            delay = parse_hms(self.editorWidget.commonTimeEdit.text())
         topic = self.topicEdit.text().strip()
+        mode = self.payloadModeCombo.currentData()
         try:
-            data = json.loads(self.editorWidget.jsonPreview.toPlainText())
-        except Exception as e:
+            # Objeto ya parseado por la validación en vivo (solo se parsea si el texto cambió desde entonces)
+            data = self.editorWidget.parsedContent()
+        except ValueError as e:
             QMessageBox.critical(self, "Error", f"JSON inválido:\n{e}")
             return
-        from .pubGUI import send_message_now
-        send_message_now(topic, data, delay=delay)
+        if self.templateCheck.isChecked():
+            try:
+                template = PayloadTemplate(data)
+            except (ValueError, KeyError, OSError) as e:
+                QMessageBox.critical(self, "Error", f"Plantilla inválida:\n{e}")
+                return
+            send_template_now(topic, template, self.templateCountSpin.value(), self.templateRateSpin.value(), delay=delay,
+                              ack_window=self.publisherTab.ackWindow() if self.publisherTab is not None else 0, mode=mode)
+        else:
+            acknowledge = self.publisherTab is not None and self.publisherTab.ackCheck.isChecked()
+            send_message_now(topic, data, delay=delay, acknowledge=acknowledge, mode=mode)
         publish_time = datetime.datetime.now() + datetime.timedelta(seconds=delay)
         publish_time_str = publish_time.strftime("%Y-%m-%d %H:%M:%S")
         sent_message = json.dumps(data, indent=2, ensure_ascii=False)
@@ -238,10 +508,17 @@ class MessageConfigWidget(QGroupBox):
             self.parent().addPublisherLog(self.realmCombo.currentText(), self.topicEdit.text().strip(), publish_time_str, sent_message)
 
     def getConfig(self):
+        if not self.built:
+            # Mensaje plegado que nunca se ha desplegado: su configuración es la definición cargada
+            return {"id": self.msg_id, **self.definition}
         return {
             "id": self.msg_id,
             "realm": self.realmCombo.currentText(),
             "router_url": self.urlEdit.text().strip(),
             "topic": self.topicEdit.text().strip(),
-            "content": json.loads(self.editorWidget.jsonPreview.toPlainText())
+            "payload_mode": self.payloadModeCombo.currentData(),
+            "template": {"enabled": self.templateCheck.isChecked(), "count": self.templateCountSpin.value(),
+                         "rate": self.templateRateSpin.value()},
+            "schedule": self.editorWidget.getScheduleConfig(),
+            "content": self.editorWidget.parsedContent()
         }
@@ -0,0 +1,81 @@
+# publisher/pubProject.py
+"""
+Proyectos del publicador: un fichero JSON con todas las definiciones de mensajes
+  {"version": 1, "messages": [{"realm", "router_url", "topic", "payload_mode",
+                               "template": {"enabled", "count", "rate"},
+                               "schedule": {"mode", "time", "rate", "interval", "burst", "count", "profile"},
+                               "content": <payload>}, ...]}
+"""
+import os, json
+from common.payload import PAYLOAD_MODES, DEFAULT_PAYLOAD_MODE
+from load.profiles import parse_profile, ProfileError
+from .pubScheduler import SEND_MODES, MODE_ON_DEMAND, MODE_PROFILE
+
+PROJECT_VERSION = 1
+PROJECT_FILTER = "Proyecto WamPy (*.wampy.json);;JSON Files (*.json);;All Files (*)"
+
+DEFAULT_DEFINITION = {
+    "realm": "default",
+    "router_url": "ws://127.0.0.1:60001/ws",
+    "topic": "com.ads.midshmi.topic",
+    "payload_mode": DEFAULT_PAYLOAD_MODE,
+    "template": {"enabled": False, "count": 100, "rate": 0.0},
+    "schedule": {"mode": MODE_ON_DEMAND, "time": "00:00:00", "rate": 10.0, "interval": 1.0, "burst": 10, "count": 0, "profile": ""},
+    "content": {},
+}
+
+class ProjectError(ValueError):
+    pass
+
+def normalize_definition(data):
+    """
+    Completa una definición con los valores por defecto y comprueba los campos básicos.
+    """
+    if not isinstance(data, dict):
+        raise ProjectError("Cada mensaje debe ser un objeto JSON")
+    definition = {key: data.get(key, value) for key, value in DEFAULT_DEFINITION.items()}
+    definition["template"] = {**DEFAULT_DEFINITION["template"], **(data.get("template") or {})}
+    definition["schedule"] = {**DEFAULT_DEFINITION["schedule"], **(data.get("schedule") or {})}
+    if definition["payload_mode"] not in PAYLOAD_MODES:
+        raise ProjectError(f"Modo de payload desconocido: {definition['payload_mode']}")
+    if definition["schedule"]["mode"] not in SEND_MODES:
+        raise ProjectError(f"Modo de envío desconocido: {definition['schedule']['mode']}")
+    if definition["schedule"]["mode"] == MODE_PROFILE:
+        try:
+            parse_profile(definition["schedule"]["profile"])
+        except ProfileError as e:
+            raise ProjectError(str(e))
+    return definition
+
+def save_project(path, definitions):
+    """
+    Guarda las definiciones de mensajes (de forma atómica: fichero temporal + rename).
+    """
+    data = {"version": PROJECT_VERSION, "messages": [normalize_definition(d) for d in definitions]}
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def load_project(path):
+    """
+    Lee un proyecto y devuelve la lista de definiciones normalizadas.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        messages = data
+    elif isinstance(data, dict):
+        if data.get("version", PROJECT_VERSION) > PROJECT_VERSION:
+            raise ProjectError(f"Versión de proyecto no soportada: {data.get('version')}")
+        messages = data.get("messages", [])
+    else:
+        raise ProjectError("El proyecto debe ser un objeto JSON con la lista 'messages'")
+    return [normalize_definition(m) for m in messages]
+
+def summarize(msg_id, definition):
+    """
+    Título resumido de un mensaje plegado.
+    """
+    schedule = definition["schedule"]
+    return f"Mensaje #{msg_id} - {definition['topic']} - {schedule['mode']} - {schedule['time']}"
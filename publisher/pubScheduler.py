@@ -0,0 +1,259 @@
+# publisher/pubScheduler.py
+import heapq, datetime, itertools, threading
+from load.profiles import RateRecorder, YIELD_EVERY
+
+# Modos de envío disponibles para cada mensaje
+MODE_ON_DEMAND = "On-demand"
+MODE_DELAY = "Programado"
+MODE_WALL_CLOCK = "Hora de sistema"
+MODE_RATE = "Frecuencia (Hz)"
+MODE_INTERVAL = "Intervalo"
+MODE_BURST = "Ráfaga"
+MODE_PROFILE = "Perfil de carga"
+SEND_MODES = [MODE_ON_DEMAND, MODE_DELAY, MODE_WALL_CLOCK, MODE_RATE, MODE_INTERVAL, MODE_BURST, MODE_PROFILE]
+
+# Si un trabajo periódico acumula más retraso que esto, se resincroniza en vez de recuperar envíos
+MAX_CATCH_UP = 1.0
+
+def parse_hms(text):
+    """
+    Convierte "HH:MM:SS" en segundos. Devuelve 0 si el texto no es válido.
+    """
+    try:
+        h, m, s = map(int, text.strip().split(":"))
+        return h * 3600 + m * 60 + s
+    except (ValueError, AttributeError):
+        return 0
+
+def seconds_until(hms_text, now=None):
+    """
+    Segundos hasta la próxima vez que el reloj del sistema marque "HH:MM:SS" (hoy o mañana).
+    """
+    now = now or datetime.datetime.now()
+    secs = parse_hms(hms_text)
+    target = now.replace(hour=0, minute=0, second=0, microsecond=0) + datetime.timedelta(seconds=secs)
+    if target <= now:
+        target += datetime.timedelta(days=1)
+    return (target - now).total_seconds()
+
+class ScheduledJob:
+    """
+    Trabajo de envío de un mensaje. 'payload' es una función f(n) que devuelve el mensaje n-ésimo
+    (n cuenta desde 0). 'count' limita el número total de mensajes (0 = sin límite).
+    'payload_mode' es el modo de codificación del payload (common.payload); None = el de por defecto.
+    'target' identifica la sesión que lo envía (p. ej. (router, realm)): ver PublishScheduler.attach().
+    En modo perfil, 'profile' (load.profiles) da los instantes de envío y 'recorder' guarda la tasa
+    planificada frente a la conseguida.
+    """
+    def __init__(self, topic, payload, mode, time_text="00:00:00", rate=1.0, interval=1.0,
+                 burst=1, count=0, on_done=None, payload_mode=None, profile=None, target=None):
+        self.topic = topic
+        self.target = target
+        self.payload = payload
+        self.payload_mode = payload_mode
+        self.mode = mode
+        self.time_text = time_text
+        self.rate = rate
+        self.interval = interval
+        self.burst = max(1, int(burst))
+        self.count = int(count)
+        self.on_done = on_done
+        self.profile = profile
+        self.recorder = None
+        self.sent = 0
+        self.cancelled = False
+        self._offsets = None
+        self._started = 0.0
+
+    def first_delay(self):
+        if self.mode == MODE_DELAY:
+            return parse_hms(self.time_text)
+        if self.mode == MODE_WALL_CLOCK:
+            return seconds_until(self.time_text)
+        return 0.0
+
+    def period(self):
+        if self.mode == MODE_RATE:
+            return 1.0 / self.rate if self.rate > 0 else None
+        if self.mode in (MODE_INTERVAL, MODE_BURST):
+            return self.interval if self.interval > 0 else None
+        return None
+
+    def first_due(self, now):
+        """
+        Instante (reloj del bucle) del primer envío; None si el perfil no tiene ninguno.
+        """
+        if self.mode == MODE_PROFILE:
+            self.recorder = RateRecorder()
+            self._offsets = iter(self.profile.times())
+            self._started = now
+            return self._next_offset()
+        return now + self.first_delay()
+
+    def next_due(self, due, now):
+        """
+        Instante del siguiente envío tras el de 'due'; None si no hay más.
+        """
+        if self.mode == MODE_PROFILE:
+            # Sin resincronizar: los envíos atrasados salen seguidos y el retraso queda registrado
+            return self._next_offset()
+        next_due = due + self.period()
+        if now - next_due > MAX_CATCH_UP:
+            next_due = now
+        return next_due
+
+    def _next_offset(self):
+        offset = next(self._offsets, None)
+        return None if offset is None else self._started + offset
+
+    def record(self, due, now):
+        if self.recorder is not None:
+            self.recorder.record(due - self._started, now - self._started)
+
+    def finished(self):
+        if self.cancelled or (self.count > 0 and self.sent >= self.count):
+            return True
+        return self.mode != MODE_PROFILE and self.period() is None and self.sent > 0
+
+    def cancel(self):
+        self.cancelled = True
+
+class PublishScheduler:
+    """
+    Planificador único para todos los envíos periódicos/programados. Vive en el bucle asyncio de
+    la sesión: una sola corrutina despierta en el siguiente instante de una cola de prioridad,
+    en lugar de un temporizador por widget. Los trabajos se pueden añadir desde cualquier hilo;
+    cada uno se envía con la sesión de su 'target' y, hasta que esa sesión se une (attach()),
+    queda pendiente.
+    """
+    def __init__(self):
+        self.loop = None
+        self.publishers = {}   # target -> publish(topic, message, payload_mode)
+        self._waiting = {}     # target -> trabajos que esperan a su sesión
+        self._heap = []
+        self._seq = itertools.count()
+        self._pending = []
+        self._jobs = set()
+        self._wakeup = None
+        self._task = None
+        self._lock = threading.Lock()
+
+    def attach(self, loop, publish, target=None):
+        """
+        Asocia el planificador a un bucle y registra la función publish(topic, message, payload_mode)
+        de la sesión que envía los trabajos de 'target' (la que se une de nuevo al mismo target
+        sustituye a la anterior). Debe llamarse desde el hilo del bucle (por ejemplo en onJoin).
+        """
+        with self._lock:
+            if self.loop is not None and self.loop is not loop and not self.loop.is_closed():
+                # Solo hay un planificador: lo conduce la primera sesión que se une
+                return
+            if self.loop is not loop:
+                self.publishers = {}
+            self.loop = loop
+            self.publishers[target] = publish
+            pending, self._pending = self._pending, []
+            pending.extend(self._waiting.pop(target, []))
+        import asyncio
+        # Con el bucle compartido cada sesión que se une vuelve a llamar a attach(): la corrutina que
+        # ya corre en este bucle se conserva junto con el Event en el que espera
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        for job in pending:
+            self._add(job)
+
+    def add(self, job):
+        with self._lock:
+            if self.loop is None:
+                self._pending.append(job)
+                return job
+            loop = self.loop
+        loop.call_soon_threadsafe(self._add, job)
+        return job
+
+    def cancel_all(self):
+        with self._lock:
+            jobs = list(self._jobs) + self._pending
+            self._pending = []
+            for waiting in self._waiting.values():
+                jobs.extend(waiting)
+            self._waiting = {}
+        for job in jobs:
+            job.cancel()
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _add(self, job):
+        if job.target not in self.publishers:
+            with self._lock:
+                self._waiting.setdefault(job.target, []).append(job)
+            return
+        self._jobs.add(job)
+        due = job.first_due(self.loop.time())
+        if due is None:
+            self._finish(job)
+            return
+        heapq.heappush(self._heap, (due, next(self._seq), job))
+        self._wakeup.set()
+
+    async def _run(self):
+        import asyncio
+        loop = self.loop
+        overdue = 0
+        while True:
+            # Se descartan los trabajos cancelados que estén al frente de la cola
+            while self._heap and self._heap[0][2].cancelled:
+                self._finish(heapq.heappop(self._heap)[2])
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            due, _, job = self._heap[0]
+            wait = due - loop.time()
+            if wait > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                overdue = 0
+                continue
+            overdue += 1
+            if overdue >= YIELD_EVERY:
+                # Un perfil atrasado dispara envíos seguidos sin esperar: se cede el bucle compartido
+                # cada YIELD_EVERY para que el resto de sesiones siga atendiendo su tráfico
+                overdue = 0
+                await asyncio.sleep(0)
+                continue
+            heapq.heappop(self._heap)
+            self._fire(job, due)
+            if job.finished():
+                self._finish(job)
+                continue
+            # El siguiente instante se calcula sobre el planificado (sin deriva acumulada)
+            next_due = job.next_due(due, loop.time())
+            if next_due is None:
+                self._finish(job)
+                continue
+            heapq.heappush(self._heap, (next_due, next(self._seq), job))
+
+    def _fire(self, job, due):
+        size = job.burst if job.mode == MODE_BURST else 1
+        if job.count > 0:
+            size = min(size, job.count - job.sent)
+        publish = self.publishers[job.target]
+        for _ in range(size):
+            try:
+                publish(job.topic, job.payload(job.sent), job.payload_mode)
+            except Exception as e:
+                print("Error en envío programado:", e)
+                job.cancel()
+                return
+            job.sent += 1
+            job.record(due, self.loop.time())
+
+    def _finish(self, job):
+        self._jobs.discard(job)
+        if job.on_done is not None:
+            job.on_done(job)
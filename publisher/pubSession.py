@@ -0,0 +1,15 @@
+# publisher/pubSession.py
+# Sesión WAMP del publicador. Se importa solo al abrir la primera conexión (autobahn es costoso de cargar).
+import asyncio
+from autobahn.asyncio.wamp import ApplicationSession
+
+class JSONPublisher(ApplicationSession):
+    def __init__(self, config, topic, on_join=None):
+        super().__init__(config)
+        self.topic = topic
+        self.on_join = on_join
+    async def onJoin(self, details):
+        if self.on_join:
+            self.on_join(self, asyncio.get_event_loop())
+        print("Conexión establecida en el publicador (realm:", self.config.realm, ")")
+        await asyncio.Future()
@@ -0,0 +1,228 @@
+# publisher/pubTemplate.py
+"""
+Motor de plantillas de payload para pruebas de carga.
+Los valores de texto del JSON pueden contener marcadores {{tipo:args}}:
+  {{counter}} / {{counter:inicio,paso}}   contador por mensaje (entero)
+  {{timestamp}}                           hora UTC ISO 8601 ("2025-02-24T14:00:00Z")
+  {{timestamp:epoch}} / {{timestamp:epoch_ms}} / {{timestamp:<formato strftime>}}
+  {{random:min,max}}                      float uniforme
+  {{randint:min,max}}                     entero uniforme
+  {{choice:a|b|c}}                        valor aleatorio de la lista
+  {{csv:fichero,columna}}                 valores de una columna CSV, recorridos en orden
+Si el marcador ocupa todo el valor, se sustituye por un valor tipado; si está dentro de un
+texto, se interpola como cadena. La plantilla se compila una sola vez: al generar solo se
+copian los contenedores que tienen algún marcador, el resto se comparte entre mensajes.
+"""
+import re, csv, json, time, random, datetime
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*(?::(.*?))?\s*\}\}")
+
+class TemplateError(ValueError):
+    pass
+
+class _Context:
+    __slots__ = ("index", "now")
+    def __init__(self, index, now):
+        self.index = index
+        self.now = now
+
+# Las columnas CSV se cargan una vez por fichero y se comparten entre plantillas
+_csv_cache = {}
+
+def _load_csv_column(path, column):
+    key = (path, column)
+    if key not in _csv_cache:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            fieldnames = reader.fieldnames or []
+            if column.isdigit() and column not in fieldnames:
+                index = int(column)
+                if index >= len(fieldnames):
+                    raise TemplateError(f"{path} no tiene columna {index} (tiene {len(fieldnames)})")
+                column = fieldnames[index]
+            elif column not in fieldnames:
+                raise TemplateError(f"{path} no tiene la columna '{column}'")
+            # Las filas cortas dejan vacías (None) las columnas que faltan
+            values = [row[column] for row in reader if row[column] is not None]
+        if not values:
+            raise TemplateError(f"La columna '{column}' de {path} está vacía")
+        _csv_cache[key] = [_parse_scalar(v) for v in values]
+    return _csv_cache[key]
+
+def _parse_scalar(text):
+    # Los valores CSV se convierten a número si es posible
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+def _split_args(args):
+    return [a.strip() for a in args.split(",")] if args else []
+
+def _compile_placeholder(kind, args):
+    """
+    Devuelve una función f(ctx) que produce el valor del marcador.
+    """
+    parts = _split_args(args)
+    if kind == "counter":
+        start = int(parts[0]) if len(parts) > 0 and parts[0] else 0
+        step = int(parts[1]) if len(parts) > 1 and parts[1] else 1
+        return lambda ctx: start + step * ctx.index
+    if kind == "timestamp":
+        fmt = (args or "").strip()
+        if not fmt:
+            return lambda ctx: datetime.datetime.fromtimestamp(ctx.now, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        if fmt == "epoch":
+            return lambda ctx: ctx.now
+        if fmt == "epoch_ms":
+            return lambda ctx: int(ctx.now * 1000)
+        return lambda ctx: datetime.datetime.fromtimestamp(ctx.now, datetime.timezone.utc).strftime(fmt)
+    if kind == "random":
+        if len(parts) != 2:
+            raise TemplateError("random requiere min,max")
+        low, high = float(parts[0]), float(parts[1])
+        uniform = random.uniform
+        return lambda ctx: uniform(low, high)
+    if kind == "randint":
+        if len(parts) != 2:
+            raise TemplateError("randint requiere min,max")
+        low, high = int(parts[0]), int(parts[1])
+        randint = random.randint
+        return lambda ctx: randint(low, high)
+    if kind == "choice":
+        options = [_parse_scalar(o.strip()) for o in (args or "").split("|") if o.strip()]
+        if not options:
+            raise TemplateError("choice requiere al menos una opción")
+        choice = random.choice
+        return lambda ctx: choice(options)
+    if kind == "csv":
+        if len(parts) != 2:
+            raise TemplateError("csv requiere fichero,columna")
+        values = _load_csv_column(parts[0], parts[1])
+        count = len(values)
+        return lambda ctx: values[ctx.index % count]
+    raise TemplateError(f"Marcador desconocido: {kind}")
+
+def _compile_string(text):
+    matches = list(PLACEHOLDER_RE.finditer(text))
+    if not matches:
+        return None
+    if len(matches) == 1 and matches[0].span() == (0, len(text)):
+        return _compile_placeholder(matches[0].group(1), matches[0].group(2))
+    # Interpolación dentro de un texto: se alternan trozos fijos y funciones
+    pieces, pos = [], 0
+    for m in matches:
+        if m.start() > pos:
+            pieces.append(text[pos:m.start()])
+        pieces.append(_compile_placeholder(m.group(1), m.group(2)))
+        pos = m.end()
+    if pos < len(text):
+        pieces.append(text[pos:])
+    def render(ctx):
+        return "".join(p if isinstance(p, str) else str(p(ctx)) for p in pieces)
+    return render
+
+def _compile_node(node):
+    """
+    Devuelve None si el nodo es estático o una función f(ctx) que construye el nodo.
+    """
+    if isinstance(node, str):
+        return _compile_string(node)
+    if isinstance(node, dict):
+        dynamic = [(k, f) for k, f in ((k, _compile_node(v)) for k, v in node.items()) if f is not None]
+        if not dynamic:
+            return None
+        base = node
+        def render_dict(ctx):
+            out = base.copy()
+            for key, fn in dynamic:
+                out[key] = fn(ctx)
+            return out
+        return render_dict
+    if isinstance(node, list):
+        dynamic = [(i, f) for i, f in ((i, _compile_node(v)) for i, v in enumerate(node)) if f is not None]
+        if not dynamic:
+            return None
+        base = node
+        def render_list(ctx):
+            out = base.copy()
+            for index, fn in dynamic:
+                out[index] = fn(ctx)
+            return out
+        return render_list
+    return None
+
+class PayloadTemplate:
+    """
+    Plantilla compilada. render(i) devuelve el payload número i; generate() produce una secuencia.
+    Las partes sin marcadores se comparten entre payloads y no deben modificarse.
+    """
+    def __init__(self, template):
+        self.template = template
+        self._render = _compile_node(template)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @property
+    def is_dynamic(self):
+        return self._render is not None
+
+    def render(self, index=0, now=None):
+        if self._render is None:
+            return self.template
+        return self._render(_Context(index, time.time() if now is None else now))
+
+    def generate(self, count, start=0):
+        render = self._render
+        if render is None:
+            for _ in range(count):
+                yield self.template
+            return
+        for index in range(start, start + count):
+            yield render(_Context(index, time.time()))
+
+async def publish_template(session, topic, template, count, rate=0, start=0, tracker=None, mode=None):
+    """
+    Publica 'count' payloads generados por la plantilla. Con rate > 0 se reparten a esa tasa
+    (mensajes/segundo) sobre el reloj del bucle; si se va con retraso se envía sin esperar.
+    Con 'tracker' (DeliveryTracker) cada mensaje se publica con confirmación y se espera a todas
+    antes de devolver; el informe de entrega se añade al resultado en "delivery".
+    'mode' es el modo de payload (common.payload); por defecto, kwargs.
+    Devuelve un diccionario con el número de mensajes enviados, la duración y la tasa conseguida.
+    """
+    import asyncio
+    from .pubAck import publish_message
+    from common.payload import DEFAULT_PAYLOAD_MODE
+    mode = mode or DEFAULT_PAYLOAD_MODE
+    loop = asyncio.get_event_loop()
+    interval = 1.0 / rate if rate and rate > 0 else 0
+    t0 = loop.time()
+    sent = 0
+    for message in template.generate(count, start):
+        if interval:
+            wait = t0 + sent * interval - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        if tracker is not None:
+            # Con la ventana llena espera a que lleguen confirmaciones
+            await tracker.publish(session, topic, message, mode)
+        else:
+            publish_message(session, topic, message, mode=mode)
+        sent += 1
+        if not interval and tracker is None and sent % 1000 == 0:
+            # Cede el bucle para no bloquear el resto de sesiones en ráfagas largas
+            await asyncio.sleep(0)
+    if tracker is not None:
+        await tracker.wait_all()
+    elapsed = loop.time() - t0
+    stats = {"sent": sent, "elapsed": elapsed, "rate": sent / elapsed if elapsed > 0 else 0.0}
+    if tracker is not None:
+        stats["delivery"] = tracker.report()
+    return stats
@@ -0,0 +1,367 @@
+# router/miniRouter.py
+"""
+Router WAMP mínimo para pruebas de integración y benchmarks sin servicios externos.
+Implementa el subconjunto que usa la herramienta: HELLO/WELCOME, SUBSCRIBE/UNSUBSCRIBE, PUBLISH
+(con acknowledge y exclude_me), REGISTER/UNREGISTER, CALL/INVOCATION/YIELD/ERROR y GOODBYE,
+sobre WebSocket y RawSocket (TCP o socket Unix). Sin autenticación ni autorización; los topics y
+procedimientos se comparan de forma exacta. Los payloads passthrough se reenvían sin decodificar.
+Uso como subproceso:
+  python -m router.miniRouter --ws-port 60001 --rs-port 60002
+"""
+import sys, json, random, asyncio, argparse, threading, itertools
+
+# Cola de conexiones pendientes de aceptar: la de asyncio (100) se desborda con tormentas de conexiones
+LISTEN_BACKLOG = 2048
+# Atributos de payload passthrough que se copian tal cual de PUBLISH/CALL/YIELD/ERROR
+PASSTHROUGH_ATTRS = ("payload", "enc_algo", "enc_key", "enc_serializer")
+
+def _passthrough(msg):
+    return {name: getattr(msg, name) for name in PASSTHROUGH_ATTRS if getattr(msg, name, None) is not None}
+
+class Realm:
+    """
+    Estado de un realm: suscripciones (topic -> id y sesiones), registros e invocaciones en curso.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.topics = {}         # topic -> (id de suscripción, set de sesiones)
+        self.subscriptions = {}  # id de suscripción -> topic
+        self.procedures = {}     # procedimiento -> (id de registro, sesión)
+        self.registrations = {}  # id de registro -> procedimiento
+        self.invocations = {}    # id de invocación -> (sesión llamante, id de la llamada)
+
+class RouterSession:
+    """
+    Sesión de router (ITransportHandler de autobahn): una por conexión entrante.
+    """
+    def __init__(self, router):
+        self.router = router
+        self.transport = None
+        self.realm = None
+        # autobahn lee estos dos atributos del handler al trazar los mensajes
+        self._session_id = None
+        self._authid = None
+        self.subscriptions = set()
+        self.registrations = set()
+
+    # --- ITransportHandler ---
+
+    def onOpen(self, transport):
+        self.transport = transport
+
+    def onClose(self, wasClean):
+        if self.realm is not None:
+            self.router.detach(self)
+        self.transport = None
+
+    def onMessage(self, msg):
+        handler = self.router.handlers.get(type(msg))
+        if handler is None:
+            return
+        if self.realm is None and type(msg) is not self.router.message.Hello:
+            self.abort("wamp.error.protocol_violation", "Mensaje antes de HELLO")
+            return
+        handler(self, msg)
+
+    # --- utilidades ---
+
+    def send(self, msg):
+        if self.transport is not None:
+            try:
+                self.transport.send(msg)
+            except self.router.send_errors:
+                # La conexión se está cerrando: onClose() limpiará la sesión
+                pass
+
+    def abort(self, reason, text):
+        self.send(self.router.message.Abort(reason, text))
+        if self.transport is not None:
+            self.transport.close()
+
+class MiniRouter:
+    """
+    Router en proceso. start() abre los listeners en el bucle actual y devuelve las URL de conexión;
+    stop() los cierra. Los realms se crean al primer HELLO.
+    """
+    def __init__(self):
+        from autobahn.wamp import message
+        from autobahn.exception import Disconnected
+        from autobahn.wamp.exception import TransportLost
+        self.message = message
+        self.send_errors = (Disconnected, TransportLost)
+        self.realms = {}
+        self.sessions = {}
+        self.servers = []
+        self.endpoints = {}
+        self._ids = itertools.count(1)
+        self.handlers = {
+            message.Hello: self._on_hello,
+            message.Goodbye: self._on_goodbye,
+            message.Subscribe: self._on_subscribe,
+            message.Unsubscribe: self._on_unsubscribe,
+            message.Publish: self._on_publish,
+            message.Register: self._on_register,
+            message.Unregister: self._on_unregister,
+            message.Call: self._on_call,
+            message.Yield: self._on_yield,
+            message.Error: self._on_error,
+        }
+        self.published = 0
+        self.delivered = 0
+
+    def _next_id(self):
+        return next(self._ids)
+
+    def _factory(self):
+        return RouterSession(self)
+
+    async def start(self, host="127.0.0.1", ws_port=0, rs_port=None, unix_path=None):
+        """
+        Abre los listeners pedidos (puerto 0 = cualquiera libre; None = no abrir) y devuelve
+        {"ws": url, "rs": url, "unix": url} con los que se hayan abierto.
+        """
+        from autobahn.asyncio.websocket import WampWebSocketServerFactory
+        from autobahn.asyncio.rawsocket import WampRawSocketServerFactory
+        loop = asyncio.get_running_loop()
+        if ws_port is not None:
+            factory = WampWebSocketServerFactory(self._factory)
+            # Se acepta también permessage-deflate si el cliente lo ofrece
+            factory.setProtocolOptions(perMessageCompressionAccept=self._accept_deflate)
+            server = await loop.create_server(factory, host, ws_port, backlog=LISTEN_BACKLOG)
+            self.servers.append(server)
+            self.endpoints["ws"] = f"ws://{host}:{server.sockets[0].getsockname()[1]}/ws"
+        if rs_port is not None:
+            server = await loop.create_server(WampRawSocketServerFactory(self._factory), host, rs_port, backlog=LISTEN_BACKLOG)
+            self.servers.append(server)
+            self.endpoints["rs"] = f"rs://{host}:{server.sockets[0].getsockname()[1]}"
+        if unix_path is not None:
+            server = await loop.create_unix_server(WampRawSocketServerFactory(self._factory), unix_path, backlog=LISTEN_BACKLOG)
+            self.servers.append(server)
+            self.endpoints["unix"] = f"unix://{unix_path}"
+        return dict(self.endpoints)
+
+    @staticmethod
+    def _accept_deflate(offers):
+        from autobahn.websocket.compress import PerMessageDeflateOffer, PerMessageDeflateOfferAccept
+        for offer in offers:
+            if isinstance(offer, PerMessageDeflateOffer):
+                return PerMessageDeflateOfferAccept(offer)
+        return None
+
+    async def stop(self):
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        self.servers = []
+
+    # --- sesiones ---
+
+    def detach(self, session):
+        realm = session.realm
+        for subscription_id in list(session.subscriptions):
+            self._remove_subscriber(realm, session, subscription_id)
+        for registration_id in list(session.registrations):
+            self._remove_registration(realm, registration_id)
+        # Las llamadas pendientes hacia esta sesión fallan
+        for invocation_id, (caller, call_request, callee) in list(realm.invocations.items()):
+            if callee is session:
+                del realm.invocations[invocation_id]
+                caller.send(self.message.Error(self.message.Call.MESSAGE_TYPE, call_request, "wamp.error.canceled"))
+            elif caller is session:
+                del realm.invocations[invocation_id]
+        self.sessions.pop(session._session_id, None)
+        session.realm = None
+
+    def _on_hello(self, session, msg):
+        from autobahn.wamp.role import RoleBrokerFeatures, RoleDealerFeatures
+        if session.realm is not None:
+            session.abort("wamp.error.protocol_violation", "HELLO repetido")
+            return
+        realm = self.realms.get(msg.realm)
+        if realm is None:
+            realm = self.realms[msg.realm] = Realm(msg.realm)
+        session.realm = realm
+        session._session_id = random.randint(1, 2 ** 53)
+        session._authid = msg.authid or f"anon-{session._session_id}"
+        self.sessions[session._session_id] = session
+        roles = {
+            "broker": RoleBrokerFeatures(publisher_exclusion=True, payload_transparency=True),
+            "dealer": RoleDealerFeatures(payload_transparency=True),
+        }
+        session.send(self.message.Welcome(session._session_id, roles, realm=msg.realm,
+                                          authid=session._authid, authrole="anonymous",
+                                          authmethod="anonymous", authprovider="static"))
+
+    def _on_goodbye(self, session, msg):
+        self.detach(session)
+        session.send(self.message.Goodbye("wamp.close.goodbye_and_out"))
+
+    # --- publish/subscribe ---
+
+    def _on_subscribe(self, session, msg):
+        realm = session.realm
+        entry = realm.topics.get(msg.topic)
+        if entry is None:
+            entry = realm.topics[msg.topic] = (self._next_id(), set())
+            realm.subscriptions[entry[0]] = msg.topic
+        entry[1].add(session)
+        session.subscriptions.add(entry[0])
+        session.send(self.message.Subscribed(msg.request, entry[0]))
+
+    def _remove_subscriber(self, realm, session, subscription_id):
+        session.subscriptions.discard(subscription_id)
+        topic = realm.subscriptions.get(subscription_id)
+        if topic is None:
+            return False
+        subscribers = realm.topics[topic][1]
+        subscribers.discard(session)
+        if not subscribers:
+            del realm.topics[topic]
+            del realm.subscriptions[subscription_id]
+        return True
+
+    def _on_unsubscribe(self, session, msg):
+        if msg.subscription in session.subscriptions and self._remove_subscriber(session.realm, session, msg.subscription):
+            session.send(self.message.Unsubscribed(msg.request))
+        else:
+            session.send(self.message.Error(self.message.Unsubscribe.MESSAGE_TYPE, msg.request, "wamp.error.no_such_subscription"))
+
+    def _on_publish(self, session, msg):
+        publication = self._next_id()
+        self.published += 1
+        entry = session.realm.topics.get(msg.topic)
+        if entry is not None:
+            subscription_id, subscribers = entry
+            exclude_me = msg.exclude_me is None or msg.exclude_me
+            extra = _passthrough(msg)
+            if not extra:
+                extra = {"args": msg.args, "kwargs": msg.kwargs}
+            event = self.message.Event(subscription_id, publication, **extra)
+            for subscriber in subscribers:
+                if subscriber is session and exclude_me:
+                    continue
+                subscriber.send(event)
+                self.delivered += 1
+        if msg.acknowledge:
+            session.send(self.message.Published(msg.request, publication))
+
+    # --- RPC ---
+
+    def _on_register(self, session, msg):
+        realm = session.realm
+        if msg.procedure in realm.procedures:
+            session.send(self.message.Error(self.message.Register.MESSAGE_TYPE, msg.request, "wamp.error.procedure_already_exists"))
+            return
+        registration_id = self._next_id()
+        realm.procedures[msg.procedure] = (registration_id, session)
+        realm.registrations[registration_id] = msg.procedure
+        session.registrations.add(registration_id)
+        session.send(self.message.Registered(msg.request, registration_id))
+
+    def _remove_registration(self, realm, registration_id):
+        procedure = realm.registrations.pop(registration_id, None)
+        if procedure is None:
+            return None
+        _, callee = realm.procedures.pop(procedure)
+        callee.registrations.discard(registration_id)
+        return callee
+
+    def _on_unregister(self, session, msg):
+        if msg.registration in session.registrations:
+            self._remove_registration(session.realm, msg.registration)
+            session.send(self.message.Unregistered(msg.request))
+        else:
+            session.send(self.message.Error(self.message.Unregister.MESSAGE_TYPE, msg.request, "wamp.error.no_such_registration"))
+
+    def _on_call(self, session, msg):
+        realm = session.realm
+        entry = realm.procedures.get(msg.procedure)
+        if entry is None:
+            session.send(self.message.Error(self.message.Call.MESSAGE_TYPE, msg.request, "wamp.error.no_such_procedure"))
+            return
+        registration_id, callee = entry
+        invocation_id = self._next_id()
+        realm.invocations[invocation_id] = (session, msg.request, callee)
+        extra = _passthrough(msg) or {"args": msg.args, "kwargs": msg.kwargs}
+        callee.send(self.message.Invocation(invocation_id, registration_id, timeout=msg.timeout, **extra))
+
+    def _on_yield(self, session, msg):
+        pending = session.realm.invocations.get(msg.request)
+        if pending is None or pending[2] is not session:
+            return
+        caller, call_request, _ = pending
+        if not msg.progress:
+            del session.realm.invocations[msg.request]
+        extra = _passthrough(msg) or {"args": msg.args, "kwargs": msg.kwargs}
+        caller.send(self.message.Result(call_request, progress=msg.progress, **extra))
+
+    def _on_error(self, session, msg):
+        # Solo se esperan ERROR de respuesta a una INVOCATION
+        if msg.request_type != self.message.Invocation.MESSAGE_TYPE:
+            return
+        pending = session.realm.invocations.pop(msg.request, None)
+        if pending is None:
+            return
+        caller, call_request, _ = pending
+        extra = _passthrough(msg) or {"args": msg.args, "kwargs": msg.kwargs}
+        caller.send(self.message.Error(self.message.Call.MESSAGE_TYPE, call_request, msg.error, **extra))
+
+def start_router_thread(host="127.0.0.1", ws_port=0, rs_port=0, unix_path=None):
+    """
+    Arranca un MiniRouter en un hilo propio (para pruebas desde código síncrono).
+    Devuelve (router, endpoints, stop) donde stop() lo detiene.
+    """
+    from common.wampRuntime import new_event_loop
+    loop = new_event_loop()
+    ready = threading.Event()
+    result = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        router = MiniRouter()
+        try:
+            result["endpoints"] = loop.run_until_complete(router.start(host, ws_port, rs_port, unix_path))
+        except Exception as e:
+            result["error"] = e
+        result["router"] = router
+        ready.set()
+        if "error" not in result:
+            loop.run_forever()
+
+    threading.Thread(target=run, name="mini-router", daemon=True).start()
+    ready.wait()
+    if "error" in result:
+        raise result["error"]
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(result["router"].stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    return result["router"], result["endpoints"], stop
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Router WAMP mínimo para pruebas")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--ws-port", type=int, default=0, help="Puerto WebSocket (0 = libre, -1 = desactivado)")
+    parser.add_argument("--rs-port", type=int, default=0, help="Puerto RawSocket (0 = libre, -1 = desactivado)")
+    parser.add_argument("--unix", help="Ruta del socket Unix RawSocket")
+    args = parser.parse_args(argv)
+
+    from common.wampRuntime import new_event_loop
+    loop = new_event_loop()
+    asyncio.set_event_loop(loop)
+    router = MiniRouter()
+    endpoints = loop.run_until_complete(router.start(args.host, None if args.ws_port < 0 else args.ws_port,
+                                                     None if args.rs_port < 0 else args.rs_port, args.unix))
+    # Primera línea de la salida: los endpoints en JSON, para que el proceso padre pueda leerlos
+    print(json.dumps(endpoints), flush=True)
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(router.stop())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# rpc/rpcGUI.py
+import json, datetime
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QLineEdit, QPushButton, QComboBox,
+                             QPlainTextEdit, QSpinBox, QDoubleSpinBox, QProgressBar, QMessageBox)
+from PyQt5.QtCore import Qt, pyqtSlot, QMetaObject, Q_ARG
+from common.utils import log_to_file
+from common.wampRuntime import get_runtime
+from .rpcLoad import TEST_PREFIX
+
+global_session_rpc = None
+global_loop_rpc = None
+
+def _on_rpc_join(session, loop):
+    global global_session_rpc, global_loop_rpc
+    global_session_rpc = session
+    global_loop_rpc = loop
+
+def start_rpc_session(url, realm):
+    def make_session(config):
+        from .rpcSession import RpcSession
+        return RpcSession(config, on_join=_on_rpc_join)
+    get_runtime().connect(url, realm, make_session)
+
+class RpcTab(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.running = False
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
+
+        connLayout = QHBoxLayout()
+        connLayout.addWidget(QLabel("Realm:"))
+        self.realmCombo = QComboBox()
+        self.realmCombo.setEditable(True)
+        self.realmCombo.addItems(["default", "ADS.MIDSHMI"])
+        connLayout.addWidget(self.realmCombo)
+        connLayout.addWidget(QLabel("Router URL:"))
+        self.urlEdit = QLineEdit("ws://127.0.0.1:60001/ws")
+        connLayout.addWidget(self.urlEdit)
+        self.connectButton = QPushButton("Conectar")
+        self.connectButton.clicked.connect(self.connectSession)
+        connLayout.addWidget(self.connectButton)
+        layout.addLayout(connLayout)
+
+        self.registerButton = QPushButton(f"Registrar procedimientos de prueba ({TEST_PREFIX}.echo/.sleep/.fail)")
+        self.registerButton.clicked.connect(self.registerProcedures)
+        layout.addWidget(self.registerButton)
+
+        formLayout = QFormLayout()
+        self.procedureEdit = QLineEdit(f"{TEST_PREFIX}.echo")
+        formLayout.addRow("Procedimiento:", self.procedureEdit)
+        self.callsSpin = QSpinBox()
+        self.callsSpin.setRange(1, 100000000)
+        self.callsSpin.setValue(1000)
+        formLayout.addRow("Llamadas:", self.callsSpin)
+        self.concurrencySpin = QSpinBox()
+        self.concurrencySpin.setRange(1, 100000)
+        self.concurrencySpin.setValue(10)
+        formLayout.addRow("Concurrencia:", self.concurrencySpin)
+        self.timeoutSpin = QDoubleSpinBox()
+        self.timeoutSpin.setRange(0.001, 3600)
+        self.timeoutSpin.setDecimals(3)
+        self.timeoutSpin.setValue(5)
+        formLayout.addRow("Timeout (s):", self.timeoutSpin)
+        self.payloadEdit = QPlainTextEdit('{"ping": 1}')
+        self.payloadEdit.setMaximumHeight(120)
+        formLayout.addRow("Payload (JSON, vacío = sin argumentos):", self.payloadEdit)
+        layout.addLayout(formLayout)
+
+        runLayout = QHBoxLayout()
+        self.runButton = QPushButton("Ejecutar prueba de carga")
+        self.runButton.clicked.connect(self.runLoad)
+        runLayout.addWidget(self.runButton)
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 100)
+        runLayout.addWidget(self.progress)
+        layout.addLayout(runLayout)
+
+        layout.addWidget(QLabel("Resultados:"))
+        self.resultView = QPlainTextEdit()
+        self.resultView.setReadOnly(True)
+        layout.addWidget(self.resultView)
+        self.setLayout(layout)
+
+    def connectSession(self):
+        start_rpc_session(self.urlEdit.text().strip(), self.realmCombo.currentText())
+        self.appendResult(f"Conectando a {self.urlEdit.text().strip()} (realm {self.realmCombo.currentText()})...")
+
+    def _checkSession(self):
+        if global_session_rpc is None or global_loop_rpc is None:
+            QMessageBox.critical(self, "Error", "No hay sesión RPC activa. Pulse 'Conectar' primero.")
+            return False
+        return True
+
+    def registerProcedures(self):
+        if not self._checkSession():
+            return
+        import asyncio
+        from .rpcLoad import register_test_procedures
+        future = asyncio.run_coroutine_threadsafe(register_test_procedures(global_session_rpc), global_loop_rpc)
+        future.add_done_callback(lambda f: self._postResult(
+            f"Error al registrar: {f.exception()}" if f.exception() else f"Registrados {len(f.result())} procedimientos en {TEST_PREFIX}"))
+
+    def runLoad(self):
+        if self.running or not self._checkSession():
+            return
+        text = self.payloadEdit.toPlainText().strip()
+        try:
+            payload = json.loads(text) if text else None
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"JSON inválido:\n{e}")
+            return
+        import asyncio
+        from .rpcLoad import call_load, format_report
+        procedure = self.procedureEdit.text().strip()
+        realm = self.realmCombo.currentText()
+        self.running = True
+        self.runButton.setEnabled(False)
+        self.progress.setValue(0)
+
+        def progress(done, total):
+            QMetaObject.invokeMethod(self.progress, "setValue", Qt.QueuedConnection, Q_ARG(int, done * 100 // total))
+
+        def finished(future):
+            if future.exception():
+                self._postResult(f"Error en la prueba: {future.exception()}")
+            else:
+                result = future.result()
+                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                log_to_file(timestamp, procedure, realm, json.dumps(result, indent=2, ensure_ascii=False))
+                self._postResult(format_report(result))
+            QMetaObject.invokeMethod(self, "onLoadFinished", Qt.QueuedConnection)
+
+        coro = call_load(global_session_rpc, procedure, payload, self.callsSpin.value(),
+                         self.concurrencySpin.value(), self.timeoutSpin.value(), progress)
+        asyncio.run_coroutine_threadsafe(coro, global_loop_rpc).add_done_callback(finished)
+
+    def _postResult(self, text):
+        # Puede llamarse desde el hilo de red: el texto se añade en el hilo de la interfaz
+        QMetaObject.invokeMethod(self, "appendResult", Qt.QueuedConnection, Q_ARG(str, text))
+
+    @pyqtSlot(str)
+    def appendResult(self, text):
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        self.resultView.appendPlainText(f"[{timestamp}] {text}\n")
+
+    @pyqtSlot()
+    def onLoadFinished(self):
+        self.running = False
+        self.runButton.setEnabled(True)
+        self.progress.setValue(100)
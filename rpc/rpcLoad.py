@@ -0,0 +1,91 @@
+# rpc/rpcLoad.py
+import time, asyncio
+from common.stats import LatencyStats, format_summary
+
+# Prefijo de los procedimientos de prueba que registra la herramienta
+TEST_PREFIX = "com.wampy.test"
+
+async def register_test_procedures(session, prefix=TEST_PREFIX):
+    """
+    Registra procedimientos de prueba en la sesión:
+      <prefix>.echo   devuelve los mismos argumentos que recibe
+      <prefix>.sleep  espera 'ms' milisegundos (primer argumento) y devuelve el resto
+      <prefix>.fail   siempre devuelve un error de aplicación
+    Devuelve la lista de registros (para poder anularlos con unregister()).
+    """
+    from autobahn.wamp.exception import ApplicationError
+
+    def echo(*args, **kwargs):
+        if kwargs:
+            return {"args": list(args), "kwargs": kwargs}
+        return args[0] if len(args) == 1 else list(args)
+
+    async def sleep(ms=0, *args):
+        await asyncio.sleep(float(ms) / 1000.0)
+        return args[0] if len(args) == 1 else list(args)
+
+    def fail(*args, **kwargs):
+        raise ApplicationError(f"{prefix}.error.fail", "Error de prueba")
+
+    registrations = []
+    for name, fn in (("echo", echo), ("sleep", sleep), ("fail", fail)):
+        registrations.append(await session.register(fn, f"{prefix}.{name}"))
+    return registrations
+
+async def call_load(session, procedure, payload=None, total=1000, concurrency=10, timeout=5.0, progress=None):
+    """
+    Lanza 'total' llamadas a 'procedure' con como mucho 'concurrency' en vuelo a la vez.
+    Cada llamada se cancela si tarda más de 'timeout' segundos. 'progress(hechas, total)' se invoca
+    periódicamente si se indica. Devuelve un diccionario con latencias, errores y rendimiento.
+    """
+    args = () if payload is None else (payload,)
+    stats = LatencyStats()
+    errors = {}
+    timeouts = 0
+    issued = 0
+    done = 0
+    report_every = max(1, total // 100)
+
+    async def worker():
+        nonlocal issued, done, timeouts
+        while issued < total:
+            issued += 1
+            t0 = time.perf_counter()
+            try:
+                await asyncio.wait_for(session.call(procedure, *args), timeout)
+                stats.add(time.perf_counter() - t0)
+            except asyncio.TimeoutError:
+                timeouts += 1
+            except Exception as e:
+                key = getattr(e, "error", None) or type(e).__name__
+                errors[key] = errors.get(key, 0) + 1
+            done += 1
+            if progress is not None and done % report_every == 0:
+                progress(done, total)
+
+    t_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, total)))))
+    elapsed = time.perf_counter() - t_start
+    return {
+        "procedure": procedure,
+        "calls": total,
+        "concurrency": concurrency,
+        "ok": len(stats),
+        "timeouts": timeouts,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput": len(stats) / elapsed if elapsed > 0 else 0.0,
+        "latency": stats.summary(),
+    }
+
+def format_report(result):
+    lines = [
+        f"Procedimiento: {result['procedure']}",
+        f"Llamadas: {result['calls']} (concurrencia {result['concurrency']})",
+        f"Correctas: {result['ok']}  Timeouts: {result['timeouts']}  Errores: {sum(result['errors'].values())}",
+        f"Duración: {result['elapsed_s']:.3f} s  Rendimiento: {result['throughput']:.1f} llamadas/s",
+        f"Latencia: {format_summary(result['latency'])}",
+    ]
+    for name, count in result["errors"].items():
+        lines.append(f"  {name}: {count}")
+    return "\n".join(lines)
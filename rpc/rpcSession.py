@@ -0,0 +1,14 @@
+# rpc/rpcSession.py
+# Sesión WAMP de la pestaña RPC. Se importa solo al abrir la conexión.
+import asyncio
+from autobahn.asyncio.wamp import ApplicationSession
+
+class RpcSession(ApplicationSession):
+    def __init__(self, config, on_join=None):
+        super().__init__(config)
+        self.on_join = on_join
+    async def onJoin(self, details):
+        if self.on_join:
+            self.on_join(self, asyncio.get_event_loop())
+        print("Conexión establecida en la sesión RPC (realm:", self.config.realm, ")")
+        await asyncio.Future()
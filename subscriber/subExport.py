@@ -0,0 +1,224 @@
+# subscriber/subExport.py
+"""
+Exportación de capturas (subRecorder) y logs de sesión (log_to_file) a Arrow/Parquet para
+analizarlos con pandas, DuckDB, etc.
+Los eventos se leen en streaming y se convierten en RecordBatch de 'row_group_size' filas, que se
+escriben uno a uno: la memoria no depende del tamaño de la captura. Columnas:
+  ts (timestamp UTC, µs), dir, realm, topic (diccionario de strings), payload (texto JSON)
+y una columna por cada ruta pedida ("velocidad" -> float64; "estado:str" -> string).
+Requiere pyarrow (opcional).
+"""
+import os, re, json, logging, datetime
+from common.rotation import open_compressed, TRUNCATION_ERRORS
+from .subRecorder import read_capture, capture_files
+from .subFields import parse_path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+FORMAT_PARQUET = "parquet"
+FORMAT_ARROW = "arrow"
+# Filas por RecordBatch y por row group de Parquet
+DEFAULT_ROW_GROUP_SIZE = 65536
+PARQUET_COMPRESSIONS = ["zstd", "snappy", "gzip", "none"]
+# dir, realm y topic se guardan como diccionario (tras la columna ts)
+CATEGORY_COLUMNS = 3
+# Cabecera de cada entrada del log de sesión: "<asctime> - <hora> | Topic: <topic> | Realm: <realm>"
+_LOG_HEADER = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(\d{3}) - .*? \| Topic: (.*?) \| Realm: (.*)$")
+LOG_PREFIX = "log_"
+
+def available():
+    return pa is not None
+
+def output_format(path):
+    """
+    Formato según la extensión de salida: .arrow/.feather/.ipc -> Arrow IPC; el resto, Parquet.
+    """
+    return FORMAT_ARROW if os.path.splitext(path)[1].lower() in (".arrow", ".feather", ".ipc") else FORMAT_PARQUET
+
+def parse_field(spec):
+    """
+    "posicion.lat" -> ("posicion.lat", ruta, "float"); "estado:str" -> ("estado", ruta, "str").
+    """
+    name, kind = spec.strip(), "float"
+    if name.endswith(":str"):
+        name, kind = name[:-4], "str"
+    return name, parse_path(name), kind
+
+def read_log(path):
+    """
+    Recorre las entradas de un segmento del log de sesión como eventos de captura. El texto que
+    sigue a la cabecera (varias líneas) es el payload; el log no guarda la dirección.
+    """
+    def finish(head, body):
+        stamp, millis, topic, realm = head
+        ts = datetime.datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S").timestamp() + int(millis) / 1000
+        text = "\n".join(body).strip()
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            payload = text
+        return {"ts": ts, "dir": None, "realm": realm, "topic": topic, "payload": payload}
+
+    head, body = None, []
+    with open_compressed(path, "rb") as f:
+        for raw in f:
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            match = _LOG_HEADER.match(line)
+            if match:
+                if head is not None:
+                    yield finish(head, body)
+                head, body = match.groups(), []
+            elif head is not None:
+                body.append(line)
+    if head is not None:
+        yield finish(head, body)
+
+def _is_capture(path):
+    with open_compressed(path, "rb") as f:
+        for raw in f:
+            if raw.strip():
+                return raw.lstrip().startswith(b"{")
+    return True
+
+def source_files(path):
+    """
+    Ficheros a exportar: un fichero, o los segmentos de captura (o, si no hay, de log) de un directorio.
+    """
+    if not os.path.isdir(path):
+        return [path]
+    files = capture_files(path)
+    if not files:
+        files = sorted(os.path.join(path, name) for name in os.listdir(path) if name.startswith(LOG_PREFIX))
+    return files
+
+def iter_events(path):
+    for name in source_files(path):
+        try:
+            yield from (read_capture(name) if _is_capture(name) else read_log(name))
+        except TRUNCATION_ERRORS:
+            # Segmento comprimido que quedó sin cerrar (p. ej. el proceso terminó grabando)
+            logging.warning(f"Segmento truncado, se exporta hasta donde se puede leer: {name}")
+
+class CaptureExporter:
+    """
+    Convierte eventos en RecordBatch y los escribe en 'out' (Parquet o Arrow IPC según la extensión).
+    """
+    def __init__(self, out, fields=(), payload=True, row_group_size=DEFAULT_ROW_GROUP_SIZE, compression="zstd"):
+        if pa is None:
+            raise RuntimeError("La exportación a Arrow/Parquet requiere pyarrow")
+        self.out = out
+        self.format = output_format(out)
+        self.fields = [parse_field(spec) for spec in fields]
+        self.payload = payload
+        self.row_group_size = max(1, int(row_group_size))
+        self.compression = None if compression == "none" else compression
+        category = pa.dictionary(pa.int32(), pa.string())
+        columns = [("ts", pa.timestamp("us", tz="UTC")), ("dir", category), ("realm", category), ("topic", category)]
+        if payload:
+            columns.append(("payload", pa.string()))
+        columns += [(name, pa.float64() if kind == "float" else pa.string()) for name, _, kind in self.fields]
+        self.schema = pa.schema(columns)
+        self.rows = 0
+        self.batches = 0
+        self._writer = None
+        self._sink = None
+        # Diccionarios de dir, realm y topic comunes a toda la exportación: cada lote solo añade
+        # valores al final, como exige Arrow IPC (deltas) y sin repetir el hash en cada lote
+        self._codes = [{} for _ in range(CATEGORY_COLUMNS)]
+        self._values = [[] for _ in range(CATEGORY_COLUMNS)]
+        self._clear()
+
+    def _clear(self):
+        self._columns = [[] for _ in self.schema]
+
+    def _code(self, column, value):
+        if value is None:
+            return None
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            self._values[column].append(value)
+        return code
+
+    def _open(self):
+        if self.format == FORMAT_PARQUET:
+            self._writer = pq.ParquetWriter(self.out, self.schema, compression=self.compression)
+        else:
+            self._sink = pa.OSFile(self.out, "wb")
+            compression = self.compression if self.compression in ("zstd", "lz4") else None
+            options = pa.ipc.IpcWriteOptions(compression=compression, emit_dictionary_deltas=True)
+            self._writer = pa.ipc.new_file(self._sink, self.schema, options=options)
+
+    def add(self, event):
+        columns = self._columns
+        columns[0].append(int(round(event["ts"] * 1000000)))
+        columns[1].append(self._code(0, event.get("dir")))
+        columns[2].append(self._code(1, event.get("realm")))
+        columns[3].append(self._code(2, event.get("topic")))
+        index = 4
+        payload = event.get("payload")
+        if self.payload:
+            columns[4].append(payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False))
+            index = 5
+        for name, path, kind in self.fields:
+            value = payload
+            try:
+                for key in path:
+                    value = value[key]
+            except (KeyError, IndexError, TypeError):
+                value = None
+            if kind == "float":
+                value = float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+            elif value is not None and not isinstance(value, str):
+                value = json.dumps(value, ensure_ascii=False)
+            columns[index].append(value)
+            index += 1
+        if len(columns[0]) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self._columns[0]:
+            return
+        if self._writer is None:
+            self._open()
+        arrays = [pa.array(self._columns[0], type=pa.timestamp("us", tz="UTC"))]
+        for i in range(CATEGORY_COLUMNS):
+            arrays.append(pa.DictionaryArray.from_arrays(pa.array(self._columns[i + 1], type=pa.int32()),
+                                                         pa.array(self._values[i], type=pa.string())))
+        arrays += [pa.array(values, type=field.type)
+                   for values, field in zip(self._columns[CATEGORY_COLUMNS + 1:], list(self.schema)[CATEGORY_COLUMNS + 1:])]
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        if self.format == FORMAT_PARQUET:
+            self._writer.write_batch(batch, row_group_size=self.row_group_size)
+        else:
+            self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+        self.batches += 1
+        self._clear()
+
+    def close(self):
+        self.flush()
+        if self._writer is None:
+            # Captura vacía: se escribe igualmente un fichero con el esquema
+            self._open()
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+def export(source, out, fields=(), payload=True, row_group_size=DEFAULT_ROW_GROUP_SIZE, compression="zstd"):
+    """
+    Exporta una captura o un log (fichero o directorio) a 'out'. Devuelve {"rows", "batches", "bytes"}.
+    """
+    exporter = CaptureExporter(out, fields, payload, row_group_size, compression)
+    try:
+        for event in iter_events(source):
+            exporter.add(event)
+    finally:
+        exporter.close()
+    return {"rows": exporter.rows, "batches": exporter.batches, "bytes": os.path.getsize(out)}
@@ -0,0 +1,192 @@
+# subscriber/subFanIn.py
+import json, time, heapq, datetime, logging, itertools
+from common.utils import log_to_file
+from .subFields import parse_path
+from common.wampRuntime import get_runtime
+from common.transports import component_transport
+from common.payload import decode_event, payload_text, enable_passthrough
+
+# Espera máxima (s) de un evento en el búfer de reordenación antes de entregarlo
+DEFAULT_MAX_WAIT = 0.2
+# Tamaño máximo del búfer; si se supera se entregan los más antiguos aunque no haya vencido su espera
+DEFAULT_MAX_ITEMS = 10000
+# Periodo (s) con el que se vacía el búfer hacia el callback
+FLUSH_INTERVAL = 0.02
+# Instantes numéricos por encima de este valor se interpretan como milisegundos desde epoch
+EPOCH_MS_THRESHOLD = 1e11
+
+def parse_endpoint(text, default_realm="default"):
+    """
+    Convierte "realm@url" (o solo "url") en (url, realm).
+    """
+    text = text.strip()
+    if "@" in text and not text.startswith(("ws://", "wss://")):
+        realm, url = text.split("@", 1)
+        return url.strip(), realm.strip()
+    return text, default_realm
+
+def source_time(payload, path):
+    """
+    Instante de origen (epoch s) que el publicador puso en el payload, en la ruta 'path' (lista de
+    subFields.parse_path): número en segundos o milisegundos, o texto ISO 8601. None si no lo hay.
+    """
+    if isinstance(payload, (bytes, bytearray)):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            return None
+    value = payload
+    try:
+        for key in path:
+            value = value[key]
+    except (KeyError, IndexError, TypeError):
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value / 1000.0 if value > EPOCH_MS_THRESHOLD else float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+class ReorderBuffer:
+    """
+    Búfer de reordenación con espera acotada. Cada evento lleva su instante (epoch en segundos);
+    pop_ready() entrega en orden temporal los eventos cuyo instante (o el de llegada, si es anterior)
+    es <= ahora - max_wait, de modo que un evento que llega algo tarde desde otro router aún puede
+    colocarse en su sitio, y uno de un origen con el reloj adelantado no espera más de max_wait.
+    """
+    def __init__(self, max_wait=DEFAULT_MAX_WAIT, max_items=DEFAULT_MAX_ITEMS):
+        self.max_wait = max_wait
+        self.max_items = max_items
+        self._heap = []
+        self._seq = itertools.count()
+        self.late = 0
+        self._last_released = float("-inf")
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, event_time, item, arrival=None):
+        arrival = time.time() if arrival is None else arrival
+        if event_time < self._last_released:
+            # Llegó después de haber entregado eventos posteriores: se entrega igualmente, marcado como tardío
+            self.late += 1
+        heapq.heappush(self._heap, (event_time, next(self._seq), min(event_time, arrival), item))
+
+    def pop_ready(self, now=None):
+        now = time.time() if now is None else now
+        watermark = now - self.max_wait
+        ready = []
+        heap = self._heap
+        while heap and (heap[0][2] <= watermark or len(heap) > self.max_items):
+            event_time, _, release, item = heapq.heappop(heap)
+            # Un instante adelantado no debe marcar como tardíos a los eventos que lleguen después
+            self._last_released = max(self._last_released, release)
+            ready.append((event_time, item))
+        return ready
+
+    def drain(self):
+        ready = [(t, item) for t, _, _, item in sorted(self._heap)]
+        self._heap = []
+        return ready
+
+class FanInSubscriber:
+    """
+    Suscriptor que se conecta a varios routers/realms a la vez desde el bucle de red compartido
+    (un autobahn Component por endpoint) y fusiona sus eventos en un solo flujo.
+    WAMP no transmite el instante de publicación: con 'time_field' (ruta en el payload, p. ej.
+    "header.ts") los eventos se ordenan por ese instante de origen, esperando hasta 'max_wait' a los
+    que llegan tarde desde otro router (los que no lo traen usan el de llegada). Sin 'time_field' el
+    flujo queda en orden de llegada y se entrega sin espera.
+    'on_batch' recibe listas de (instante, origen, topic, payload, texto JSON) desde el hilo de red.
+    """
+    def __init__(self, endpoints, topics, on_batch, max_wait=DEFAULT_MAX_WAIT, max_items=DEFAULT_MAX_ITEMS, time_field=None):
+        self.endpoints = endpoints
+        self.topics = topics
+        self.on_batch = on_batch
+        self.time_path = parse_path(time_field) if time_field else None
+        # Todo evento se recibe en el mismo hilo y, sin instante de origen, el orden de llegada ya es
+        # el orden temporal: esperar solo añadiría latencia
+        self.buffer = ReorderBuffer(max_wait if self.time_path else 0.0, max_items)
+        self.loop = None
+        self.components = []
+        self.sessions = {}
+        self._flush_task = None
+
+    def start(self):
+        runtime = get_runtime()
+        self.loop = runtime.start()
+        runtime.call_soon(self._start)
+
+    def stop(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._stop)
+
+    def _start(self):
+        for url, realm in self.endpoints:
+            self._start_component(url, realm)
+        self._flush_task = self.loop.create_task(self._flush_loop())
+
+    def _start_component(self, url, realm):
+        from autobahn.asyncio.component import Component
+        source = f"{realm}@{url}"
+        component = Component(transports=[component_transport(url)], realm=realm)
+
+        @component.on_join
+        async def joined(session, details):
+            self.sessions[source] = session
+            enable_passthrough(session)
+            print("Conexión establecida en el subscriptor (origen:", source, ")")
+            for topic in self.topics:
+                await session.subscribe(self._make_handler(source, realm, topic), topic)
+
+        @component.on_leave
+        def left(session, details):
+            self.sessions.pop(source, None)
+
+        self.components.append(component)
+        component.start(loop=self.loop)
+
+    def _make_handler(self, source, realm, topic):
+        time_path = self.time_path
+
+        def handler(*args, **kwargs):
+            # El instante de llegada se toma al recibir, antes de cualquier otro procesamiento
+            arrival = time.time()
+            payload = decode_event(args, kwargs)
+            event_time = source_time(payload, time_path) if time_path else None
+            self.buffer.push(arrival if event_time is None else event_time, (source, realm, topic, payload), arrival)
+        return handler
+
+    async def _flush_loop(self):
+        import asyncio
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            self._deliver(self.buffer.pop_ready())
+
+    def _deliver(self, ready):
+        if not ready:
+            return
+        batch = []
+        for event_time, (source, realm, topic, payload) in ready:
+            timestamp = datetime.datetime.fromtimestamp(event_time).strftime("%Y-%m-%d %H:%M:%S")
+            # Se codifica una vez: el mismo texto va al log y al almacén del visor
+            encoded = payload_text(payload)
+            log_to_file(timestamp, topic, realm, encoded)
+            batch.append((event_time, source, topic, payload, encoded))
+        logging.info(f"Recibidos {len(batch)} eventos fusionados de {len(self.endpoints)} routers"
+                     f" ({self.buffer.late} tardíos en total)")
+        self.on_batch(batch)
+
+    def _stop(self):
+        # El bucle es compartido: solo se detienen las conexiones y el vaciado propios
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        self._deliver(self.buffer.drain())
+        for component in self.components:
+            try:
+                component.stop()
+            except Exception as e:
+                print("Error al detener la conexión:", e)
@@ -0,0 +1,183 @@
+# subscriber/subFields.py
+"""
+Extracción de campos numéricos de los eventos recibidos a columnas NumPy por topic.
+Cada ruta (p. ej. "posicion.lat", "velocidad" o "valores[0]") se guarda en un buffer float64 que
+crece por duplicación; los agregados (media, mín/máx, percentiles, tasa de cambio, por ventana
+de tiempo o por cubetas) se calculan vectorizados sobre las columnas, sin recorrer los dicts.
+Un campo ausente o no numérico se guarda como NaN. Requiere numpy (opcional).
+"""
+import re, json, time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Capacidad inicial de cada columna y filas máximas por topic (al llenarse se descarta la mitad más antigua)
+INITIAL_CAPACITY = 1024
+MAX_ROWS = 1000000
+
+_PATH_TOKEN = re.compile(r"([^.\[\]]+)|\[(\d+)\]")
+
+def available():
+    return np is not None
+
+def parse_path(text):
+    """
+    "posicion.lat" -> ["posicion", "lat"]; "valores[0].x" -> ["valores", 0, "x"].
+    """
+    path = []
+    for key, index in _PATH_TOKEN.findall(text.strip()):
+        path.append(int(index) if index else key)
+    if not path:
+        raise ValueError(f"Ruta vacía: '{text}'")
+    return path
+
+def parse_paths(text):
+    """
+    Lista de rutas separadas por comas (las vacías se ignoran).
+    """
+    return [part.strip() for part in text.split(",") if part.strip()]
+
+def extract(payload, path):
+    """
+    Valor numérico de 'path' dentro del payload, o NaN si no existe o no es un número.
+    """
+    value = payload
+    try:
+        for key in path:
+            value = value[key]
+    except (KeyError, IndexError, TypeError):
+        return float("nan")
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return float("nan")
+    return float(value)
+
+class TopicColumns:
+    """
+    Columnas de un topic: instante de llegada (epoch s) y una columna por ruta.
+    """
+    def __init__(self, paths, capacity=INITIAL_CAPACITY, max_rows=MAX_ROWS):
+        self.paths = list(paths)
+        self._parsed = [parse_path(p) for p in self.paths]
+        self.max_rows = max_rows
+        self.size = 0
+        self.ts = np.empty(capacity)
+        self.data = np.empty((len(self.paths), capacity))
+
+    def append(self, ts, payload):
+        if self.size == self.ts.shape[0]:
+            self._grow()
+        row = self.size
+        self.ts[row] = ts
+        for i, path in enumerate(self._parsed):
+            self.data[i, row] = extract(payload, path)
+        self.size += 1
+
+    def _grow(self):
+        if self.size >= self.max_rows:
+            # Se conserva la mitad más reciente en el mismo espacio
+            keep = self.size // 2
+            self.ts[:keep] = self.ts[self.size - keep:self.size]
+            self.data[:, :keep] = self.data[:, self.size - keep:self.size]
+            self.size = keep
+            return
+        capacity = min(self.ts.shape[0] * 2, self.max_rows)
+        ts = np.empty(capacity)
+        ts[:self.size] = self.ts[:self.size]
+        data = np.empty((len(self.paths), capacity))
+        data[:, :self.size] = self.data[:, :self.size]
+        self.ts, self.data = ts, data
+
+    def column(self, path, window=None, now=None):
+        """
+        (instantes, valores) de una ruta como vistas sin copia; con 'window' solo los últimos N segundos.
+        """
+        i = self.paths.index(path)
+        ts = self.ts[:self.size]
+        start = 0
+        if window:
+            now = time.time() if now is None else now
+            start = int(np.searchsorted(ts, now - window, side="left"))
+        return ts[start:], self.data[i, start:self.size]
+
+    def aggregate(self, path, window=None, now=None):
+        """
+        Resumen de una ruta: n (muestras válidas), media, mín, máx, p50, p90, p99, último valor
+        y tasa de cambio (unidades/s, pendiente entre la primera y la última muestra válida).
+        """
+        ts, values = self.column(path, window, now)
+        valid = ~np.isnan(values)
+        n = int(valid.sum())
+        if n == 0:
+            return {"n": 0}
+        ts, values = ts[valid], values[valid]
+        p50, p90, p99 = np.percentile(values, [50, 90, 99])
+        elapsed = ts[-1] - ts[0]
+        return {
+            "n": n,
+            "mean": float(values.mean()),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "p50": float(p50),
+            "p90": float(p90),
+            "p99": float(p99),
+            "last": float(values[-1]),
+            "rate": float((values[-1] - values[0]) / elapsed) if elapsed > 0 else 0.0,
+        }
+
+    def resample(self, path, bucket=60.0, window=None, now=None):
+        """
+        Agregados por cubetas de 'bucket' segundos (p. ej. la media por minuto):
+        lista de {"t", "n", "mean", "min", "max"} con t = inicio de la cubeta.
+        """
+        ts, values = self.column(path, window, now)
+        valid = ~np.isnan(values)
+        ts, values = ts[valid], values[valid]
+        if not len(values):
+            return []
+        keys = np.floor(ts / bucket)
+        # Los instantes están ordenados: cada cubeta es un tramo contiguo
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        counts = np.diff(np.r_[starts, len(values)])
+        sums = np.add.reduceat(values, starts)
+        mins = np.minimum.reduceat(values, starts)
+        maxs = np.maximum.reduceat(values, starts)
+        return [{"t": float(keys[s] * bucket), "n": int(c), "mean": float(total / c), "min": float(lo), "max": float(hi)}
+                for s, c, total, lo, hi in zip(starts, counts, sums, mins, maxs)]
+
+class FieldExtractor:
+    """
+    Columnas por topic para un conjunto de rutas. add() se llama por cada evento recibido.
+    """
+    def __init__(self, paths, max_rows=MAX_ROWS):
+        if np is None:
+            raise RuntimeError("La extracción de campos numéricos requiere numpy")
+        for path in paths:
+            parse_path(path)
+        self.paths = list(paths)
+        self.max_rows = max_rows
+        self.topics = {}
+
+    def add(self, topic, payload, ts=None):
+        if isinstance(payload, (bytes, bytearray)):
+            # Payload passthrough: JSON sin decodificar
+            try:
+                payload = json.loads(payload)
+            except ValueError:
+                return
+        columns = self.topics.get(topic)
+        if columns is None:
+            columns = self.topics[topic] = TopicColumns(self.paths, max_rows=self.max_rows)
+        columns.append(time.time() if ts is None else ts, payload)
+
+    def summary(self, window=None, now=None):
+        """
+        Lista de (topic, ruta, agregados) para todos los topics y rutas.
+        """
+        now = time.time() if now is None else now
+        return [(topic, path, columns.aggregate(path, window, now))
+                for topic, columns in sorted(self.topics.items()) for path in self.paths]
+
+    def clear(self):
+        self.topics.clear()
@@ -1,70 +1,232 @@
 # subscriber/subGUI.py
-import sys, os, json, datetime, logging, asyncio, threading
-from PyQt5.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QLabel, QLineEdit, QPushButton, QComboBox,
-                             QListWidget, QAbstractItemView, QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView)
-from PyQt5.QtCore import Qt, pyqtSlot, QMetaObject, Q_ARG
-from autobahn.asyncio.wamp import ApplicationSession, ApplicationRunner
-from common.utils import log_to_file, JsonDetailDialog
+import json, datetime
+from PyQt5.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QFormLayout, QLabel, QLineEdit, QPushButton, QComboBox,
+                             QListWidget, QAbstractItemView, QMessageBox, QTableWidget, QTableWidgetItem, QTableView,
+                             QHeaderView, QCheckBox, QSpinBox, QGroupBox)
+from PyQt5.QtCore import Qt, pyqtSlot, QMetaObject, Q_ARG, QTimer, QAbstractTableModel, QModelIndex
+from common.utils import JsonDetailDialog
+from common.payloadStore import PayloadStore
+from common.jsonDelta import DeltaEncoder, apply as apply_delta, describe as describe_delta
+from common.wampRuntime import get_runtime
+from common.rotation import available_compressions
+from common.searchIndex import SearchIndex, IndexWorker, Query
+from .subFanIn import FanInSubscriber, parse_endpoint
+from .subFields import FieldExtractor, parse_paths, available as fields_available
+from .subPlot import TimeSeriesPlot
 
-class MultiTopicSubscriber(ApplicationSession):
-    def __init__(self, config, topics, on_message_callback):
-        super().__init__(config)
-        self.topics = topics
-        self.on_message_callback = on_message_callback
-    async def onJoin(self, details):
-        print("Conexión establecida en el subscriptor (realm:", self.config.realm, ")")
-        for topic in self.topics:
-            self.subscribe(self.on_event, topic)
-    def on_event(self, *args, **kwargs):
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        message_data = args[0] if args else {}
-        message_json = json.dumps(message_data, indent=2, ensure_ascii=False)
-        log_to_file(timestamp, "Desconocido", self.config.realm, message_json)
-        logging.info(f"Recibido: {timestamp} | Topic: Desconocido | Realm: {self.config.realm}")
-        if self.on_message_callback:
-            self.on_message_callback(message_data)
+# Eventos que se leen como mucho del anillo del proceso de red en cada tick (el resto, en el siguiente)
+NET_DRAIN_LIMIT = 5000
+NET_DRAIN_MS = 15
+# Espera (ms) tras la última tecla antes de aplicar la búsqueda
+SEARCH_DEBOUNCE_MS = 200
 
 def start_subscriber(url, realm, topics, on_message_callback):
-    def run():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        runner = ApplicationRunner(url=url, realm=realm)
-        runner.run(lambda config: MultiTopicSubscriber(config, topics, on_message_callback))
-    threading.Thread(target=run, daemon=True).start()
+    def make_session(config):
+        # autobahn se carga al abrir la primera conexión, no al arrancar la aplicación
+        from .subSession import MultiTopicSubscriber
+        return MultiTopicSubscriber(config, topics, on_message_callback)
+    # Todas las sesiones comparten el hilo y el bucle de red del runtime
+    get_runtime().connect(url, realm, make_session)
+
+class MessageTableModel(QAbstractTableModel):
+    """
+    Modelo virtual de la tabla de mensajes: solo guarda las cuatro columnas de texto por fila.
+    Con un filtro activo, 'visible' es la lista de filas del modelo completo que se muestran.
+    """
+    HEADERS = ["Hora", "Topic", "Realm", "Origen"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.visible = None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows) if self.visible is None else len(self.visible)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        return self.rows[self.sourceRow(index.row())][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def sourceRow(self, row):
+        return row if self.visible is None else self.visible[row]
+
+    def append(self, values, visible=True):
+        row = len(self.rows)
+        if self.visible is None:
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.rows.append(values)
+            self.endInsertRows()
+            return
+        self.rows.append(values)
+        if visible:
+            position = len(self.visible)
+            self.beginInsertRows(QModelIndex(), position, position)
+            self.visible.append(row)
+            self.endInsertRows()
+
+    def showRows(self, rows):
+        """
+        Hace visibles filas del modelo completo que pasan a cumplir el filtro (en orden creciente).
+        """
+        if self.visible is None:
+            return
+        last = self.visible[-1] if self.visible else -1
+        rows = [row for row in rows if last < row < len(self.rows)]
+        if rows:
+            position = len(self.visible)
+            self.beginInsertRows(QModelIndex(), position, position + len(rows) - 1)
+            self.visible.extend(rows)
+            self.endInsertRows()
+
+    def setVisible(self, rows):
+        self.beginResetModel()
+        self.visible = rows
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        if self.visible is not None:
+            self.visible = []
+        self.endResetModel()
 
 class MessageViewer(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.messages = []
+        # Los payloads se guardan en un almacén acotado (LRU en memoria + segmento en disco)
+        self.messages = PayloadStore()
+        # Índice invertido de topic, campos y valores para la búsqueda (filas del modelo completo);
+        # se alimenta en un hilo propio y avisa de las filas nuevas que cumplen el filtro activo
+        self.index = SearchIndex()
+        self.indexer = IndexWorker(self.index, self._postMatches)
+        self.query = Query("")
+        # Modo delta: por cada (realm, topic) se guardan keyframes completos y, entre ellos, solo los
+        # cambios respecto al mensaje anterior. rowDeltas[fila] es la fila anterior del mismo flujo
+        # (None si la fila guarda el payload completo)
+        self.deltaMode = False
+        self.deltaEncoder = DeltaEncoder()
+        self.rowDeltas = []
+        self.lastRows = {}
         self.initUI()
     def initUI(self):
         layout = QVBoxLayout(self)
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels(["Hora", "Topic", "Realm"])
+        searchLayout = QHBoxLayout()
+        self.searchEdit = QLineEdit()
+        self.searchEdit.setPlaceholderText("Buscar: palabras, campo:valor, prefijo*")
+        self.searchEdit.setClearButtonEnabled(True)
+        searchLayout.addWidget(self.searchEdit)
+        self.searchLabel = QLabel("")
+        searchLayout.addWidget(self.searchLabel)
+        layout.addLayout(searchLayout)
+        # La búsqueda se aplica cuando se deja de escribir, no en cada tecla
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.searchTimer.timeout.connect(self.applySearch)
+        self.searchEdit.textChanged.connect(self.searchTimer.start)
+        self.model = MessageTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
-        self.table.itemDoubleClicked.connect(self.showDetails)
+        self.table.doubleClicked.connect(self.showDetails)
         layout.addWidget(self.table)
         self.setLayout(layout)
-    def add_message(self, realm, topic, timestamp, details):
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        self.table.setItem(row, 0, QTableWidgetItem(timestamp))
-        self.table.setItem(row, 1, QTableWidgetItem(topic))
-        self.table.setItem(row, 2, QTableWidgetItem(realm))
-        self.messages.append(details)
-    def showDetails(self, item):
-        row = item.row()
+    def add_message(self, realm, topic, timestamp, details, source="", encoded=None):
+        row = len(self.model.rows)
+        self.indexer.add(row, topic, details)
+        # Con un filtro activo la fila se muestra cuando el hilo del índice confirma que lo cumple
+        self.model.append((timestamp, topic, realm, source), not self.query)
+        if self.query:
+            self.updateSearchLabel()
+        if not self.deltaMode:
+            self.rowDeltas.append(None)
+            self.messages.put(details, encoded)
+            return
+        stream = (source or realm, topic)
+        keyframe, data = self.deltaEncoder.encode(stream, details)
+        if keyframe:
+            self.rowDeltas.append(None)
+            self.messages.put(details, encoded)
+        else:
+            self.rowDeltas.append(self.lastRows[stream])
+            self.messages.put(data)
+        self.lastRows[stream] = row
+    def _postMatches(self, generation, query, rows):
+        # Llega desde el hilo del índice: se aplica en el hilo de la interfaz
+        QMetaObject.invokeMethod(self, "showMatches", Qt.QueuedConnection, Q_ARG(object, (generation, query, rows)))
+    @pyqtSlot(object)
+    def showMatches(self, matches):
+        generation, query, rows = matches
+        if generation != self.indexer.generation or query is not self.query:
+            return
+        self.model.showRows(rows)
+        self.updateSearchLabel()
+    def applySearch(self):
+        self.query = Query(self.searchEdit.text())
+        self.model.setVisible(self.indexer.search(self.query))
+        self.updateSearchLabel()
+    def updateSearchLabel(self):
+        if self.query:
+            self.searchLabel.setText(f"{len(self.model.visible)} de {len(self.model.rows)}")
+        else:
+            self.searchLabel.setText("")
+    def setDeltaMode(self, enabled):
+        # Los flujos empiezan de nuevo con un keyframe al cambiar de modo
+        self.deltaMode = enabled
+        self.deltaEncoder.reset()
+        self.lastRows = {}
+    def payloadAt(self, row):
+        """
+        Payload completo de una fila: en modo delta se reconstruye desde el keyframe anterior.
+        """
+        chain = []
+        while self.rowDeltas[row] is not None:
+            chain.append(row)
+            row = self.rowDeltas[row]
+        payload = self.messages[row]
+        for delta_row in reversed(chain):
+            payload = apply_delta(payload, self.messages[delta_row])
+        return payload
+    def showDetails(self, index):
+        row = self.model.sourceRow(index.row())
         if row < len(self.messages):
-            dlg = JsonDetailDialog(self.messages[row], self)
+            # El payload se decodifica en el hilo del diálogo, no en el de la interfaz. En las filas
+            # delta solo se muestran los campos que cambiaron respecto al mensaje anterior
+            messages, delta = self.messages, self.rowDeltas[row] is not None
+            def load():
+                return describe_delta(messages[row]) if delta else messages[row]
+            dlg = JsonDetailDialog(parent=self, loader=load)
             dlg.exec_()
+    def clear(self):
+        self.model.clear()
+        self.indexer.clear()
+        self.messages.clear()
+        self.rowDeltas = []
+        self.setDeltaMode(self.deltaMode)
+        self.updateSearchLabel()
 
 class SubscriberTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.subMessages = []
+        self.fanIn = None
+        self.recorder = None
+        self.closingWriter = None
+        # Columnas NumPy de los campos numéricos seleccionados (None = desactivado)
+        self.fields = None
         self.initUI()
     def initUI(self):
         mainLayout = QHBoxLayout(self)
@@ -96,6 +258,103 @@ class SubscriberTab(QWidget):
         btnLayout.addWidget(self.addTopicButton)
         topicsLayout.addLayout(btnLayout)
         configLayout.addLayout(topicsLayout)
+        # Routers adicionales: con alguno en la lista se usa el suscriptor fusionado (fan-in)
+        routersLayout = QHBoxLayout()
+        routersLayout.addWidget(QLabel("Routers adicionales:"))
+        self.routersList = QListWidget()
+        routersLayout.addWidget(self.routersList)
+        routerBtnLayout = QVBoxLayout()
+        self.newRouterEdit = QLineEdit()
+        self.newRouterEdit.setPlaceholderText("realm@ws://host:puerto/ws")
+        routerBtnLayout.addWidget(self.newRouterEdit)
+        self.addRouterButton = QPushButton("Agregar router")
+        self.addRouterButton.clicked.connect(self.addRouter)
+        routerBtnLayout.addWidget(self.addRouterButton)
+        self.removeRouterButton = QPushButton("Quitar router")
+        self.removeRouterButton.clicked.connect(self.removeRouter)
+        routerBtnLayout.addWidget(self.removeRouterButton)
+        routersLayout.addLayout(routerBtnLayout)
+        configLayout.addLayout(routersLayout)
+        # Ruta del instante de origen en el payload: sin ella los eventos fusionados van en orden de llegada
+        timeFieldLayout = QHBoxLayout()
+        timeFieldLayout.addWidget(QLabel("Campo de instante (fan-in):"))
+        self.timeFieldEdit = QLineEdit()
+        self.timeFieldEdit.setPlaceholderText("p. ej. header.ts (vacío = orden de llegada)")
+        timeFieldLayout.addWidget(self.timeFieldEdit)
+        configLayout.addLayout(timeFieldLayout)
+        # Modo "solo grabar": los eventos van directos a disco y la interfaz solo muestra contadores
+        self.recordGroup = QGroupBox("Solo grabar a disco (sin tabla)")
+        self.recordGroup.setCheckable(True)
+        self.recordGroup.setChecked(False)
+        recordLayout = QFormLayout(self.recordGroup)
+        self.recordDirEdit = QLineEdit("captures")
+        recordLayout.addRow("Directorio:", self.recordDirEdit)
+        self.recordSizeSpin = QSpinBox()
+        self.recordSizeSpin.setRange(0, 1000000)
+        self.recordSizeSpin.setValue(256)
+        self.recordSizeSpin.setSuffix(" MB")
+        self.recordSizeSpin.setToolTip("Rotar al alcanzar este tamaño (0 = sin límite)")
+        recordLayout.addRow("Rotar por tamaño:", self.recordSizeSpin)
+        self.recordMinutesSpin = QSpinBox()
+        self.recordMinutesSpin.setRange(0, 100000)
+        self.recordMinutesSpin.setSuffix(" min")
+        self.recordMinutesSpin.setToolTip("Rotar cada este número de minutos (0 = sin límite)")
+        recordLayout.addRow("Rotar por tiempo:", self.recordMinutesSpin)
+        self.recordCompressionCombo = QComboBox()
+        self.recordCompressionCombo.addItems(available_compressions())
+        recordLayout.addRow("Compresión:", self.recordCompressionCombo)
+        self.recordStatusLabel = QLabel("")
+        recordLayout.addRow(self.recordStatusLabel)
+        self.stopRecordButton = QPushButton("Detener grabación")
+        self.stopRecordButton.setEnabled(False)
+        self.stopRecordButton.clicked.connect(self.stopRecording)
+        recordLayout.addRow(self.stopRecordButton)
+        configLayout.addWidget(self.recordGroup)
+        self.recordTimer = QTimer(self)
+        self.recordTimer.timeout.connect(self.updateRecordStatus)
+        # Campos numéricos: rutas JSON que se extraen a columnas por topic con agregados en vivo
+        self.fieldsGroup = QGroupBox("Campos numéricos")
+        self.fieldsGroup.setCheckable(True)
+        self.fieldsGroup.setChecked(False)
+        self.fieldsGroup.toggled.connect(self.toggleFields)
+        fieldsLayout = QFormLayout(self.fieldsGroup)
+        self.fieldsEdit = QLineEdit()
+        self.fieldsEdit.setPlaceholderText("velocidad, posicion.lat, valores[0]")
+        self.fieldsEdit.editingFinished.connect(self.applyFields)
+        fieldsLayout.addRow("Rutas:", self.fieldsEdit)
+        self.fieldsWindowSpin = QSpinBox()
+        self.fieldsWindowSpin.setRange(0, 86400)
+        self.fieldsWindowSpin.setValue(60)
+        self.fieldsWindowSpin.setSuffix(" s")
+        self.fieldsWindowSpin.setToolTip("Ventana de los agregados (0 = todo lo recibido)")
+        fieldsLayout.addRow("Ventana:", self.fieldsWindowSpin)
+        self.fieldsTable = QTableWidget()
+        self.fieldsTable.setColumnCount(9)
+        self.fieldsTable.setHorizontalHeaderLabels(["Topic", "Campo", "n", "Media", "Mín", "Máx", "p50", "p99", "Tasa/s"])
+        self.fieldsTable.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.fieldsTable.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.fieldsTable.itemSelectionChanged.connect(self.updatePlotSeries)
+        fieldsLayout.addRow(self.fieldsTable)
+        # Gráfica de las filas seleccionadas (sin selección, las primeras series)
+        self.fieldsPlot = TimeSeriesPlot()
+        self.fieldsPlot.setWindow(self.fieldsWindowSpin.value())
+        self.fieldsWindowSpin.valueChanged.connect(self.fieldsPlot.setWindow)
+        fieldsLayout.addRow(self.fieldsPlot)
+        if not fields_available():
+            self.fieldsGroup.setEnabled(False)
+            self.fieldsGroup.setToolTip("Requiere numpy")
+        configLayout.addWidget(self.fieldsGroup)
+        self.fieldsTimer = QTimer(self)
+        self.fieldsTimer.timeout.connect(self.updateFieldsTable)
+        # Las sesiones del suscriptor en un proceso hijo; los eventos llegan por memoria compartida
+        self.netProcessCheck = QCheckBox("Red en un proceso separado (memoria compartida)")
+        self.netProcessCheck.setToolTip("Solo para un único router; no escribe cada evento en el log de sesión")
+        configLayout.addWidget(self.netProcessCheck)
+        self.netTimer = QTimer(self)
+        self.netTimer.timeout.connect(self.drainNetworkProcess)
+        self.deltaCheck = QCheckBox("Vista delta (solo cambios entre mensajes del mismo topic)")
+        self.deltaCheck.toggled.connect(self.toggleDeltaMode)
+        configLayout.addWidget(self.deltaCheck)
         self.startButton = QPushButton("Iniciar Suscripción")
         self.startButton.clicked.connect(self.startSubscription)
         configLayout.addWidget(self.startButton)
@@ -124,8 +383,16 @@ class SubscriberTab(QWidget):
         if new_topic:
             self.topicsList.addItem(new_topic)
             self.newTopicEdit.clear()
-    def addSubscriberLog(self, realm, topics, timestamp, details):
-        self.viewer.add_message(realm, ", ".join(topics), timestamp, details)
+    def addRouter(self):
+        endpoint = self.newRouterEdit.text().strip()
+        if endpoint:
+            self.routersList.addItem(endpoint)
+            self.newRouterEdit.clear()
+    def removeRouter(self):
+        for item in self.routersList.selectedItems():
+            self.routersList.takeItem(self.routersList.row(item))
+    def addSubscriberLog(self, realm, topics, timestamp, details, encoded=None):
+        self.viewer.add_message(realm, ", ".join(topics), timestamp, details, encoded=encoded)
     def startSubscription(self):
         from subscriber.subGUI import start_subscriber
         realm = self.realmCombo.currentText()
@@ -135,15 +402,159 @@ class SubscriberTab(QWidget):
             QMessageBox.critical(self, "Error", "Seleccione al menos un topic.")
             return
         topics = [item.text() for item in selected_items]
-        start_subscriber(url, realm, topics, on_message_callback=self.onMessageArrived)
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        extra = [parse_endpoint(self.routersList.item(i).text(), realm) for i in range(self.routersList.count())]
+        if self.recordGroup.isChecked():
+            self.startRecording([(url, realm)] + extra, topics)
+            return
+        if extra:
+            if self.fanIn is not None:
+                self.fanIn.stop()
+            endpoints = [(url, realm)] + extra
+            self.fanIn = FanInSubscriber(endpoints, topics, on_batch=self.onBatchArrived,
+                                         time_field=self.timeFieldEdit.text().strip() or None)
+            self.fanIn.start()
+            self.addSubscriberLog(realm, topics, timestamp, {"info": f"Subscriptor fusionado iniciado: routers={endpoints}, topics={topics}"})
+            return
+        if self.netProcessCheck.isChecked():
+            from common.netProcess import get_network_process
+            get_network_process().subscribe(url, realm, topics)
+            self.netTimer.start(NET_DRAIN_MS)
+            self.addSubscriberLog(realm, topics, timestamp, {"info": f"Subscriptor iniciado en el proceso de red: realm={realm}, topics={topics}"})
+            return
+        start_subscriber(url, realm, topics, on_message_callback=self.onMessageArrived)
         self.addSubscriberLog(realm, topics, timestamp, {"info": f"Subscriptor iniciado: realm={realm}, topics={topics}"})
-    def onMessageArrived(self, content):
-        from PyQt5.QtCore import QMetaObject, Q_ARG, Qt
-        QMetaObject.invokeMethod(self, "onMessageArrivedMainThread", Qt.QueuedConnection, Q_ARG(dict, content))
-    @pyqtSlot(dict)
-    def onMessageArrivedMainThread(self, content):
+    def startRecording(self, endpoints, topics):
+        from .subRecorder import CaptureWriter, Recorder
+        if self.recorder is not None:
+            self.stopRecording()
+        try:
+            writer = CaptureWriter(self.recordDirEdit.text().strip() or "captures",
+                                   max_bytes=self.recordSizeSpin.value() * 1024 * 1024,
+                                   max_seconds=self.recordMinutesSpin.value() * 60,
+                                   compression=self.recordCompressionCombo.currentText())
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"No se pudo iniciar la grabación:\n{e}")
+            return
+        self.recorder = Recorder(endpoints, topics, writer)
+        self.recorder.start()
+        self.stopRecordButton.setEnabled(True)
+        self.recordTimer.start(1000)
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.addSubscriberLog(endpoints[0][1], topics, timestamp, {"info": f"Grabación iniciada: routers={endpoints}, topics={topics}"})
+    def stopRecording(self):
+        if self.recorder is None:
+            return
+        # El escritor vacía su cola y cierra el segmento en su hilo: la interfaz no espera
+        self.recorder.stop(timeout=0)
+        self.closingWriter = self.recorder.writer
+        self.recorder = None
+        self.updateRecordStatus()
+        self.stopRecordButton.setEnabled(False)
+    def updateRecordStatus(self):
+        # Solo contadores: la interfaz no ve los eventos individuales
+        writer = self.recorder.writer if self.recorder is not None else self.closingWriter
+        if writer is None:
+            return
+        stats = writer.stats()
+        state = ""
+        if self.recorder is None:
+            # Grabación detenida: se sigue mostrando el progreso hasta que el escritor termina
+            state = "  (cerrando...)" if writer.closing else "  (cerrada)"
+            if not writer.closing:
+                self.closingWriter = None
+                self.recordTimer.stop()
+        self.recordStatusLabel.setText(f"Recibidos: {stats['received']}  Escritos: {stats['written']}  "
+                                       f"Pendientes: {stats['pending']}  {stats['bytes'] / 1048576:.1f} MB  "
+                                       f"Segmentos: {stats['segments']}{state}")
+    def toggleFields(self, enabled):
+        if enabled:
+            self.applyFields()
+        else:
+            self.fields = None
+            self.fieldsTimer.stop()
+            self.fieldsPlot.setSource(None)
+    def applyFields(self):
+        # Cambiar las rutas empieza columnas nuevas
+        if not self.fieldsGroup.isChecked():
+            return
+        paths = parse_paths(self.fieldsEdit.text())
+        if self.fields is not None and self.fields.paths == paths:
+            return
+        try:
+            self.fields = FieldExtractor(paths) if paths else None
+        except (ValueError, RuntimeError) as e:
+            QMessageBox.critical(self, "Error", f"Rutas inválidas:\n{e}")
+            self.fields = None
+        if self.fields is not None:
+            self.fieldsTimer.start(1000)
+        else:
+            self.fieldsTimer.stop()
+        self.fieldsTable.setRowCount(0)
+        self.fieldsPlot.setSeries([])
+        self.fieldsPlot.setSource(self.fields)
+    def updateFieldsTable(self):
+        if self.fields is None:
+            return
+        rows = self.fields.summary(window=self.fieldsWindowSpin.value() or None)
+        self.fieldsTable.setRowCount(len(rows))
+        for row, (topic, path, stats) in enumerate(rows):
+            values = [topic, path, str(stats["n"])]
+            if stats["n"]:
+                values += [f"{stats[key]:.4g}" for key in ("mean", "min", "max", "p50", "p99", "rate")]
+            else:
+                values += [""] * 6
+            for column, text in enumerate(values):
+                self.fieldsTable.setItem(row, column, QTableWidgetItem(text))
+    def updatePlotSeries(self):
+        rows = sorted({index.row() for index in self.fieldsTable.selectedIndexes()})
+        series = []
+        for row in rows:
+            topic, path = self.fieldsTable.item(row, 0), self.fieldsTable.item(row, 1)
+            if topic is not None and path is not None:
+                series.append((topic.text(), path.text()))
+        self.fieldsPlot.setSeries(series)
+    def toggleDeltaMode(self, enabled):
+        self.viewer.setDeltaMode(enabled)
+    def onMessageArrived(self, content, encoded=None, topic=None):
+        # El payload puede ser cualquier objeto JSON o bytes (passthrough): se pasa como object
+        QMetaObject.invokeMethod(self, "onMessageArrivedMainThread", Qt.QueuedConnection, Q_ARG(object, (content, encoded, topic)))
+    @pyqtSlot(object)
+    def onMessageArrivedMainThread(self, message):
+        content, encoded, topic = message
         realm = self.realmCombo.currentText()
-        topics = [self.topicsList.item(i).text() for i in range(self.topicsList.count())]
+        if self.fields is not None:
+            self.fields.add(topic or "Desconocido", content)
+            self.fieldsPlot.markDirty()
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.viewer.add_message(realm, topic or "Desconocido", timestamp, content, encoded=encoded)
+    def drainNetworkProcess(self):
+        from common.netProcess import get_network_process
+        net = get_network_process()
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.addSubscriberLog(realm, topics, timestamp, content)
+        for reply in net.replies():
+            if reply[0] == "error":
+                self.viewer.add_message(self.realmCombo.currentText(), "", timestamp, {"error": reply[1]})
+            elif reply[0] == "left":
+                self.viewer.add_message(reply[2], "", timestamp, {"info": f"Sesión cerrada ({reply[3]}): {reply[1]}"})
+        # El payload se copia una vez del anillo al almacén; solo se decodifica si lo necesita la vista delta
+        decode = self.viewer.deltaMode
+        batch = []
+        for event_time, realm, topic, payload in net.events(NET_DRAIN_LIMIT):
+            encoded = bytes(payload)
+            batch.append((event_time, realm, topic, json.loads(encoded) if decode else encoded, encoded))
+        if batch:
+            self.onBatchArrivedMainThread(batch)
+    def onBatchArrived(self, batch):
+        # Llamado desde el hilo de red con eventos ya ordenados por tiempo
+        QMetaObject.invokeMethod(self, "onBatchArrivedMainThread", Qt.QueuedConnection, Q_ARG(object, batch))
+    @pyqtSlot(object)
+    def onBatchArrivedMainThread(self, batch):
+        for event_time, source, topic, payload, encoded in batch:
+            realm = source.split("@", 1)[0]
+            if self.fields is not None:
+                self.fields.add(topic, payload, event_time)
+            timestamp = datetime.datetime.fromtimestamp(event_time).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            self.viewer.add_message(realm, topic, timestamp, payload, source, encoded)
+        if self.fields is not None:
+            self.fieldsPlot.markDirty()
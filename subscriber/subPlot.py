@@ -0,0 +1,147 @@
+# subscriber/subPlot.py
+"""
+Gráfica en vivo de los campos numéricos (subFields) sobre el tiempo.
+Cada serie se diezma por columna de píxel (mínimo y máximo de las muestras que caen en ella), así
+que el coste de dibujar depende del ancho del widget y no del número de puntos. Los eventos solo
+marcan la gráfica como sucia; el repintado lo marca un temporizador de fotogramas.
+"""
+import time
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QTimer, QPointF, QRectF
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF
+from .subFields import np
+
+# Periodo del temporizador de fotogramas (ms): como mucho ~30 repintados por segundo
+FRAME_MS = 33
+# Series que se dibujan como máximo a la vez
+MAX_SERIES = 8
+SERIES_COLORS = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#17becf"]
+MARGIN_LEFT = 60
+MARGIN_RIGHT = 10
+MARGIN_TOP = 10
+MARGIN_BOTTOM = 24
+
+def minmax_decimate(ts, values, t0, t1, columns):
+    """
+    Reduce las muestras de [t0, t1] a como mucho dos por columna de píxel (mínimo y máximo).
+    Devuelve (x, mínimos, máximos) con x en píxeles (0..columns). Los NaN se ignoran.
+    Si hay pocas muestras se devuelven todas (mínimo = máximo = valor).
+    """
+    span = t1 - t0
+    lo = int(np.searchsorted(ts, t0, side="left"))
+    hi = int(np.searchsorted(ts, t1, side="right"))
+    if hi <= lo or span <= 0 or columns <= 0:
+        empty = np.empty(0)
+        return empty, empty, empty
+    if hi - lo <= 2 * columns:
+        ts, values = ts[lo:hi], values[lo:hi]
+        valid = ~np.isnan(values)
+        return (ts[valid] - t0) * (columns / span), values[valid], values[valid]
+    # Los instantes están ordenados: los bordes de cada columna se buscan en vez de clasificar cada muestra
+    edges = np.searchsorted(ts[lo:hi], t0 + span * np.arange(columns) / columns, side="left")
+    used = np.flatnonzero(np.r_[edges[1:] > edges[:-1], edges[-1] < hi - lo])
+    starts = edges[used]
+    # fmin/fmax ignoran los NaN; una columna sin ningún valor válido queda NaN y se descarta
+    mins = np.fmin.reduceat(values[lo:hi], starts)
+    maxs = np.fmax.reduceat(values[lo:hi], starts)
+    valid = ~np.isnan(mins)
+    return used[valid] + 0.5, mins[valid], maxs[valid]
+
+class TimeSeriesPlot(QWidget):
+    """
+    Gráfica de series (topic, ruta) de un FieldExtractor. 'window' = segundos visibles (0 = todo).
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.extractor = None
+        self.series = []
+        self.window = 60.0
+        self.dirty = False
+        self.setMinimumHeight(160)
+        self.frameTimer = QTimer(self)
+        self.frameTimer.timeout.connect(self.onFrame)
+
+    def setSource(self, extractor):
+        self.extractor = extractor
+        if extractor is None:
+            self.frameTimer.stop()
+        else:
+            self.frameTimer.start(FRAME_MS)
+        self.markDirty()
+
+    def setSeries(self, series):
+        self.series = list(series)[:MAX_SERIES]
+        self.markDirty()
+
+    def setWindow(self, seconds):
+        self.window = float(seconds)
+        self.markDirty()
+
+    def markDirty(self):
+        self.dirty = True
+
+    def onFrame(self):
+        # Con ventana deslizante la gráfica avanza aunque no lleguen eventos
+        if self.isVisible() and (self.dirty or (self.window and self.extractor.topics)):
+            self.dirty = False
+            self.update()
+
+    def _visible_series(self):
+        if self.extractor is None:
+            return []
+        series = self.series or [(topic, path) for topic in sorted(self.extractor.topics)
+                                 for path in self.extractor.paths][:MAX_SERIES]
+        return [(topic, path, self.extractor.topics[topic]) for topic, path in series if topic in self.extractor.topics]
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("white"))
+        series = self._visible_series()
+        plot = QRectF(MARGIN_LEFT, MARGIN_TOP, self.width() - MARGIN_LEFT - MARGIN_RIGHT,
+                      self.height() - MARGIN_TOP - MARGIN_BOTTOM)
+        painter.setPen(QPen(QColor("#888888")))
+        painter.drawRect(plot)
+        if not series or plot.width() < 2 or plot.height() < 2:
+            painter.drawText(plot, Qt.AlignCenter, "Sin datos")
+            return
+        t1 = time.time()
+        if self.window:
+            t0 = t1 - self.window
+        else:
+            t0 = min(columns.ts[0] for _, _, columns in series if columns.size)
+            t1 = max(t1, t0 + 1.0)
+        columns_px = int(plot.width())
+        decimated = []
+        for topic, path, columns in series:
+            ts, values = columns.column(path)
+            decimated.append(minmax_decimate(ts, values, t0, t1, columns_px))
+        lows = [d[1].min() for d in decimated if len(d[1])]
+        highs = [d[2].max() for d in decimated if len(d[2])]
+        if not lows:
+            painter.drawText(plot, Qt.AlignCenter, "Sin datos en la ventana")
+            return
+        y_min, y_max = min(lows), max(highs)
+        if y_max == y_min:
+            y_min, y_max = y_min - 1.0, y_max + 1.0
+        scale = plot.height() / (y_max - y_min)
+        # Ejes: valores extremos y duración de la ventana
+        painter.drawText(QRectF(0, plot.top() - 6, MARGIN_LEFT - 4, 14), Qt.AlignRight, f"{y_max:.4g}")
+        painter.drawText(QRectF(0, plot.bottom() - 8, MARGIN_LEFT - 4, 14), Qt.AlignRight, f"{y_min:.4g}")
+        painter.drawText(QRectF(plot.left(), plot.bottom() + 4, plot.width(), 16), Qt.AlignLeft,
+                         f"-{t1 - t0:.0f} s")
+        painter.drawText(QRectF(plot.left(), plot.bottom() + 4, plot.width(), 16), Qt.AlignRight, "ahora")
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        for index, (x, lows, highs) in enumerate(decimated):
+            color = QColor(SERIES_COLORS[index % len(SERIES_COLORS)])
+            painter.setPen(QPen(color, 1))
+            if len(x):
+                # Polilínea que recorre mínimo y máximo de cada columna (envolvente de la señal)
+                xs = np.repeat(plot.left() + x, 2)
+                ys = plot.bottom() - (np.column_stack((lows, highs)).ravel() - y_min) * scale
+                painter.drawPolyline(QPolygonF([QPointF(px, py) for px, py in zip(xs.tolist(), ys.tolist())]))
+        # Leyenda encima de las series
+        for index, (topic, path, _) in enumerate(series):
+            label = QRectF(plot.left() + 6, plot.top() + 4 + index * 14, plot.width() - 12, 14)
+            painter.fillRect(painter.boundingRect(label, Qt.AlignLeft, f"{topic} · {path}"), QColor(255, 255, 255, 200))
+            painter.setPen(QPen(QColor(SERIES_COLORS[index % len(SERIES_COLORS)])))
+            painter.drawText(label, Qt.AlignLeft, f"{topic} · {path}")
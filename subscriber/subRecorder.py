@@ -0,0 +1,209 @@
+# subscriber/subRecorder.py
+"""
+Modo "solo grabar": los eventos se escriben directamente en un fichero de captura sin pasar por
+la interfaz. Formato: una línea JSON por evento
+  {"ts": <epoch s>, "dir": "in", "realm": ..., "topic": ..., "payload": <JSON del payload>}
+en segmentos rotados por tamaño/tiempo y opcionalmente comprimidos (gzip o zstd).
+"""
+import os, json, time, queue, threading, logging
+from common.payload import decode_event, payload_text, enable_passthrough
+from common.rotation import SegmentWriter, open_compressed, COMPRESSION_NONE
+from common.wampRuntime import get_runtime
+from common.transports import component_transport
+
+CAPTURE_PREFIX = "capture"
+CAPTURE_SUFFIX = ".jsonl"
+# Eventos que el hilo escritor agrupa como máximo en una sola escritura
+WRITE_BATCH = 1024
+# Espera máxima (s) a que cada sesión se despida del router al detener la grabación
+STOP_TIMEOUT = 5.0
+
+def encode_frame(ts, direction, realm, topic, payload):
+    """
+    Línea de captura. El payload se inserta con su texto JSON (los bytes en passthrough tal cual).
+    """
+    head = json.dumps({"ts": ts, "dir": direction, "realm": realm, "topic": topic}, ensure_ascii=False)
+    return f'{head[:-1]}, "payload": {payload_text(payload)}}}\n'.encode("utf-8")
+
+def read_capture(path):
+    """
+    Recorre los eventos (dict) de un fichero de captura, comprimido o no. Las líneas que no se
+    pueden decodificar (p. ej. la última, cortada al matar el proceso mientras grababa) se saltan.
+    """
+    with open_compressed(path, "rb") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError as e:
+                logging.warning(f"Línea {number} de {path} ilegible, se omite: {e}")
+                continue
+            yield event
+
+def capture_files(path):
+    """
+    Lista ordenada de segmentos de captura: 'path' puede ser un fichero o un directorio.
+    """
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path)
+                      if name.startswith(CAPTURE_PREFIX) and CAPTURE_SUFFIX in name)
+    return [path]
+
+class CaptureWriter:
+    """
+    Escritor de capturas con su propio hilo. record() solo encola (se llama desde el hilo de red);
+    la codificación, la compresión y la escritura se hacen en el hilo escritor.
+    """
+    def __init__(self, directory, max_bytes=0, max_seconds=0, compression=COMPRESSION_NONE):
+        self.segments = SegmentWriter(directory, CAPTURE_PREFIX, CAPTURE_SUFFIX, max_bytes, max_seconds, compression,
+                                      on_close=self._on_segment_closed)
+        self.received = 0
+        self.written = 0
+        self.bytes_written = 0
+        self.errors = 0
+        self.closed_segments = 0
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="capture-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, ts, realm, topic, payload, direction="in"):
+        self.received += 1
+        self._queue.put((ts, direction, realm, topic, payload))
+
+    def _on_segment_closed(self, info):
+        self.closed_segments += 1
+        logging.info(f"Segmento de captura cerrado: {info['path']} ({info['records']} eventos, {info['bytes']} bytes)")
+
+    def _run(self):
+        get = self._queue.get
+        get_nowait = self._queue.get_nowait
+        while True:
+            item = get()
+            batch = [item]
+            while item is not None and len(batch) < WRITE_BATCH:
+                try:
+                    item = get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            stop = batch[-1] is None
+            if stop:
+                batch.pop()
+            if batch:
+                self._write(batch)
+            if stop:
+                self.segments.close()
+                return
+
+    def _write(self, batch):
+        records = []
+        for frame in batch:
+            try:
+                records.append((frame[0], encode_frame(*frame)))
+            except (TypeError, ValueError) as e:
+                self.errors += 1
+                logging.error(f"Evento no serializable en la captura: {e}")
+        if not records:
+            return
+        # El lote se corta en el límite de tamaño del segmento en vez de escribirse entero en uno
+        self.segments.write_records(records)
+        self.segments.flush()
+        self.written += len(records)
+        self.bytes_written += sum(len(data) for _, data in records)
+
+    def close(self, timeout=5.0):
+        """
+        Escribe lo pendiente y cierra el segmento actual, esperando como mucho 'timeout' s
+        (0 = no esperar: el hilo escritor termina por su cuenta; ver 'closing').
+        """
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+        if timeout:
+            self._thread.join(timeout)
+
+    @property
+    def closing(self):
+        """
+        Si el hilo escritor aún está vaciando la cola tras close().
+        """
+        return self._thread.is_alive()
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "written": self.written,
+            "pending": self.received - self.written - self.errors,
+            "bytes": self.bytes_written,
+            "segments": self.closed_segments + (1 if self.segments.current_path else 0),
+            "file": self.segments.current_path,
+        }
+
+class Recorder:
+    """
+    Suscripción de solo grabación a uno o varios routers (un autobahn Component por endpoint en el
+    bucle de red compartido). Cada evento se marca con su instante de llegada y va al CaptureWriter.
+    """
+    def __init__(self, endpoints, topics, writer):
+        self.endpoints = endpoints
+        self.topics = topics
+        self.writer = writer
+        self.components = []
+        self.loop = None
+
+    def start(self):
+        runtime = get_runtime()
+        self.loop = runtime.start()
+        runtime.call_soon(self._start)
+
+    def _start(self):
+        from autobahn.asyncio.component import Component
+        for url, realm in self.endpoints:
+            component = Component(transports=[component_transport(url)], realm=realm)
+            component.on_join(self._make_on_join(realm))
+            self.components.append(component)
+            component.start(loop=self.loop)
+
+    def _make_on_join(self, realm):
+        async def joined(session, details):
+            print("Grabación iniciada (realm:", realm, ")")
+            enable_passthrough(session)
+            for topic in self.topics:
+                await session.subscribe(self._make_handler(realm, topic), topic)
+        return joined
+
+    def _make_handler(self, realm, topic):
+        record = self.writer.record
+        def handler(*args, **kwargs):
+            record(time.time(), realm, topic, decode_event(args, kwargs))
+        return handler
+
+    def stop(self, timeout=5.0):
+        """
+        Detiene las sesiones en el bucle de red y, cuando ya no puede llegar ningún evento, cierra el
+        escritor (así ninguno queda en la cola detrás del final). Espera como mucho 'timeout' s
+        (0 = no esperar: el cierre sigue en el bucle y en el hilo escritor; ver CaptureWriter.closing).
+        """
+        if self.loop is None:
+            self.writer.close(timeout)
+            return
+        async def _stop():
+            import asyncio
+            try:
+                for component in self.components:
+                    try:
+                        await asyncio.wait_for(asyncio.ensure_future(component.stop()), STOP_TIMEOUT)
+                    except Exception as e:
+                        print("Error al detener la grabación:", e)
+            finally:
+                self.writer.close(0)
+        future = get_runtime().submit(_stop())
+        if timeout:
+            try:
+                future.result(timeout)
+            except Exception:
+                pass
+            self.writer.close(timeout)
@@ -0,0 +1,30 @@
+# subscriber/subSession.py
+# Sesión WAMP del suscriptor. Se importa solo al abrir la primera conexión (autobahn es costoso de cargar).
+import datetime, logging
+from autobahn.asyncio.wamp import ApplicationSession
+from common.utils import log_to_file
+from common.payload import decode_event, payload_text, enable_passthrough
+
+class MultiTopicSubscriber(ApplicationSession):
+    def __init__(self, config, topics, on_message_callback):
+        super().__init__(config)
+        self.topics = topics
+        self.on_message_callback = on_message_callback
+    async def onJoin(self, details):
+        print("Conexión establecida en el subscriptor (realm:", self.config.realm, ")")
+        # Para recibir también los payloads passthrough (modo raw) sin decodificarlos
+        enable_passthrough(self)
+        for topic in self.topics:
+            self.subscribe(self.make_handler(topic), topic)
+    def make_handler(self, topic):
+        # Un handler por topic para saber en cuál se recibió cada evento
+        return lambda *args, **kwargs: self.on_event(topic, *args, **kwargs)
+    def on_event(self, topic, *args, **kwargs):
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # El payload se usa tal cual llega y se codifica una sola vez para el log y el visor
+        message_data = decode_event(args, kwargs)
+        message_json = payload_text(message_data)
+        log_to_file(timestamp, topic, self.config.realm, message_json)
+        logging.info(f"Recibido: {timestamp} | Topic: {topic} | Realm: {self.config.realm}")
+        if self.on_message_callback:
+            self.on_message_callback(message_data, message_json, topic)
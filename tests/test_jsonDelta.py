@@ -0,0 +1,51 @@
+# tests/test_jsonDelta.py
+import copy, json
+from common.jsonDelta import diff, apply, is_empty, format_path, describe, DeltaEncoder
+
+def test_diff_apply_round_trip():
+    old = {"a": 1, "b": {"c": [1, 2, 3], "d": "x"}, "gone": True}
+    new = {"a": 2, "b": {"c": [1, 5, 3], "d": "x"}, "nuevo": None}
+    delta = diff(old, new)
+    assert sorted(delta["set"]) == sorted([[["a"], 2], [["b", "c", 1], 5], [["nuevo"], None]])
+    assert delta["del"] == [["gone"]]
+    assert apply(copy.deepcopy(old), delta) == new
+
+def test_list_length_change_replaces_whole_list():
+    delta = diff({"l": [1, 2]}, {"l": [1, 2, 3]})
+    assert delta == {"set": [[["l"], [1, 2, 3]]], "del": []}
+
+def test_type_change_and_root_replacement():
+    # 1 == 1.0 pero el tipo cambia: se registra
+    assert diff({"v": 1}, {"v": 1.0})["set"] == [[["v"], 1.0]]
+    assert apply({"a": 1}, diff({"a": 1}, [1])) == [1]
+
+def test_empty_and_describe():
+    assert is_empty(diff({"a": [1]}, {"a": [1]}))
+    assert format_path([]) == "$"
+    assert format_path(["a", 0, "b"]) == "a[0].b"
+    view = describe(diff({"a": {"b": 1}, "x": 0}, {"a": {"b": 2}}))
+    assert view == {"cambios": {"a.b": 2}, "eliminados": ["x"]}
+    assert "eliminados" not in describe(diff({"a": 1}, {"a": 2}))
+
+def test_encoder_keyframes_per_stream():
+    encoder = DeltaEncoder(keyframe_interval=3)
+    kinds = [encoder.encode("t1", {"n": i})[0] for i in range(7)]
+    assert kinds == [True, False, False, True, False, False, True]
+    # Otro flujo empieza con su propio keyframe
+    assert encoder.encode("t2", {"n": 0}) == (True, {"n": 0})
+    keyframe, data = encoder.encode("t1", {"n": 99})
+    assert not keyframe and data == {"set": [[["n"], 99]], "del": []}
+    # Los payloads no estructurados siempre van completos
+    assert encoder.encode("t1", "texto") == (True, "texto")
+    encoder.reset()
+    assert encoder.encode("t1", {"n": 1})[0]
+
+def test_encoder_decodes_passthrough_bytes():
+    encoder = DeltaEncoder(keyframe_interval=10)
+    assert encoder.encode("t", json.dumps({"n": 0, "x": "a"}).encode()) == (True, {"n": 0, "x": "a"})
+    keyframe, data = encoder.encode("t", memoryview(json.dumps({"n": 1, "x": "a"}).encode()))
+    assert not keyframe and data == {"set": [[["n"], 1]], "del": []}
+    # Un payload binario que no es JSON va completo, y el siguiente dict también (no un "$" entero)
+    assert encoder.encode("t", b"\xff\x00") == (True, b"\xff\x00")
+    assert encoder.encode("t", {"n": 2}) == (True, {"n": 2})
+    assert encoder.encode("t", {"n": 3}) == (False, {"set": [[["n"], 3]], "del": []})
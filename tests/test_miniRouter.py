@@ -0,0 +1,104 @@
+# tests/test_miniRouter.py
+"""
+Pruebas de integración del MiniRouter: una instancia por módulo en su hilo y sesiones reales de
+autobahn por WebSocket, RawSocket TCP y RawSocket sobre socket Unix.
+"""
+import os, json, asyncio
+import pytest
+
+pytest.importorskip("autobahn")
+
+from router.miniRouter import start_router_thread
+from common.transports import connect
+from common.payload import enable_passthrough, publish_payload, decode_event, PAYLOAD_RAW
+
+TRANSPORTS = ["ws", "rs"] + (["unix"] if os.name == "posix" else [])
+TIMEOUT = 5
+
+@pytest.fixture(scope="module")
+def endpoints(tmp_path_factory):
+    unix_path = str(tmp_path_factory.mktemp("router") / "router.sock") if "unix" in TRANSPORTS else None
+    _, endpoints, stop = start_router_thread(unix_path=unix_path)
+    yield endpoints
+    stop()
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(asyncio.wait_for(coro, TIMEOUT))
+    finally:
+        loop.close()
+
+async def join(url, realm="default"):
+    from autobahn.asyncio.wamp import ApplicationSession
+    joined = asyncio.get_running_loop().create_future()
+
+    class TestSession(ApplicationSession):
+        async def onJoin(self, details):
+            enable_passthrough(self)
+            joined.set_result(self)
+
+    await connect(url, realm, TestSession)
+    return await joined
+
+async def leave(*sessions):
+    for session in sessions:
+        session.leave()
+    await asyncio.sleep(0.05)
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_publish_subscribe_acknowledge_and_exclude_me(endpoints, transport):
+    from autobahn.wamp.types import PublishOptions
+
+    async def scenario():
+        url = endpoints[transport]
+        subscriber, publisher = await join(url), await join(url)
+        received, own = asyncio.Queue(), asyncio.Queue()
+        await subscriber.subscribe(lambda *args, **kwargs: received.put_nowait(decode_event(args, kwargs)), "t.datos")
+        await publisher.subscribe(lambda *args, **kwargs: own.put_nowait(decode_event(args, kwargs)), "t.datos")
+        await publisher.publish("t.datos", n=1, options=PublishOptions(acknowledge=True))
+        assert await received.get() == {"n": 1}
+        # Por defecto el publicador no recibe sus propias publicaciones
+        await publisher.publish("t.datos", {"n": 2}, options=PublishOptions(acknowledge=True, exclude_me=False))
+        assert await received.get() == {"n": 2}
+        assert await own.get() == {"n": 2}
+        assert own.empty()
+        await leave(subscriber, publisher)
+    run(scenario())
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_register_call_and_errors(endpoints, transport):
+    from autobahn.wamp.exception import ApplicationError
+
+    async def scenario():
+        url = endpoints[transport]
+        callee, caller = await join(url), await join(url)
+
+        def fail():
+            raise ApplicationError("com.test.fallo", "motivo")
+        await callee.register(lambda a, b: a + b, "com.test.sumar")
+        await callee.register(fail, "com.test.fallar")
+        assert await caller.call("com.test.sumar", 2, 3) == 5
+        with pytest.raises(ApplicationError) as error:
+            await caller.call("com.test.fallar")
+        assert error.value.error == "com.test.fallo"
+        with pytest.raises(ApplicationError) as error:
+            await caller.call("com.test.no_existe")
+        assert error.value.error == ApplicationError.NO_SUCH_PROCEDURE
+        await leave(callee, caller)
+    run(scenario())
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_passthrough_payload_is_forwarded_untouched(endpoints, transport):
+    async def scenario():
+        url = endpoints[transport]
+        subscriber, publisher = await join(url), await join(url)
+        received = asyncio.Queue()
+        await subscriber.subscribe(lambda *args, **kwargs: received.put_nowait(decode_event(args, kwargs)), "t.raw")
+        message = {"texto": "ñandú", "valores": [1, 2.5, None]}
+        await publish_payload(publisher, "t.raw", message, mode=PAYLOAD_RAW, acknowledge=True)
+        payload = await received.get()
+        assert isinstance(payload, bytes)
+        assert json.loads(payload) == message
+        await leave(subscriber, publisher)
+    run(scenario())
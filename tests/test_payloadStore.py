@@ -0,0 +1,39 @@
+# tests/test_payloadStore.py
+import os, json
+from common.payloadStore import PayloadStore
+
+def test_spills_to_disk_and_reloads(tmp_path):
+    store = PayloadStore(max_bytes=200, directory=str(tmp_path))
+    payloads = [{"i": i, "data": "x" * 50} for i in range(10)]
+    keys = [store.put(p) for p in payloads]
+    assert keys == list(range(10))
+    stats = store.stats()
+    assert stats["count"] == 10 and stats["memory_bytes"] <= 200
+    assert stats["disk_items"] > 0 and len(os.listdir(tmp_path)) == 1
+    assert [store[k] for k in keys] == payloads
+    # Lo que ya está en disco se recarga y vuelve a salir de memoria sin reescribirse
+    disk_bytes = store.stats()["disk_bytes"]
+    assert [store[k] for k in keys] == payloads
+    assert store.stats()["disk_bytes"] == disk_bytes
+    store.clear()
+    assert len(store) == 0 and os.listdir(tmp_path) == []
+
+def test_encoded_passthrough_and_binary(tmp_path):
+    store = PayloadStore(max_bytes=1, directory=str(tmp_path))
+    key = store.put(None, encoded=json.dumps({"a": 1}))
+    raw = store.put(None, encoded=b"\xff\x00binario")
+    assert store.get(key) == {"a": 1}
+    assert store.get(raw) == b"\xff\x00binario".decode("utf-8", errors="replace")
+    # El más reciente siempre se queda en memoria aunque supere el presupuesto
+    assert store.stats()["memory_items"] == 1
+    store.close()
+
+def test_unknown_key(tmp_path):
+    store = PayloadStore(directory=str(tmp_path))
+    store.put({"a": 1})
+    try:
+        store.get(1)
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("se esperaba KeyError")
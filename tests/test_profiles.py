@@ -0,0 +1,44 @@
+# tests/test_profiles.py
+import pytest
+from load.profiles import (parse_profile, ProfileError, RampProfile, PoissonProfile, BurstProfile,
+                           StepProfile, RateRecorder, find_knee)
+
+def test_parse_profile_kinds_round_trip():
+    for text, cls in [("ramp:10-100/5", RampProfile), ("poisson:50/2/7", PoissonProfile),
+                      ("burst:5@0.5/2", BurstProfile), ("step:10x1,20x2", StepProfile)]:
+        profile = parse_profile(text)
+        assert isinstance(profile, cls) and str(profile) == text
+
+@pytest.mark.parametrize("text", ["", "ramp", "ramp:10/5", "ramp:0-0/5", "poisson:-1/2",
+                                  "burst:0@1/1", "step:10x0", "sine:1/2"])
+def test_parse_profile_errors(text):
+    with pytest.raises(ProfileError):
+        parse_profile(text)
+
+def test_ramp_count_matches_integral():
+    times = list(parse_profile("ramp:100-300/2").times())
+    # Integral de la tasa: (100 + 300) / 2 * 2 = 400 envíos
+    assert abs(len(times) - 400) <= 1
+    assert times == sorted(times) and times[-1] < 2
+    assert len(list(parse_profile("ramp:50-50/2").times())) == 100
+
+def test_step_burst_and_poisson():
+    assert list(parse_profile("step:2x1,0x1,1x1").times()) == [0.0, 0.5, 2.0]
+    assert list(parse_profile("burst:2@1/2").times()) == [0.0, 0.0, 1.0, 1.0]
+    first = list(parse_profile("poisson:100/1/3").times())
+    assert first == list(parse_profile("poisson:100/1/3").times())
+    assert 50 < len(first) < 150
+
+def test_rate_recorder_and_knee():
+    recorder = RateRecorder(interval=1.0)
+    for i in range(10):
+        recorder.record(i * 0.1, i * 0.1)
+    # Segundo intervalo: se planifican 10 pero solo 5 salen a tiempo
+    for i in range(10):
+        recorder.record(1 + i * 0.1, 1 + i * 0.1 if i < 5 else 2.5)
+    rows = recorder.rows()
+    assert [r["planned"] for r in rows] == [10, 10, 0]
+    assert [r["achieved"] for r in rows] == [10, 5, 5]
+    assert rows[1]["max_lag_ms"] == pytest.approx(1000)
+    assert find_knee(rows) is rows[1]
+    assert find_knee(rows[:1]) is None
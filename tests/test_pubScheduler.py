@@ -0,0 +1,118 @@
+# tests/test_pubScheduler.py
+import time, asyncio, datetime
+from publisher.pubScheduler import PublishScheduler, ScheduledJob, MODE_RATE, MODE_PROFILE, parse_hms, seconds_until
+from load.profiles import parse_profile
+
+def run_jobs(scheduler, jobs, attaches=1, timeout=5.0, publish_cost=0.0, gaps=None):
+    """
+    Asocia el planificador 'attaches' veces al mismo bucle (como hacen varias sesiones al unirse),
+    añade los trabajos y espera a que terminen. Devuelve los envíos como (topic, mensaje).
+    Cada publicación tarda 'publish_cost' s; en 'gaps' (si se pasa) se guardan los huecos entre
+    latidos de otra tarea del mismo bucle.
+    """
+    sent = []
+    loop = asyncio.new_event_loop()
+
+    def publish(topic, message, mode):
+        end = time.perf_counter() + publish_cost
+        while time.perf_counter() < end:
+            pass
+        sent.append((topic, message))
+
+    async def heartbeat():
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    async def main():
+        done = asyncio.Event()
+        pending = len(jobs)
+
+        def on_done(job):
+            nonlocal pending
+            pending -= 1
+            if pending == 0:
+                done.set()
+        beat = loop.create_task(heartbeat()) if gaps is not None else None
+        for _ in range(attaches):
+            scheduler.attach(loop, publish)
+            # La corrutina del planificador llega a esperar antes de la siguiente sesión
+            await asyncio.sleep(0.01)
+        for job in jobs:
+            job.on_done = on_done
+            scheduler.add(job)
+        try:
+            await asyncio.wait_for(done.wait(), timeout)
+        finally:
+            scheduler._task.cancel()
+            if beat is not None:
+                beat.cancel()
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
+    return sent
+
+def test_rate_job_sends_count():
+    job = ScheduledJob("t", lambda n: {"n": n}, MODE_RATE, rate=200, count=5)
+    sent = run_jobs(PublishScheduler(), [job])
+    assert [message["n"] for _, message in sent] == [0, 1, 2, 3, 4]
+
+def test_attach_twice_on_same_loop_keeps_firing():
+    job = ScheduledJob("t", lambda n: n, MODE_RATE, rate=200, count=5)
+    sent = run_jobs(PublishScheduler(), [job], attaches=2)
+    assert [message for _, message in sent] == [0, 1, 2, 3, 4]
+
+def test_overdue_profile_yields_the_loop():
+    # La rampa supera lo que da de sí una publicación de 100 µs: el trabajo va atrasado casi todo el rato
+    job = ScheduledJob("t", lambda n: n, MODE_PROFILE, profile=parse_profile("ramp:1000-40000/0.5"))
+    gaps = []
+    sent = run_jobs(PublishScheduler(), [job], publish_cost=0.0001, gaps=gaps)
+    assert len(sent) == job.sent > 5000
+    # Sin ceder, la otra tarea quedaría parada casi todo el trabajo (~1 s)
+    assert max(gaps) < 0.25
+
+def test_parse_hms():
+    assert parse_hms("01:02:03") == 3723
+    assert parse_hms("x") == 0
+
+def test_seconds_until_wraps_to_tomorrow():
+    now = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    assert seconds_until("12:00:10", now) == 10
+    assert seconds_until("11:59:59", now) == 24 * 3600 - 1
+
+def test_jobs_are_sent_by_the_session_of_their_target():
+    scheduler = PublishScheduler()
+    sent = {"a": [], "b": []}
+    loop = asyncio.new_event_loop()
+
+    def publisher(name):
+        return lambda topic, message, mode: sent[name].append(topic)
+
+    async def main():
+        done = asyncio.Event()
+        finished = []
+
+        def on_done(job):
+            finished.append(job)
+            if len(finished) == 2:
+                done.set()
+        scheduler.attach(loop, publisher("a"), ("ws://a", "r"))
+        scheduler.add(ScheduledJob("t.a", lambda n: n, MODE_RATE, rate=500, count=3, on_done=on_done, target=("ws://a", "r")))
+        scheduler.add(ScheduledJob("t.b", lambda n: n, MODE_RATE, rate=500, count=3, on_done=on_done, target=("ws://b", "r")))
+        await asyncio.sleep(0.05)
+        # El trabajo de b espera a su sesión aunque la de a ya esté unida
+        assert sent == {"a": ["t.a"] * 3, "b": []}
+        scheduler.attach(loop, publisher("b"), ("ws://b", "r"))
+        try:
+            await asyncio.wait_for(done.wait(), 5)
+        finally:
+            scheduler._task.cancel()
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
+    assert sent == {"a": ["t.a"] * 3, "b": ["t.b"] * 3}
@@ -0,0 +1,50 @@
+# tests/test_pubTemplate.py
+import pytest
+from publisher.pubTemplate import PayloadTemplate, TemplateError
+
+def test_counter_timestamp_and_interpolation():
+    template = PayloadTemplate({
+        "id": "{{counter:10,5}}",
+        "ts": "{{timestamp:epoch_ms}}",
+        "iso": "{{timestamp}}",
+        "name": "msg-{{counter}} de {{choice:a}}",
+        "fixed": {"deep": [1, 2]},
+    })
+    payload = template.render(index=2, now=1700000000.25)
+    assert payload["id"] == 20 and payload["ts"] == 1700000000250
+    assert payload["iso"] == "2023-11-14T22:13:20Z"
+    assert payload["name"] == "msg-2 de a"
+    # Las partes estáticas se comparten entre payloads
+    assert template.render(3)["fixed"] is template.render(4)["fixed"]
+
+def test_static_template_is_shared():
+    template = PayloadTemplate({"a": [1, "sin marcador"]})
+    assert not template.is_dynamic
+    assert all(p is template.template for p in template.generate(3))
+
+def test_generate_and_ranges():
+    template = PayloadTemplate(["{{counter}}", "{{randint:1,3}}", "{{random:0,1}}", "{{choice:x|2}}"])
+    rows = list(template.generate(20, start=5))
+    assert [r[0] for r in rows] == list(range(5, 25))
+    assert all(1 <= r[1] <= 3 and 0 <= r[2] <= 1 and r[3] in ("x", 2) for r in rows)
+
+def test_csv_column(tmp_path):
+    path = tmp_path / "datos.csv"
+    path.write_text("id,valor\n1,a\n2,2.5\n", encoding="utf-8")
+    template = PayloadTemplate({"v": f"{{{{csv:{path},valor}}}}", "i": f"{{{{csv:{path},0}}}}"})
+    assert [p["v"] for p in template.generate(3)] == ["a", 2.5, "a"]
+    assert template.render(1)["i"] == 2
+
+def test_csv_bad_columns_and_short_rows(tmp_path):
+    path = tmp_path / "cortas.csv"
+    path.write_text("id,valor\n1,a\n2\n3,c\n", encoding="utf-8")
+    # Las filas sin la columna se saltan
+    assert [p["v"] for p in PayloadTemplate({"v": f"{{{{csv:{path},1}}}}"}).generate(2)] == ["a", "c"]
+    for column in ("2", "nope"):
+        with pytest.raises(TemplateError):
+            PayloadTemplate({"v": f"{{{{csv:{path},{column}}}}}"})
+
+@pytest.mark.parametrize("text", ["{{nope}}", "{{random:1}}", "{{randint}}", "{{choice:}}", "{{csv:x}}"])
+def test_template_errors(text):
+    with pytest.raises(TemplateError):
+        PayloadTemplate({"v": text})
@@ -0,0 +1,70 @@
+# tests/test_rotation.py
+import os, sys, time, subprocess
+import pytest
+from common import rotation
+from common.rotation import LogArchive
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def wait_for(predicate, timeout=5.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return predicate()
+
+@pytest.mark.skipif(rotation.fcntl is None, reason="sin fcntl el segmento en uso se detecta por antigüedad")
+def test_recover_skips_segments_of_live_processes(tmp_path):
+    # Otra instancia escribe su segmento y lo mantiene abierto
+    script = (f"import sys, time; sys.path.insert(0, {ROOT!r})\n"
+              "from common.rotation import SegmentWriter\n"
+              f"w = SegmentWriter({str(tmp_path)!r}, 'log', '.txt')\n"
+              "w.write(b'2024-01-01 00:00:00,000 - hola\\n'); w.flush(); print('ok', flush=True); time.sleep(30)\n")
+    child = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE)
+    try:
+        assert child.stdout.readline().strip() == b"ok"
+        (name,) = os.listdir(tmp_path)
+        archive = LogArchive(str(tmp_path))
+        archive.recover("log", ".txt")
+        time.sleep(0.3)
+        assert os.listdir(tmp_path) == [name]
+    finally:
+        child.kill()
+        child.wait()
+    # Sin dueño, el segmento se archiva
+    archive.recover("log", ".txt")
+    assert wait_for(lambda: os.path.exists(tmp_path / (name + ".gz")) and not os.path.exists(tmp_path / name))
+
+def test_write_records_splits_batches_at_the_size_limit(tmp_path):
+    writer = rotation.SegmentWriter(str(tmp_path), "seg", ".txt", max_bytes=200)
+    records = [(float(i), b"x" * 49 + b"\n") for i in range(40)]
+    writer.write_records(records[:25])
+    writer.write_records(records[25:])
+    writer.close()
+    sizes = [info["bytes"] for info in writer.segments]
+    assert sum(sizes) == 40 * 50
+    assert max(sizes) <= 200
+    assert sum(info["records"] for info in writer.segments) == 40
+
+def test_oversized_record_gets_its_own_segment(tmp_path):
+    writer = rotation.SegmentWriter(str(tmp_path), "seg", ".txt", max_bytes=100)
+    writer.write_records([(1.0, b"a" * 60), (2.0, b"b" * 300), (3.0, b"c" * 10)])
+    writer.close()
+    assert [info["bytes"] for info in writer.segments] == [60, 300, 10]
+
+@pytest.mark.parametrize("compression", [rotation.COMPRESSION_GZIP, rotation.COMPRESSION_ZSTD])
+def test_compressed_segments_read_back_by_line(tmp_path, compression):
+    if compression not in rotation.available_compressions():
+        pytest.skip("requiere zstandard")
+    writer = rotation.SegmentWriter(str(tmp_path), "seg", ".txt", max_bytes=1000, compression=compression)
+    lines = [f"linea {i}\n".encode() for i in range(300)]
+    writer.write_records([(float(i), line) for i, line in enumerate(lines)])
+    writer.close()
+    assert len(writer.segments) > 1
+    read = []
+    for info in writer.segments:
+        assert info["path"].endswith(rotation.COMPRESSION_SUFFIX[compression])
+        with rotation.open_compressed(info["path"], "rb") as f:
+            read.extend(f)
+    assert read == lines
@@ -0,0 +1,64 @@
+# tests/test_searchIndex.py
+import json, time, threading
+from common import searchIndex
+from common.searchIndex import SearchIndex, IndexWorker, Query, payload_tokens
+
+def build(payloads):
+    index = SearchIndex()
+    for row, (topic, payload) in enumerate(payloads):
+        index.add(row, topic, payload)
+    return index
+
+def test_words_fields_topic_and_prefix():
+    index = build([("sensores.temp", {"estado": "Activo", "valor": 21.5}),
+                   ("sensores.hum", {"estado": "parado"}),
+                   ("alarmas", json.dumps({"estado": "activo", "codigo": 7}).encode())])
+    assert index.search("activo") == [0, 2]
+    assert index.search("estado:parado") == [1]
+    assert index.search("topic:sensores") == [0, 1]
+    assert index.search("act*") == [0, 2]
+    assert index.search("activo codigo:7") == [2]
+    assert index.search("inexistente") == []
+    assert index.search("") == [0, 1, 2]
+
+def test_query_accepts_matches_search():
+    tokens = payload_tokens("a.b", {"estado": "activo"})
+    assert Query("estado:act*").accepts(tokens)
+    assert not Query("estado:parado").accepts(tokens)
+
+def test_large_payloads_are_capped():
+    wide = {f"clave{i}": i for i in range(50000)}
+    assert len(payload_tokens("t", wide)) <= searchIndex.MAX_TOKENS + 1
+    payload = {"items": [{"id": i, "nombre": f"n{i}"} for i in range(50000)]}
+    assert len(payload_tokens("t", payload)) <= searchIndex.MAX_TOKENS + 1
+    encoded = json.dumps(payload).encode()
+    assert len(encoded) > searchIndex.MAX_INDEX_BYTES
+    assert len(payload_tokens("t", encoded)) <= searchIndex.MAX_TOKENS + 1
+
+def test_index_worker_reports_new_matches_for_active_query():
+    reported = []
+    done = threading.Event()
+
+    def on_matches(generation, query, rows):
+        reported.extend(rows)
+        if 9 in reported:
+            done.set()
+    worker = IndexWorker(SearchIndex(), on_matches)
+    assert worker.search(Query("estado:parado")) == []
+    for row in range(10):
+        worker.add(row, "t", {"estado": "parado" if row % 3 == 0 else "activo"})
+    assert done.wait(5)
+    assert reported == [0, 3, 6, 9]
+    assert worker.search(Query("activo")) == [1, 2, 4, 5, 7, 8]
+
+def test_index_worker_clear_drops_pending_rows():
+    worker = IndexWorker(SearchIndex(), lambda *args: None)
+    worker.add(0, "t", {"a": "x"})
+    worker.clear()
+    worker.add(0, "t", {"a": "y"})
+    end = time.time() + 5
+    while worker.index.rows == 0 and time.time() < end:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert worker.search(Query("x")) == []
+    assert worker.search(Query("y")) == [0]
@@ -0,0 +1,43 @@
+# tests/test_shmRing.py
+import pytest
+from common.shmRing import ShmRing
+
+@pytest.fixture
+def ring():
+    ring = ShmRing(capacity=64, create=True)
+    yield ring
+    ring.close()
+
+def test_write_parts_and_drain_in_order(ring):
+    assert ring.write(b"ab", b"cd")
+    assert ring.write(memoryview(b"xyz"))
+    assert ring.used == 4 + 4 + 4 + 3
+    assert [bytes(v) for v in ring.drain()] == [b"abcd", b"xyz"]
+    assert ring.used == 0 and list(ring.drain()) == []
+
+def test_wraps_frames_around_the_end(ring):
+    frames = [bytes([i]) * 20 for i in range(12)]
+    received = []
+    for frame in frames:
+        assert ring.write(frame)
+        received += [bytes(v) for v in ring.drain()]
+    assert received == frames
+
+def test_full_ring_drops_and_drain_limit(ring):
+    assert ring.write(b"1" * 20) and ring.write(b"2" * 20)
+    assert not ring.write(b"3" * 20)
+    assert ring.dropped == 1
+    assert [bytes(v) for v in ring.drain(limit=1)] == [b"1" * 20]
+    # El hueco liberado admite otra trama (se escribe tras la marca de salto)
+    assert ring.write(b"4" * 20)
+    assert [bytes(v) for v in ring.drain()] == [b"2" * 20, b"4" * 20]
+
+def test_consumer_attaches_by_name(ring):
+    consumer = ShmRing(ring.name)
+    try:
+        assert consumer.capacity == 64
+        ring.write(b"hola")
+        assert [bytes(v) for v in consumer.drain()] == [b"hola"]
+        assert ring.used == 0
+    finally:
+        consumer.close()
@@ -0,0 +1,56 @@
+# tests/test_subExport.py
+import gzip, json
+import pytest
+from common import rotation
+from subscriber import subExport
+from subscriber.subRecorder import encode_frame
+
+def write_capture(path, events, cut=0):
+    data = b"".join(encode_frame(ts, "in", "r", "t", payload) for ts, payload in events)
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "wb") as f:
+        f.write(data[:len(data) - cut] if cut else data)
+
+def test_truncated_trailing_line_is_skipped(tmp_path):
+    path = tmp_path / "capture_1.jsonl"
+    write_capture(path, [(1.0, {"v": 1}), (2.0, {"v": 2}), (3.0, {"v": 3})], cut=5)
+    events = list(subExport.iter_events(str(path)))
+    assert [event["payload"]["v"] for event in events] == [1, 2]
+
+def test_truncated_gzip_segment_stops_without_aborting(tmp_path):
+    write_capture(tmp_path / "capture_1.jsonl", [(1.0, {"v": 1})])
+    full = gzip.compress(b"".join(encode_frame(float(i), "in", "r", "t", {"v": i}) for i in range(2, 2000)))
+    (tmp_path / "capture_2.jsonl.gz").write_bytes(full[:len(full) // 2])
+    write_capture(tmp_path / "capture_3.jsonl", [(9000.0, {"v": 9000})])
+    values = [event["payload"]["v"] for event in subExport.iter_events(str(tmp_path))]
+    assert values[0] == 1 and values[-1] == 9000 and len(values) > 2
+
+@pytest.mark.skipif(rotation.zstandard is None, reason="requiere zstandard")
+def test_zstd_capture_round_trip_and_truncated_segment(tmp_path):
+    writer = rotation.SegmentWriter(str(tmp_path), "capture", ".jsonl", compression=rotation.COMPRESSION_ZSTD)
+    writer.write_records([(float(i), encode_frame(float(i), "in", "r", "t", {"v": i})) for i in range(500)])
+    writer.close()
+    path = writer.segments[0]["path"]
+    assert [event["payload"]["v"] for event in subExport.iter_events(path)] == list(range(500))
+    # Segmento cortado a medias: se exporta hasta donde se puede leer
+    data = open(path, "rb").read()
+    cut = tmp_path / "capture_cut.jsonl.zst"
+    cut.write_bytes(data[:len(data) // 2])
+    values = [event["payload"]["v"] for event in subExport.iter_events(str(cut))]
+    assert values == list(range(len(values)))
+    if subExport.available():
+        out = str(tmp_path / "out.parquet")
+        assert subExport.export(path, out, fields=["v"])["rows"] == 500
+
+@pytest.mark.skipif(not subExport.available(), reason="requiere pyarrow")
+def test_export_parquet_with_fields(tmp_path):
+    import pyarrow.parquet as pq
+    path = tmp_path / "capture_1.jsonl"
+    write_capture(path, [(float(i), {"v": i, "estado": "ok"}) for i in range(10)])
+    out = str(tmp_path / "out.parquet")
+    result = subExport.export(str(path), out, fields=["v", "estado:str"], row_group_size=4)
+    table = pq.read_table(out)
+    assert result["rows"] == 10 and result["batches"] == 3
+    assert table.column("v").to_pylist() == [float(i) for i in range(10)]
+    assert set(table.column("estado").to_pylist()) == {"ok"}
+    assert json.loads(table.column("payload")[0].as_py()) == {"v": 0, "estado": "ok"}
@@ -0,0 +1,60 @@
+# tests/test_subFanIn.py
+import json, time, datetime
+import pytest
+
+# subFanIn importa common.utils, que depende de PyQt5
+pytest.importorskip("PyQt5")
+
+from subscriber.subFanIn import ReorderBuffer, FanInSubscriber, source_time, parse_endpoint
+from subscriber.subFields import parse_path
+
+def test_source_time_formats():
+    path = parse_path("header.ts")
+    assert source_time({"header": {"ts": 1700000000.5}}, path) == 1700000000.5
+    assert source_time({"header": {"ts": 1700000000500}}, path) == 1700000000.5
+    iso = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    assert source_time({"header": {"ts": "2024-01-01T00:00:00Z"}}, path) == iso.timestamp()
+    assert source_time(json.dumps({"header": {"ts": 5}}).encode(), path) == 5.0
+    assert source_time({"header": {}}, path) is None
+    assert source_time({"header": {"ts": True}}, path) is None
+
+def test_reorder_buffer_orders_within_wait_and_counts_late():
+    buffer = ReorderBuffer(max_wait=1.0)
+    buffer.push(10.0, "b")
+    buffer.push(9.5, "a")
+    assert buffer.pop_ready(now=10.2) == []
+    assert [item for _, item in buffer.pop_ready(now=11.0)] == ["a", "b"]
+    buffer.push(9.0, "tarde")
+    assert buffer.late == 1
+
+def test_reorder_buffer_bounds_wait_for_clocks_ahead():
+    buffer = ReorderBuffer(max_wait=0.5)
+    # Origen con el reloj una hora adelantado: sale max_wait después de llegar, no cuando lo alcance el reloj
+    buffer.push(3610.0, "adelantado", arrival=10.0)
+    buffer.push(10.1, "normal", arrival=10.2)
+    assert buffer.pop_ready(now=10.4) == []
+    assert [item for _, item in buffer.pop_ready(now=10.7)] == ["normal", "adelantado"]
+    # Los eventos siguientes del reloj correcto no cuentan como tardíos
+    buffer.push(11.0, "siguiente", arrival=11.0)
+    assert buffer.late == 0
+
+def test_fan_in_without_time_field_does_not_wait():
+    fan_in = FanInSubscriber([("ws://x", "r")], ["t"], on_batch=None)
+    assert fan_in.buffer.max_wait == 0
+    handler = fan_in._make_handler("r@ws://x", "r", "t")
+    handler(valor=1)
+    assert len(fan_in.buffer.pop_ready()) == 1
+
+def test_fan_in_orders_by_source_time():
+    fan_in = FanInSubscriber([("ws://x", "r")], ["t"], on_batch=None, time_field="ts")
+    handler = fan_in._make_handler("r@ws://x", "r", "t")
+    handler(ts=200.0, n=2)
+    handler(ts=100.0, n=1)
+    handler(n=3)
+    # El evento sin instante de origen usa el de llegada
+    ready = fan_in.buffer.pop_ready(now=time.time() + 1)
+    assert [item[3].get("n") for _, item in ready] == [1, 2, 3]
+
+def test_parse_endpoint():
+    assert parse_endpoint("ventas@rs://host:8080") == ("rs://host:8080", "ventas")
+    assert parse_endpoint("ws://host/ws", "r") == ("ws://host/ws", "r")
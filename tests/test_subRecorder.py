@@ -0,0 +1,62 @@
+# tests/test_subRecorder.py
+import time, asyncio, threading
+import pytest
+from common import rotation
+from subscriber.subRecorder import CaptureWriter, Recorder, read_capture, capture_files
+
+@pytest.mark.parametrize("compression", rotation.available_compressions())
+def test_capture_round_trip(tmp_path, compression):
+    writer = CaptureWriter(str(tmp_path), max_bytes=2000, compression=compression)
+    for i in range(200):
+        writer.record(float(i), "r", "t", {"v": i})
+    writer.close()
+    events = [event for path in capture_files(str(tmp_path)) for event in read_capture(path)]
+    assert [event["payload"]["v"] for event in events] == list(range(200))
+    assert writer.stats()["pending"] == 0
+
+def test_stop_keeps_events_that_arrive_while_stopping(tmp_path):
+    pytest.importorskip("autobahn")
+    from router.miniRouter import start_router_thread
+    from common.transports import connect
+    from autobahn.asyncio.wamp import ApplicationSession
+
+    _, endpoints, stop_router = start_router_thread()
+    writer = CaptureWriter(str(tmp_path))
+    recorder = Recorder([(endpoints["ws"], "default")], ["t.rec"], writer)
+    done = threading.Event()
+
+    # Publicador en su propio bucle: sigue enviando mientras se detiene la grabación
+    def publish():
+        loop = asyncio.new_event_loop()
+        class Publisher(ApplicationSession):
+            async def onJoin(self, details):
+                n = 0
+                while not done.is_set():
+                    self.publish("t.rec", n=n)
+                    n += 1
+                    await asyncio.sleep(0.0005)
+                self.leave()
+        loop.run_until_complete(connect(endpoints["ws"], "default", Publisher))
+        while not done.is_set():
+            loop.run_until_complete(asyncio.sleep(0.05))
+        loop.run_until_complete(asyncio.sleep(0.1))
+        loop.close()
+    thread = threading.Thread(target=publish, daemon=True)
+    try:
+        recorder.start()
+        thread.start()
+        deadline = time.time() + 5
+        while writer.received < 200 and time.time() < deadline:
+            time.sleep(0.01)
+        assert writer.received >= 200
+        recorder.stop(timeout=5)
+        assert not writer.closing
+        # Los eventos que llegasen ya cerrado el escritor se contarían como recibidos y nunca escritos
+        time.sleep(0.2)
+        stats = writer.stats()
+        assert stats["pending"] == 0 and stats["written"] == writer.received
+        assert sum(1 for path in capture_files(str(tmp_path)) for _ in read_capture(path)) == stats["written"]
+    finally:
+        done.set()
+        thread.join(2)
+        stop_router()